@@ -0,0 +1,133 @@
+import argparse
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from generate_excel_v5 import HabitTrackerGenerator
+from tracker_cache import TemplateCache
+
+# ==========================================
+# 📦 批量生成：按清单 (CSV / JSONL) 为每位用户生成个性化模板
+# ==========================================
+# 清单字段：user, year, items, max_items, filename (除 user 外均可省略)
+#   - items: JSON 数组，每项为 [类别, 事项, 目标天数, 积极标志] 或 {"category", "item", "target", "flag"}
+#   - filename: 相对 --out-dir 的输出文件名，缺省为 "{user}_{year}.xlsx"；不能是绝对路径或经 ".." 跳出 --out-dir，同一清单内不能重复
+
+def _output_name(name):
+    # 规范化后的相对路径；绝对路径 (含盘符) 与跳出输出目录的路径报错
+    norm = os.path.normpath(name)
+    if os.path.isabs(norm) or os.path.splitdrive(norm)[0] or norm == os.pardir or norm.startswith(os.pardir + os.sep):
+        raise ValueError(f"filename 必须是 --out-dir 内的相对路径: {name!r}")
+    return norm
+
+def parse_items(raw):
+    # 外部传入的预置事项 (清单字段 / 生成服务参数)：JSON 文本或列表，每项为 [类别, 事项, 目标天数, 积极标志]
+    # 或 {"category", "item", "target", "flag"}；缺省为 None (使用生成器自带的默认事项)
+    if raw in (None, ""): return None
+    items = json.loads(raw) if isinstance(raw, str) else raw
+    return [[it.get("category", ""), it["item"], it.get("target", ""), it.get("flag", "")] if isinstance(it, dict) else list(it) for it in items]
+
+def _normalize_job(row, line_no):
+    if not isinstance(row, dict): raise ValueError(f"清单第 {line_no} 行不是 JSON 对象: {row!r}")
+    user = str(row.get("user") or "").strip()
+    if not user: raise ValueError(f"清单第 {line_no} 行缺少 user")
+    year = int(row.get("year") or 2026)
+    return {
+        "user": user,
+        "year": year,
+        "items": parse_items(row.get("items")),
+        "max_items": int(row.get("max_items") or 50),
+        "filename": _output_name(row.get("filename") or f"{user}_{year}.xlsx"),
+    }
+
+def load_manifest(path):
+    # 解析失败的行同样作为任务返回 (带 error 字段)，在汇总里记为失败而不是中断整批；
+    # 与前面的行输出到同一文件的行记为失败 (不互相覆盖)
+    jobs, seen = [], {}
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        if path.lower().endswith((".jsonl", ".ndjson")):
+            lines = ((i, line) for i, line in enumerate(f, 1) if line.strip())
+        else:
+            lines = enumerate(csv.DictReader(f), 2)
+        for i, row in lines:
+            try:
+                if isinstance(row, str): row = json.loads(row)
+                job = _normalize_job(row, i)
+                key = os.path.normcase(job["filename"])
+                if key in seen: raise ValueError(f"filename {job['filename']!r} 与清单第 {seen[key]} 行重复")
+                seen[key] = i
+                jobs.append(job)
+            except (ValueError, TypeError, KeyError) as e:
+                user = row.get("user") if isinstance(row, dict) else None
+                jobs.append({"user": user or f"第{i}行", "filename": "", "error": f"清单第 {i} 行无效: {type(e).__name__}: {e}"})
+    return jobs
+
+_CACHES = {}  # 子进程内按目录复用 TemplateCache，保留其内存中的模板部件
+
+def _run_job(job, out_dir, streaming, cache_dir=None):
+    # 在子进程内执行；任何异常都转成结果记录返回，单个任务失败不影响其他任务
+    start = time.perf_counter()
+    path = os.path.join(out_dir, job["filename"])
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if cache_dir:
+            cache = _CACHES.get(cache_dir) or _CACHES.setdefault(cache_dir, TemplateCache(cache_dir))
+            cache.generate(path, job["items"], year=job["year"], max_items=job["max_items"])
+        else:
+            HabitTrackerGenerator(filename=path, year=job["year"], max_items=job["max_items"], items=job["items"], streaming=streaming).generate()
+        return {"user": job["user"], "path": path, "ok": True, "seconds": time.perf_counter() - start, "bytes": os.path.getsize(path)}
+    except Exception as e:
+        return {"user": job["user"], "path": path, "ok": False, "seconds": time.perf_counter() - start, "error": f"{type(e).__name__}: {e}"}
+
+def run_batch(jobs, out_dir=".", workers=None, streaming=False, cache_dir=None):
+    # 缓存命中时直接改写模板包内的配置页，不经过生成器，streaming 无从生效
+    if streaming and cache_dir: raise ValueError("streaming 与 cache_dir 不能同时使用：缓存命中时不经过生成器")
+    workers = workers or os.cpu_count() or 1
+    results, start = [], time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # 同时在途的任务数限制为 2 × workers，避免几千个任务一次性排进队列
+        pending, queue = {}, iter(jobs)
+        while True:
+            for job in queue:
+                if "error" in job:
+                    results.append({"user": job["user"], "path": "", "ok": False, "seconds": 0.0, "error": job["error"]}); continue
+                pending[pool.submit(_run_job, job, out_dir, streaming, cache_dir)] = job
+                if len(pending) >= workers * 2: break
+            if not pending: break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                job = pending.pop(fut)
+                try: results.append(fut.result())
+                except Exception as e:  # 子进程异常退出 (如内存不足被杀)
+                    results.append({"user": job["user"], "path": os.path.join(out_dir, job["filename"]), "ok": False, "seconds": 0.0, "error": f"{type(e).__name__}: {e}"})
+    elapsed = time.perf_counter() - start
+    ok = sum(r["ok"] for r in results)
+    return {
+        "results": results,
+        "total": len(results),
+        "ok": ok,
+        "failed": len(results) - ok,
+        "seconds": elapsed,
+        "files_per_sec": ok / elapsed if elapsed else 0.0,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="按清单批量生成 365 天打卡模板")
+    parser.add_argument("manifest", help="清单文件 (.csv 或 .jsonl)")
+    parser.add_argument("--out-dir", default=".", help="输出目录")
+    parser.add_argument("--workers", type=int, default=None, help="并发进程数 (默认 CPU 核数)")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--streaming", action="store_true", help="使用 write-only 流式写出，降低单进程内存")
+    mode.add_argument("--cache-dir", help="模板缓存目录：相同年份 / max_items 的用户共用一份模板，只改写事项配置页 (见 tracker_cache)")
+    args = parser.parse_args(argv)
+
+    summary = run_batch(load_manifest(args.manifest), args.out_dir, args.workers, args.streaming, args.cache_dir)
+    for r in summary["results"]:
+        if not r["ok"]: print(f"❌ {r['user']} -> {r['path']}: {r['error']}")
+    print(f"📦 完成 {summary['ok']}/{summary['total']} 个文件，失败 {summary['failed']} 个，"
+          f"耗时 {summary['seconds']:.1f}s，吞吐 {summary['files_per_sec']:.2f} 个/秒")
+    return 1 if summary["failed"] else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,183 @@
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+from datetime import datetime
+import openpyxl
+from tracker_formula import sheet_parts
+from tracker_profile import PhaseProfiler
+
+# ==========================================
+# ⏱️ 生成基准：各版本生成器 × 事项数 × 平年 / 闰年
+# ==========================================
+# 每个用例在独立子进程中运行 (样式缓存、语法树缓存互不影响)，记录：
+#   - seconds: 墙钟时间 (--repeat 次取最小)     - peak_mb: tracemalloc 峰值 (单独一次运行)
+#   - bytes:   输出文件大小                     - sheets:  每张表的单元格 / 公式 / 条件格式规则数
+#   - phases:  v5 的分阶段耗时 (config / annual / month:N / save 及其序列化与压缩拆分)
+# 结果写成 JSON；指定 --baseline 时与基线逐用例比较，超出容差记为回归并以退出码 1 结束。
+# 基线与机器相关，不随仓库提交：先在本机用 --save-baseline 录一份 (默认 benchmark_baseline.json，已被 git 忽略)，
+# 改动后再跑同样的参数对比 (含 v5 的分阶段耗时)。
+
+# 版本 -> (模块, 入口函数, 是否支持 max_items)；v5 为 HabitTrackerGenerator
+VERSIONS = {
+    "v1": ("generate_excel", "generate_365_excel_template", False),
+    "v2": ("generate_excel_v2", "generate_365_excel_template", False),
+    "v3": ("generate_excel_v3", "generate_linked_365_excel", True),
+    "v4": ("generate_excel_v4", "generate_perfect_365_excel", True),
+    "v5": ("generate_excel_v5", "HabitTrackerGenerator", True),
+}
+DEFAULT_ITEMS = [10, 50, 200, 1000]
+DEFAULT_YEARS = [2024, 2026]  # 闰年 / 平年
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+
+def build_cases(versions, items, years):
+    cases = []
+    for v in versions:
+        for year in years:
+            for n in (items if VERSIONS[v][2] else [None]):
+                cases.append({"id": f"{v}-{year}" + (f"-n{n}" if n else ""), "version": v, "year": year, "max_items": n})
+    return cases
+
+def sheet_stats(path):
+    # 直接扫描包内工作表 XML，避免为统计再完整加载一遍工作簿
+    stats = {}
+    with zipfile.ZipFile(path) as zf:
+        for title, part in sheet_parts(zf).items():
+            xml = zf.read(part).decode("utf-8")
+            stats[title] = {"cells": len(re.findall(r"<c\b", xml)), "formulas": len(re.findall(r"<f[\s>]", xml)), "cf_rules": len(re.findall(r"<cfRule\b", xml))}
+    return stats
+
+def _generate(case, path, options, profiler=None):
+    module, entry, with_items = VERSIONS[case["version"]]
+    target = getattr(importlib.import_module(module), entry)
+    kwargs = {"filename": path, "year": case["year"]}
+    if with_items: kwargs["max_items"] = case["max_items"]
+    with contextlib.redirect_stdout(io.StringIO()):
+        if case["version"] == "v5": target(**kwargs, **options, profiler=profiler).generate()
+        else: target(**kwargs)
+
+def run_case(case, out_dir, repeat=1, memory=True, options=None):
+    # 在子进程内执行：先计时 (取最小值)，再单独开启 tracemalloc 跑一次测峰值
+    options = options or {}
+    path = os.path.join(out_dir, case["id"] + ".xlsx")
+    times, phases = [], None
+    for _ in range(repeat):
+        # v5 同时记录分阶段耗时 (不开内存追踪，不影响计时)，保留最快一次的拆分
+        prof = PhaseProfiler(trace_memory=False) if case["version"] == "v5" else None
+        start = time.perf_counter(); _generate(case, path, options, prof); times.append(time.perf_counter() - start)
+        if prof is not None and times[-1] == min(times):
+            phases = {r["phase"]: r["seconds"] for r in prof.records}
+            phases.update((k, v) for r in prof.records for k, v in r.items() if k.endswith("_seconds"))
+    peak = None
+    if memory:
+        tracemalloc.start()
+        try: _generate(case, path, options); peak = tracemalloc.get_traced_memory()[1] / 1e6
+        finally: tracemalloc.stop()
+    result = dict(case, seconds=min(times), peak_mb=peak, bytes=os.path.getsize(path), sheets=sheet_stats(path))
+    if phases: result["phases"] = phases
+    return result
+
+def _run_isolated(case, out_dir, repeat, memory, options):
+    cmd = [sys.executable, os.path.abspath(__file__), "--case", json.dumps(case), "--out-dir", out_dir, "--repeat", str(repeat), "--options", json.dumps(options)]
+    if not memory: cmd.append("--no-memory")
+    proc = subprocess.run(cmd, capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    if proc.returncode != 0:
+        return dict(case, error=(proc.stderr.strip().splitlines() or ["子进程异常退出"])[-1])
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+def run_suite(cases, out_dir, repeat=1, memory=True, options=None, progress=print):
+    results = []
+    for case in cases:
+        r = _run_isolated(case, out_dir, repeat, memory, options or {})
+        results.append(r)
+        if progress:
+            if "error" in r: progress(f"❌ {r['id']}: {r['error']}")
+            else: progress(f"   {r['id']:<16} {r['seconds']:8.2f}s  {r['peak_mb'] or 0:8.1f}MB  {r['bytes'] / 1e6:7.2f}MB  公式 {sum(s['formulas'] for s in r['sheets'].values()):>8}")
+    return {
+        "meta": {"created": datetime.now().isoformat(timespec="seconds"), "python": platform.python_version(), "openpyxl": openpyxl.__version__,
+                 "platform": platform.platform(), "repeat": repeat, "options": options or {}},
+        "results": results,
+    }
+
+def compare(results, baseline, time_tol=0.25, memory_tol=0.20, size_tol=0.05):
+    # 返回 (回归列表, 结构变化列表)；结构变化 (公式 / 单元格 / 条件格式数) 只提示不判失败
+    base = {r["id"]: r for r in baseline["results"] if "error" not in r}
+    regressions, changes = [], []
+    for r in results["results"]:
+        b = base.get(r["id"])
+        if b is None: continue
+        if "error" in r: regressions.append(f"{r['id']}: 运行失败 ({r['error']})"); continue
+        for key, tol, unit in (("seconds", time_tol, "s"), ("peak_mb", memory_tol, "MB"), ("bytes", size_tol, "B")):
+            if r.get(key) is None or b.get(key) is None: continue
+            if r[key] > b[key] * (1 + tol):
+                regressions.append(f"{r['id']}: {key} {b[key]:.2f}{unit} -> {r[key]:.2f}{unit} (+{(r[key] / b[key] - 1) * 100:.0f}%，容差 {tol * 100:.0f}%)")
+        # 分阶段耗时：只检查基线中超过 0.1s 的阶段，避免短阶段的计时抖动
+        for phase, before in (b.get("phases") or {}).items():
+            now = (r.get("phases") or {}).get(phase)
+            if now is not None and before >= 0.1 and now > before * (1 + time_tol):
+                regressions.append(f"{r['id']}: 阶段 {phase} {before:.2f}s -> {now:.2f}s (+{(now / before - 1) * 100:.0f}%，容差 {time_tol * 100:.0f}%)")
+        for title in sorted(set(r["sheets"]) | set(b["sheets"])):
+            now, before = r["sheets"].get(title), b["sheets"].get(title)
+            if now != before: changes.append(f"{r['id']} / {title}: {before} -> {now}")
+    return regressions, changes
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="生成器基准测试：耗时、内存峰值、文件大小与每表结构统计")
+    parser.add_argument("--versions", default=",".join(VERSIONS), help="逗号分隔，如 v4,v5")
+    parser.add_argument("--items", default=",".join(map(str, DEFAULT_ITEMS)), help="max_items 取值 (仅 v3~v5)")
+    parser.add_argument("--years", default=",".join(map(str, DEFAULT_YEARS)))
+    parser.add_argument("--repeat", type=int, default=1, help="计时重复次数，取最小值")
+    parser.add_argument("--no-memory", action="store_true", help="不测内存峰值 (省去一次带 tracemalloc 的运行)")
+    parser.add_argument("--options", default="{}", help="传给 HabitTrackerGenerator 的额外参数 (JSON)，如 '{\"streaming\": true}'")
+    parser.add_argument("--out-dir", help="保留生成的文件到该目录 (默认使用临时目录)")
+    parser.add_argument("-o", "--output", default="benchmark_results.json", help="结果 JSON 路径")
+    parser.add_argument("--baseline", default=None, help=f"对比的基线 JSON (不指定时若存在则使用 {os.path.basename(BASELINE)})")
+    parser.add_argument("--save-baseline", action="store_true", help="把本次结果写为基线")
+    parser.add_argument("--time-tolerance", type=float, default=0.25)
+    parser.add_argument("--memory-tolerance", type=float, default=0.20)
+    parser.add_argument("--size-tolerance", type=float, default=0.05)
+    parser.add_argument("--case", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    options = json.loads(args.options)
+
+    if args.case:  # 子进程模式：执行单个用例并把结果以一行 JSON 输出
+        print(json.dumps(run_case(json.loads(args.case), args.out_dir, args.repeat, not args.no_memory, options), ensure_ascii=False))
+        return 0
+
+    versions = [v.strip() for v in args.versions.split(",") if v.strip()]
+    unknown = [v for v in versions if v not in VERSIONS]
+    if unknown: parser.error(f"未知版本：{', '.join(unknown)}")
+    cases = build_cases(versions, [int(n) for n in args.items.split(",")], [int(y) for y in args.years.split(",")])
+    print(f"⏱️ 共 {len(cases)} 个用例")
+    with tempfile.TemporaryDirectory() as tmp:
+        out_dir = args.out_dir or tmp
+        os.makedirs(out_dir, exist_ok=True)
+        results = run_suite(cases, out_dir, args.repeat, not args.no_memory, options)
+    with open(args.output, "w", encoding="utf-8") as f: json.dump(results, f, ensure_ascii=False, indent=1)
+    print(f"📄 结果已写入 {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline or BASELINE, "w", encoding="utf-8") as f: json.dump(results, f, ensure_ascii=False, indent=1)
+        print(f"📌 已保存基线 {args.baseline or BASELINE}")
+        return 0
+    baseline_path = args.baseline or (BASELINE if os.path.exists(BASELINE) else None)
+    if baseline_path is None: return 0
+    with open(baseline_path, encoding="utf-8") as f: baseline = json.load(f)
+    regressions, changes = compare(results, baseline, args.time_tolerance, args.memory_tolerance, args.size_tolerance)
+    for line in changes: print(f"ℹ️ 结构变化 {line}")
+    for line in regressions: print(f"🔺 回归 {line}")
+    print(f"{'❌' if regressions else '✅'} 与基线 {baseline_path} 对比：{len(regressions)} 项回归，{len(changes)} 项结构变化")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,17 +1,14 @@
 import openpyxl
-from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
 from openpyxl.utils import get_column_letter
 import calendar
 from datetime import date
+from tracker_styles import font, alignment, fill, border
 
 # 定义样式
-HEADER_FILL = PatternFill(start_color="DDEBF7", end_color="DDEBF7", fill_type="solid")
-ACHIEVEMENT_ROW_FILL = PatternFill(start_color="F0F0F0", end_color="F0F0F0", fill_type="solid")
-ALTERNATE_ROW_FILL = PatternFill(start_color="FFFFFF", end_color="FFFFFF", fill_type="solid")
-BORDER_STYLE = Border(left=Side(style='thin', color='C0C0C0'),
-                      right=Side(style='thin', color='C0C0C0'),
-                      top=Side(style='thin', color='C0C0C0'),
-                      bottom=Side(style='thin', color='C0C0C0'))
+HEADER_FILL = fill("DDEBF7")
+ACHIEVEMENT_ROW_FILL = fill("F0F0F0")
+ALTERNATE_ROW_FILL = fill("FFFFFF")
+BORDER_STYLE = border('C0C0C0')
 
 def generate_365_excel_template(filename="365天打卡模板_v2_2026.xlsx", year=2026):
     workbook = openpyxl.Workbook()
@@ -46,8 +43,8 @@ def generate_365_excel_template(filename="365天打卡模板_v2_2026.xlsx", year
             sheet.merge_cells(f"{cell_ref}:{cell_ref[0]}2")
             cell = sheet[cell_ref]
             cell.value = label
-            cell.font = Font(bold=True, size=14) # 增加字体大小
-            cell.alignment = Alignment(horizontal='center', vertical='center')
+            cell.font = font(bold=True, size=14) # 增加字体大小
+            cell.alignment = alignment(horizontal='center', vertical='center')
             cell.fill = HEADER_FILL
             cell.border = BORDER_STYLE
             sheet[f"{cell_ref[0]}2"].border = BORDER_STYLE
@@ -60,15 +57,15 @@ def generate_365_excel_template(filename="365天打卡模板_v2_2026.xlsx", year
             
             # 星期
             sheet[f"{col_letter}1"].value = weekdays[day_of_week]
-            sheet[f"{col_letter}1"].font = Font(bold=True, size=12)
-            sheet[f"{col_letter}1"].alignment = Alignment(horizontal='center', vertical='center')
+            sheet[f"{col_letter}1"].font = font(bold=True, size=12)
+            sheet[f"{col_letter}1"].alignment = alignment(horizontal='center', vertical='center')
             sheet[f"{col_letter}1"].fill = HEADER_FILL
             sheet[f"{col_letter}1"].border = BORDER_STYLE
             
             # 日期
             sheet[f"{col_letter}2"].value = d
-            sheet[f"{col_letter}2"].font = Font(bold=True, size=12)
-            sheet[f"{col_letter}2"].alignment = Alignment(horizontal='center', vertical='center')
+            sheet[f"{col_letter}2"].font = font(bold=True, size=12)
+            sheet[f"{col_letter}2"].alignment = alignment(horizontal='center', vertical='center')
             sheet[f"{col_letter}2"].fill = HEADER_FILL
             sheet[f"{col_letter}2"].border = BORDER_STYLE
 
@@ -78,8 +75,8 @@ def generate_365_excel_template(filename="365天打卡模板_v2_2026.xlsx", year
             sheet.merge_cells(f"{col_letter}1:{col_letter}2")
             cell = sheet[f"{col_letter}1"]
             cell.value = label
-            cell.font = Font(bold=True, size=14) # 增加字体大小
-            cell.alignment = Alignment(horizontal='center', vertical='center')
+            cell.font = font(bold=True, size=14) # 增加字体大小
+            cell.alignment = alignment(horizontal='center', vertical='center')
             cell.fill = HEADER_FILL
             cell.border = BORDER_STYLE
             sheet[f"{col_letter}2"].border = BORDER_STYLE
@@ -96,8 +93,8 @@ def generate_365_excel_template(filename="365天打卡模板_v2_2026.xlsx", year
             sheet[f"A{row}"], sheet[f"B{row}"], sheet[f"C{row}"], sheet[f"D{row}"] = item["序号"], item["类别"], item["事项"], item["目标"]
             
             for col in ["A", "B", "C", "D"]:
-                sheet[f"{col}{row}"].font = Font(size=12) # 增加内容字体
-                sheet[f"{col}{row}"].alignment = Alignment(horizontal='center', vertical='center')
+                sheet[f"{col}{row}"].font = font(size=12) # 增加内容字体
+                sheet[f"{col}{row}"].alignment = alignment(horizontal='center', vertical='center')
                 sheet[f"{col}{row}"].border = BORDER_STYLE
 
             if item["类别"]: category_merge_info[item["类别"]] = {"start": row, "end": row}
@@ -106,14 +103,14 @@ def generate_365_excel_template(filename="365天打卡模板_v2_2026.xlsx", year
             for d_col in range(5, num_days + 5):
                 cell = sheet.cell(row=row, column=d_col)
                 cell.border = BORDER_STYLE
-                cell.alignment = Alignment(horizontal='center', vertical='center')
+                cell.alignment = alignment(horizontal='center', vertical='center')
 
             # 达成率
             ach_c = sheet[f"{ach_col_letter}{row}"]
             ach_c.value = f'=IFERROR(COUNTIF({col_e_start}{row}:{col_e_end}{row},"<>" )/D{row},0)'
             ach_c.data_type, ach_c.number_format = 'f', '0.00%'
-            ach_c.font = Font(size=12)
-            ach_c.alignment, ach_c.border = Alignment(horizontal='center', vertical='center'), BORDER_STYLE
+            ach_c.font = font(size=12)
+            ach_c.alignment, ach_c.border = alignment(horizontal='center', vertical='center'), BORDER_STYLE
 
             # 环比
             mom_c = sheet[f"{mom_col_letter}{row}"]
@@ -122,8 +119,8 @@ def generate_365_excel_template(filename="365天打卡模板_v2_2026.xlsx", year
                 prev_ach_col = get_column_letter(calendar.monthrange(year, month_num-1)[1] + 5)
                 mom_c.value = f'=IFERROR(({ach_col_letter}{row}-\'{prev}\'!{prev_ach_col}{row})/\'{prev}\'!{prev_ach_col}{row},0)'
                 mom_c.data_type = 'f'
-            mom_c.number_format, mom_c.alignment, mom_c.border = '0.00%', Alignment(horizontal='center', vertical='center'), BORDER_STYLE
-            mom_c.font = Font(size=12)
+            mom_c.number_format, mom_c.alignment, mom_c.border = '0.00%', alignment(horizontal='center', vertical='center'), BORDER_STYLE
+            mom_c.font = font(size=12)
 
         for info in category_merge_info.values():
             if info["start"] != info["end"]: sheet.merge_cells(start_row=info["start"], end_row=info["end"], start_column=2, end_column=2)
@@ -133,8 +130,8 @@ def generate_365_excel_template(filename="365天打卡模板_v2_2026.xlsx", year
         sheet.row_dimensions[note_row].height = 35 # 增加高度
         sheet.merge_cells(f"A{note_row}:D{note_row}")
         sheet[f"A{note_row}"] = "每日备注"
-        sheet[f"A{note_row}"].font, sheet[f"A{note_row}"].fill = Font(bold=True, size=14), HEADER_FILL
-        sheet[f"A{note_row}"].alignment = Alignment(horizontal='center', vertical='center')
+        sheet[f"A{note_row}"].font, sheet[f"A{note_row}"].fill = font(bold=True, size=14), HEADER_FILL
+        sheet[f"A{note_row}"].alignment = alignment(horizontal='center', vertical='center')
         for c in range(1, mom_col_idx + 1):
             cell = sheet.cell(row=note_row, column=c)
             cell.border = BORDER_STYLE
@@ -147,8 +144,8 @@ def generate_365_excel_template(filename="365天打卡模板_v2_2026.xlsx", year
         sheet.row_dimensions[summary_start].height = 40 # 增加大标题行高
         sheet.merge_cells(start_row=summary_start, end_row=summary_start, start_column=1, end_column=4)
         title_c = sheet[f"A{summary_start}"]
-        title_c.value, title_c.font, title_c.fill = "月度数据汇总", Font(bold=True, size=16), HEADER_FILL
-        title_c.alignment = Alignment(horizontal='center', vertical='center')
+        title_c.value, title_c.font, title_c.fill = "月度数据汇总", font(bold=True, size=16), HEADER_FILL
+        title_c.alignment = alignment(horizontal='center', vertical='center')
         for c in range(1, 5): sheet.cell(row=summary_start, column=c).border = BORDER_STYLE
 
         # --- 2. 事项明细部分 ---
@@ -160,8 +157,8 @@ def generate_365_excel_template(filename="365天打卡模板_v2_2026.xlsx", year
         sheet[f"D{item_header_row}"] = "达成率"
         for c in range(1, 5):
             cell = sheet.cell(row=item_header_row, column=c)
-            cell.font, cell.fill, cell.border = Font(bold=True, size=13), ACHIEVEMENT_ROW_FILL, BORDER_STYLE
-            cell.alignment = Alignment(horizontal='center', vertical='center')
+            cell.font, cell.fill, cell.border = font(bold=True, size=13), ACHIEVEMENT_ROW_FILL, BORDER_STYLE
+            cell.alignment = alignment(horizontal='center', vertical='center')
 
         # 填充每个事项的细分汇总
         current_r = item_header_row + 1
@@ -170,23 +167,23 @@ def generate_365_excel_template(filename="365天打卡模板_v2_2026.xlsx", year
             sheet.row_dimensions[current_r].height = 30
             sheet.merge_cells(f"A{current_r}:B{current_r}")
             sheet[f"A{current_r}"] = item["事项"]
-            sheet[f"A{current_r}"].font = Font(size=12)
+            sheet[f"A{current_r}"].font = font(size=12)
             
             # 本月打卡天数
             days_c = sheet[f"C{current_r}"]
             days_c.value = f'=COUNTIF({col_e_start}{row_in_data}:{col_e_end}{row_in_data},"<>" )'
-            days_c.font = Font(size=12)
+            days_c.font = font(size=12)
             
             # 达成率
             sum_ach_c = sheet[f"D{current_r}"]
             sum_ach_c.value = f'={ach_col_letter}{row_in_data}'
             sum_ach_c.number_format = '0.00%'
-            sum_ach_c.font = Font(size=12)
+            sum_ach_c.font = font(size=12)
             
             for c in range(1, 5):
                 cell = sheet.cell(row=current_r, column=c)
                 cell.border = BORDER_STYLE
-                cell.alignment = Alignment(horizontal='center', vertical='center')
+                cell.alignment = alignment(horizontal='center', vertical='center')
                 cell.fill = ALTERNATE_ROW_FILL if i % 2 != 0 else ACHIEVEMENT_ROW_FILL
             current_r += 1
 
@@ -199,8 +196,8 @@ def generate_365_excel_template(filename="365天打卡模板_v2_2026.xlsx", year
         sheet[f"D{total_header_row}"] = "环比增长"
         for c in range(1, 5):
             cell = sheet.cell(row=total_header_row, column=c)
-            cell.font, cell.fill, cell.border = Font(bold=True, size=13), ACHIEVEMENT_ROW_FILL, BORDER_STYLE
-            cell.alignment = Alignment(horizontal='center', vertical='center')
+            cell.font, cell.fill, cell.border = font(bold=True, size=13), ACHIEVEMENT_ROW_FILL, BORDER_STYLE
+            cell.alignment = alignment(horizontal='center', vertical='center')
 
         labels = ["事项总数:", "已完成事项(达成率>0):", "月度平均达成率:", "总打卡天数:", "总有效打卡比例:"]
         for i, label in enumerate(labels):
@@ -208,7 +205,7 @@ def generate_365_excel_template(filename="365天打卡模板_v2_2026.xlsx", year
             sheet.row_dimensions[r].height = 30
             sheet.merge_cells(f"A{r}:B{r}")
             sheet[f"A{r}"] = label
-            sheet[f"A{r}"].font = Font(size=12)
+            sheet[f"A{r}"].font = font(size=12)
             fill = ACHIEVEMENT_ROW_FILL if i % 2 == 0 else ALTERNATE_ROW_FILL
             
             for c in range(1, 5):
@@ -216,10 +213,10 @@ def generate_365_excel_template(filename="365天打卡模板_v2_2026.xlsx", year
                 cell.border, cell.fill = BORDER_STYLE, fill
             
             val_c, sum_mom_c = sheet[f"C{r}"], sheet[f"D{r}"]
-            val_c.font = Font(size=12)
-            sum_mom_c.font = Font(size=12)
-            val_c.data_type, val_c.alignment = 'f', Alignment(horizontal='center', vertical='center')
-            sum_mom_c.data_type, sum_mom_c.number_format, sum_mom_c.alignment = 'f', '0.00%', Alignment(horizontal='center', vertical='center')
+            val_c.font = font(size=12)
+            sum_mom_c.font = font(size=12)
+            val_c.data_type, val_c.alignment = 'f', alignment(horizontal='center', vertical='center')
+            sum_mom_c.data_type, sum_mom_c.number_format, sum_mom_c.alignment = 'f', '0.00%', alignment(horizontal='center', vertical='center')
 
             if i == 0: val_c.value = f'=COUNTA(C{start_row}:C{end_row})'
             elif i == 1: val_c.value = f'=COUNTIF({ach_col_letter}{start_row}:{ach_col_letter}{end_row},">0")'
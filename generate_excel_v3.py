@@ -1,16 +1,13 @@
 import openpyxl
-from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
 from openpyxl.utils import get_column_letter
 import calendar
 from datetime import date
+from tracker_styles import font, alignment, fill, border
 
 # 定义样式
-HEADER_FILL = PatternFill(start_color="DDEBF7", end_color="DDEBF7", fill_type="solid")
-ACHIEVEMENT_ROW_FILL = PatternFill(start_color="F0F0F0", end_color="F0F0F0", fill_type="solid")
-BORDER_STYLE = Border(left=Side(style='thin', color='C0C0C0'),
-                      right=Side(style='thin', color='C0C0C0'),
-                      top=Side(style='thin', color='C0C0C0'),
-                      bottom=Side(style='thin', color='C0C0C0'))
+HEADER_FILL = fill("DDEBF7")
+ACHIEVEMENT_ROW_FILL = fill("F0F0F0")
+BORDER_STYLE = border('C0C0C0')
 
 def generate_linked_365_excel(filename="365天打卡模板_v3_联动版.xlsx", year=2026, max_items=50):
     workbook = openpyxl.Workbook()
@@ -24,9 +21,9 @@ def generate_linked_365_excel(filename="365天打卡模板_v3_联动版.xlsx", y
     for i, h in enumerate(config_headers, 1):
         cell = config_sheet.cell(row=1, column=i)
         cell.value = h
-        cell.font = Font(bold=True, size=14) # 加大表头字体
+        cell.font = font(bold=True, size=14) # 加大表头字体
         cell.fill = HEADER_FILL
-        cell.alignment = Alignment(horizontal='center', vertical='center')
+        cell.alignment = alignment(horizontal='center', vertical='center')
         cell.border = BORDER_STYLE
     
     # 初始数据
@@ -49,8 +46,8 @@ def generate_linked_365_excel(filename="365天打卡模板_v3_联动版.xlsx", y
                 cell.value = initial_items[r_idx - 2][c_idx - 1]
             
             # 核心修复：预设所有格子的样式，保证手动添加也居中
-            cell.font = Font(size=12)
-            cell.alignment = Alignment(horizontal='center', vertical='center')
+            cell.font = font(size=12)
+            cell.alignment = alignment(horizontal='center', vertical='center')
             cell.border = BORDER_STYLE
 
     config_sheet.column_dimensions['A'].width = 10
@@ -80,8 +77,8 @@ def generate_linked_365_excel(filename="365天打卡模板_v3_联动版.xlsx", y
             sheet.merge_cells(f"{cell_ref}:{cell_ref[0]}2")
             cell = sheet[cell_ref]
             cell.value = label
-            cell.font = Font(bold=True, size=14)
-            cell.alignment = Alignment(horizontal='center', vertical='center')
+            cell.font = font(bold=True, size=14)
+            cell.alignment = alignment(horizontal='center', vertical='center')
             cell.fill = HEADER_FILL
             cell.border = BORDER_STYLE
             sheet[f"{cell_ref[0]}2"].border = BORDER_STYLE
@@ -95,8 +92,8 @@ def generate_linked_365_excel(filename="365天打卡模板_v3_联动版.xlsx", y
             sheet[f"{col_letter}2"].value = d
             for r in [1, 2]:
                 cell = sheet[f"{col_letter}{r}"]
-                cell.font = Font(bold=True, size=12)
-                cell.alignment = Alignment(horizontal='center', vertical='center')
+                cell.font = font(bold=True, size=12)
+                cell.alignment = alignment(horizontal='center', vertical='center')
                 cell.fill = HEADER_FILL
                 cell.border = BORDER_STYLE
 
@@ -106,8 +103,8 @@ def generate_linked_365_excel(filename="365天打卡模板_v3_联动版.xlsx", y
             sheet.merge_cells(f"{col_letter}1:{col_letter}2")
             cell = sheet[f"{col_letter}1"]
             cell.value = label
-            cell.font = Font(bold=True, size=14)
-            cell.alignment = Alignment(horizontal='center', vertical='center')
+            cell.font = font(bold=True, size=14)
+            cell.alignment = alignment(horizontal='center', vertical='center')
             cell.fill = HEADER_FILL
             cell.border = BORDER_STYLE
             sheet[f"{col_letter}2"].border = BORDER_STYLE
@@ -130,22 +127,22 @@ def generate_linked_365_excel(filename="365天打卡模板_v3_联动版.xlsx", y
 
             for col in ["A", "B", "C", "D"]:
                 cell = sheet[f"{col}{row}"]
-                cell.font = Font(size=12)
-                cell.alignment = Alignment(horizontal='center', vertical='center')
+                cell.font = font(size=12)
+                cell.alignment = alignment(horizontal='center', vertical='center')
                 cell.border = BORDER_STYLE
 
             # 打卡格子
             for d_col in range(5, num_days + 5):
                 cell = sheet.cell(row=row, column=d_col)
                 cell.border = BORDER_STYLE
-                cell.alignment = Alignment(horizontal='center', vertical='center')
+                cell.alignment = alignment(horizontal='center', vertical='center')
 
             # 达成率
             ach_c = sheet[f"{ach_col_letter}{row}"]
             ach_c.value = f'=IF(C{row}<>"", IFERROR(COUNTIF({col_e_start}{row}:{col_e_end}{row},"<>" )/D{row}, 0), "")'
             ach_c.number_format = '0.00%'
-            ach_c.font = Font(size=12)
-            ach_c.alignment, ach_c.border = Alignment(horizontal='center', vertical='center'), BORDER_STYLE
+            ach_c.font = font(size=12)
+            ach_c.alignment, ach_c.border = alignment(horizontal='center', vertical='center'), BORDER_STYLE
 
             # 环比
             mom_c = sheet[f"{mom_col_letter}{row}"]
@@ -153,16 +150,16 @@ def generate_linked_365_excel(filename="365天打卡模板_v3_联动版.xlsx", y
                 prev = f"{year}年{month_num-1}月打卡"
                 prev_ach_col = get_column_letter(calendar.monthrange(year, month_num-1)[1] + 5)
                 mom_c.value = f'=IF(C{row}<>"", IFERROR(({ach_col_letter}{row}-\'{prev}\'!{prev_ach_col}{row})/\'{prev}\'!{prev_ach_col}{row}, 0), "")'
-            mom_c.number_format, mom_c.alignment, mom_c.border = '0.00%', Alignment(horizontal='center', vertical='center'), BORDER_STYLE
-            mom_c.font = Font(size=12)
+            mom_c.number_format, mom_c.alignment, mom_c.border = '0.00%', alignment(horizontal='center', vertical='center'), BORDER_STYLE
+            mom_c.font = font(size=12)
 
         # --- 每日备注 & 汇总区域 ---
         note_row = end_row + 1
         sheet.row_dimensions[note_row].height = 35
         sheet.merge_cells(f"A{note_row}:D{note_row}")
         sheet[f"A{note_row}"] = "每日备注"
-        sheet[f"A{note_row}"].font, sheet[f"A{note_row}"].fill = Font(bold=True, size=14), HEADER_FILL
-        sheet[f"A{note_row}"].alignment = Alignment(horizontal='center', vertical='center')
+        sheet[f"A{note_row}"].font, sheet[f"A{note_row}"].fill = font(bold=True, size=14), HEADER_FILL
+        sheet[f"A{note_row}"].alignment = alignment(horizontal='center', vertical='center')
         for c in range(1, mom_col_idx + 1):
             cell = sheet.cell(row=note_row, column=c)
             cell.border = BORDER_STYLE
@@ -171,8 +168,8 @@ def generate_linked_365_excel(filename="365天打卡模板_v3_联动版.xlsx", y
         summary_start = note_row + 2
         sheet.merge_cells(start_row=summary_start, end_row=summary_start, start_column=1, end_column=4)
         title_c = sheet[f"A{summary_start}"]
-        title_c.value, title_c.font, title_c.fill = "月度数据汇总", Font(bold=True, size=16), HEADER_FILL
-        title_c.alignment = Alignment(horizontal='center', vertical='center')
+        title_c.value, title_c.font, title_c.fill = "月度数据汇总", font(bold=True, size=16), HEADER_FILL
+        title_c.alignment = alignment(horizontal='center', vertical='center')
         for c in range(1, 5): sheet.cell(row=summary_start, column=c).border = BORDER_STYLE
 
         item_header_row = summary_start + 1
@@ -180,8 +177,8 @@ def generate_linked_365_excel(filename="365天打卡模板_v3_联动版.xlsx", y
         sheet[f"A{item_header_row}"], sheet[f"C{item_header_row}"], sheet[f"D{item_header_row}"] = "事项明细", "打卡天数", "达成率"
         for c in range(1, 5):
             cell = sheet.cell(row=item_header_row, column=c)
-            cell.font, cell.fill, cell.border = Font(bold=True, size=13), ACHIEVEMENT_ROW_FILL, BORDER_STYLE
-            cell.alignment = Alignment(horizontal='center', vertical='center')
+            cell.font, cell.fill, cell.border = font(bold=True, size=13), ACHIEVEMENT_ROW_FILL, BORDER_STYLE
+            cell.alignment = alignment(horizontal='center', vertical='center')
 
         curr_r = item_header_row + 1
         for i in range(max_items):
@@ -194,7 +191,7 @@ def generate_linked_365_excel(filename="365天打卡模板_v3_联动版.xlsx", y
             for c in range(1, 5):
                 cell = sheet.cell(row=curr_r, column=c)
                 cell.border = BORDER_STYLE
-                cell.alignment = Alignment(horizontal='center', vertical='center')
+                cell.alignment = alignment(horizontal='center', vertical='center')
             curr_r += 1
 
         total_header_row = curr_r
@@ -202,8 +199,8 @@ def generate_linked_365_excel(filename="365天打卡模板_v3_联动版.xlsx", y
         sheet[f"A{total_header_row}"], sheet[f"C{total_header_row}"], sheet[f"D{total_header_row}"] = "统计指标", "数值", "环比增长"
         for c in range(1, 5):
             cell = sheet.cell(row=total_header_row, column=c)
-            cell.font, cell.fill, cell.border = Font(bold=True, size=13), ACHIEVEMENT_ROW_FILL, BORDER_STYLE
-            cell.alignment = Alignment(horizontal='center', vertical='center')
+            cell.font, cell.fill, cell.border = font(bold=True, size=13), ACHIEVEMENT_ROW_FILL, BORDER_STYLE
+            cell.alignment = alignment(horizontal='center', vertical='center')
 
         labels = ["事项总数:", "已完成事项(达成率>0):", "月度平均达成率:", "总打卡天数:", "总有效打卡比例:"]
         for i, label in enumerate(labels):
@@ -211,7 +208,7 @@ def generate_linked_365_excel(filename="365天打卡模板_v3_联动版.xlsx", y
             sheet.merge_cells(f"A{r}:B{r}")
             sheet[f"A{r}"] = label
             val_c, sum_mom_c = sheet[f"C{r}"], sheet[f"D{r}"]
-            val_c.alignment = sum_mom_c.alignment = Alignment(horizontal='center', vertical='center')
+            val_c.alignment = sum_mom_c.alignment = alignment(horizontal='center', vertical='center')
             val_c.border = sum_mom_c.border = BORDER_STYLE
             sheet[f"A{r}"].border = BORDER_STYLE
 
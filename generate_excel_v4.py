@@ -1,10 +1,10 @@
 import openpyxl
-from openpyxl.styles import Font, Alignment, Border, Side, PatternFill, Protection
 from openpyxl.utils import get_column_letter
 from openpyxl.formatting.rule import FormulaRule, ColorScaleRule
 from openpyxl.worksheet.datavalidation import DataValidation
 import calendar
 from datetime import date
+from tracker_styles import font, alignment, fill, side, border, no_border, protection
 
 # ==========================================
 # 🎨 全局样式与色系配置 (方便后期一键换肤)
@@ -13,9 +13,9 @@ TEXT_COLOR = "000000"  # 通用文字颜色
 
 # --- 边框与背景色系 ---
 BORDER_COLOR = "94A3B8"  # 边框颜色 (清透蓝灰)
-CLEAR_BORDER_SIDE = Side(style='thin', color=BORDER_COLOR)
-BORDER_STYLE = Border(left=CLEAR_BORDER_SIDE, right=CLEAR_BORDER_SIDE, top=CLEAR_BORDER_SIDE, bottom=CLEAR_BORDER_SIDE)
-NO_BORDER = Border(left=Side(style=None), right=Side(style=None), top=Side(style=None), bottom=Side(style=None))
+CLEAR_BORDER_SIDE = side(BORDER_COLOR)
+BORDER_STYLE = border(BORDER_COLOR)
+NO_BORDER = no_border()
 
 DASHBOARD_COLOR = "D8E2DC"      # 看板次级背景 (灰岩绿)
 SUMMARY_LABEL_COLOR = "FFE5D9"  # 核心维度背景 (蜜粉色)
@@ -36,18 +36,18 @@ SCALE_GREEN = "86EFAC"          # 达成绿
 SCALE_WHITE = "FFFFFF"          # 纯白 (用于环比中点)
 
 # --- 样式对象初始化 ---
-DASHBOARD_FILL = PatternFill(start_color=DASHBOARD_COLOR, end_color=DASHBOARD_COLOR, fill_type="solid")
-SUMMARY_LABEL_FILL = PatternFill(start_color=SUMMARY_LABEL_COLOR, end_color=SUMMARY_LABEL_COLOR, fill_type="solid")
-HEADER_FILL = PatternFill(start_color=HEADER_COLOR, end_color=HEADER_COLOR, fill_type="solid")
-ZEBRA_FILL = PatternFill(start_color=ZEBRA_COLOR, end_color=ZEBRA_COLOR, fill_type="solid")
-SUCCESS_FILL = PatternFill(start_color=SUCCESS_BG_COLOR, end_color=SUCCESS_BG_COLOR, fill_type="solid") 
-REMARK_FILL = PatternFill(start_color=REMARK_COLOR, end_color=REMARK_COLOR, fill_type="solid")
-ERROR_FILL = PatternFill(start_color=ERROR_BG_COLOR, end_color=ERROR_BG_COLOR, fill_type="solid")
-
-SUCCESS_FONT = Font(color=SUCCESS_TEXT_COLOR, bold=True)
-ERROR_FONT = Font(color=ERROR_TEXT_COLOR, bold=True)
-WHITE_FILL = PatternFill(start_color="FFFFFF", end_color="FFFFFF", fill_type="solid")
-WHITE_FONT = Font(color="FFFFFF")
+DASHBOARD_FILL = fill(DASHBOARD_COLOR)
+SUMMARY_LABEL_FILL = fill(SUMMARY_LABEL_COLOR)
+HEADER_FILL = fill(HEADER_COLOR)
+ZEBRA_FILL = fill(ZEBRA_COLOR)
+SUCCESS_FILL = fill(SUCCESS_BG_COLOR) 
+REMARK_FILL = fill(REMARK_COLOR)
+ERROR_FILL = fill(ERROR_BG_COLOR)
+
+SUCCESS_FONT = font(color=SUCCESS_TEXT_COLOR, bold=True)
+ERROR_FONT = font(color=ERROR_TEXT_COLOR, bold=True)
+WHITE_FILL = fill("FFFFFF")
+WHITE_FONT = font(color="FFFFFF")
 
 # ==========================================
 
@@ -64,12 +64,12 @@ def generate_perfect_365_excel(filename="365天打卡模板_v4_顶置看板版.x
     config_headers = ["序号", "类别", "习惯事项", "目标天数"]
     config_sheet.row_dimensions[1].height = 40
     for i, h in enumerate(config_headers, 1):
-        cell = config_sheet.cell(row=1, column=i, value=h); cell.font = Font(bold=True, size=14, color=TEXT_COLOR); cell.fill = DASHBOARD_FILL; cell.alignment = Alignment(horizontal='center', vertical='center'); cell.border = BORDER_STYLE; cell.protection = Protection(locked=True) 
+        cell = config_sheet.cell(row=1, column=i, value=h); cell.font = font(bold=True, size=14, color=TEXT_COLOR); cell.fill = DASHBOARD_FILL; cell.alignment = alignment(horizontal='center', vertical='center'); cell.border = BORDER_STYLE; cell.protection = protection(locked=True) 
     
     for r in range(2, max_items + 2):
         config_sheet.row_dimensions[r].height = 35 
         for c in range(1, 27): 
-            cell = config_sheet.cell(row=r, column=c); cell.alignment = Alignment(horizontal='center', vertical='center', wrap_text=(c==3)); cell.font = Font(size=12, color=TEXT_COLOR); cell.protection = Protection(locked=False)
+            cell = config_sheet.cell(row=r, column=c); cell.alignment = alignment(horizontal='center', vertical='center', wrap_text=(c==3)); cell.font = font(size=12, color=TEXT_COLOR); cell.protection = protection(locked=False)
             if c == 1: cell.value = f'=IF(C{r}<>"", ROW()-1, "")'
 
     config_item_range = f"C2:C{max_items + 1}"
@@ -100,7 +100,7 @@ def generate_perfect_365_excel(filename="365天打卡模板_v4_顶置看板版.x
         # --- A. 仪表盘 ---
         dash_left_col = 3
         sheet.merge_cells(start_row=1 + ROW_OFFSET, start_column=dash_left_col, end_row=1 + ROW_OFFSET, end_column=dash_left_col + 6)
-        title_dash = sheet.cell(row=1 + ROW_OFFSET, column=dash_left_col); title_dash.value = "🏆 我的自律成就榜"; title_dash.font = Font(bold=True, size=16, color=TEXT_COLOR); title_dash.alignment = Alignment(horizontal='left', vertical='center')
+        title_dash = sheet.cell(row=1 + ROW_OFFSET, column=dash_left_col); title_dash.value = "🏆 我的自律成就榜"; title_dash.font = font(bold=True, size=16, color=TEXT_COLOR); title_dash.alignment = alignment(horizontal='left', vertical='center')
         
         stat_row = 2 + ROW_OFFSET
         sheet.row_dimensions[stat_row].height = 35 
@@ -108,7 +108,7 @@ def generate_perfect_365_excel(filename="365天打卡模板_v4_顶置看板版.x
         sheet.cell(row=stat_row, column=dash_left_col, value="成长维度")
         sheet.cell(row=stat_row, column=dash_left_col + 2, value="当前状态"); sheet.cell(row=stat_row, column=dash_left_col + 3, value="对比\n上月")
         for c in range(dash_left_col, dash_left_col + 4):
-            cell = sheet.cell(row=stat_row, column=c); cell.font = Font(bold=True, size=12, color=TEXT_COLOR); cell.fill = SUMMARY_LABEL_FILL; cell.border = BORDER_STYLE; cell.alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
+            cell = sheet.cell(row=stat_row, column=c); cell.font = font(bold=True, size=12, color=TEXT_COLOR); cell.fill = SUMMARY_LABEL_FILL; cell.border = BORDER_STYLE; cell.alignment = alignment(horizontal='center', vertical='center', wrap_text=True)
         
         labels = ["习惯事项", "坚持事项", "平均达成率", "累计打卡天", "总体完成率"]
         for i, label in enumerate(labels):
@@ -116,10 +116,10 @@ def generate_perfect_365_excel(filename="365天打卡模板_v4_顶置看板版.x
             sheet.row_dimensions[r].height = 45 if i == 0 else 35 
             sheet.merge_cells(start_row=r, start_column=3, end_row=r, end_column=4)
             cell_label = sheet.cell(row=r, column=3, value=label); cell_label.border = BORDER_STYLE; sheet.cell(row=r, column=4).border = BORDER_STYLE
-            cell_label.font = Font(size=11, color=TEXT_COLOR); cell_label.alignment = Alignment(horizontal='center', vertical='center', wrap_text=(i==0))
+            cell_label.font = font(size=11, color=TEXT_COLOR); cell_label.alignment = alignment(horizontal='center', vertical='center', wrap_text=(i==0))
             
             val_c, mom_c = sheet.cell(row=r, column=dash_left_col + 2), sheet.cell(row=r, column=dash_left_col + 3)
-            val_c.border = mom_c.border = BORDER_STYLE; val_c.font = mom_c.font = Font(color=TEXT_COLOR); val_c.alignment = mom_c.alignment = Alignment(horizontal='center', vertical='center')
+            val_c.border = mom_c.border = BORDER_STYLE; val_c.font = mom_c.font = font(color=TEXT_COLOR); val_c.alignment = mom_c.alignment = alignment(horizontal='center', vertical='center')
             if i == 0: val_c.value = f'=COUNTIF(E{MAIN_TABLE_START}:E{MAIN_TABLE_START+max_items-1}, "?*")'
             elif i == 1: val_c.value = f'=COUNTIF(G{MAIN_TABLE_START}:G{MAIN_TABLE_START+max_items-1},">0")'
             elif i == 2: val_c.value, val_c.number_format = f'=IFERROR(AVERAGE(G{MAIN_TABLE_START}:G{MAIN_TABLE_START+max_items-1}),0)', '0.0%'
@@ -133,43 +133,43 @@ def generate_perfect_365_excel(filename="365天打卡模板_v4_顶置看板版.x
         # 习惯看板 (习惯达成看板)
         dash_right_col_start = 8 + COL_OFFSET; dash_right_col_end = num_days + 7 + COL_OFFSET
         sheet.merge_cells(start_row=1 + ROW_OFFSET, start_column=dash_right_col_start, end_row=1 + ROW_OFFSET, end_column=dash_right_col_end)
-        title_items = sheet.cell(row=1 + ROW_OFFSET, column=dash_right_col_start, value="🔥 习惯进化里程碑"); title_items.font = Font(bold=True, size=16, color=TEXT_COLOR); title_items.alignment = Alignment(horizontal='center', vertical='center')
+        title_items = sheet.cell(row=1 + ROW_OFFSET, column=dash_right_col_start, value="🔥 习惯进化里程碑"); title_items.font = font(bold=True, size=16, color=TEXT_COLOR); title_items.alignment = alignment(horizontal='center', vertical='center')
         
         label_col = 7 + COL_OFFSET
         cell_core = sheet.cell(row=2 + ROW_OFFSET, column=label_col, value="习惯达成")
-        cell_core.font = Font(bold=True, size=11); cell_core.fill = SUMMARY_LABEL_FILL; cell_core.border = BORDER_STYLE; cell_core.alignment = Alignment(horizontal='center', vertical='center')
+        cell_core.font = font(bold=True, size=11); cell_core.fill = SUMMARY_LABEL_FILL; cell_core.border = BORDER_STYLE; cell_core.alignment = alignment(horizontal='center', vertical='center')
         
         for i, label in enumerate(["习惯事项", "已坚持", "达成率", "对比上月"]):
             r = i + 3 + ROW_OFFSET
             cell_h = sheet.cell(row=r, column=label_col, value=label)
-            cell_h.font = Font(size=10, color=TEXT_COLOR); cell_h.fill = DASHBOARD_FILL; cell_h.border = BORDER_STYLE; cell_h.alignment = Alignment(horizontal='center', vertical='center', wrap_text=(i==0))
+            cell_h.font = font(size=10, color=TEXT_COLOR); cell_h.fill = DASHBOARD_FILL; cell_h.border = BORDER_STYLE; cell_h.alignment = alignment(horizontal='center', vertical='center', wrap_text=(i==0))
         
         for i in range(max_items):
             col_idx = i + 8 + COL_OFFSET; main_row = MAIN_TABLE_START + i; sheet.cell(row=3 + ROW_OFFSET, column=col_idx, value=f"=IF(E{main_row}<>\"\", E{main_row}, \"\")")
             sheet.cell(row=4 + ROW_OFFSET, column=col_idx, value=f"=IF(E{main_row}<>\"\", H{main_row}, \"\")"); sheet.cell(row=5 + ROW_OFFSET, column=col_idx, value=f"=IF(E{main_row}<>\"\", G{main_row}, \"\")"); sheet.cell(row=6 + ROW_OFFSET, column=col_idx, value=f"=IF(E{main_row}<>\"\", I{main_row}, \"\")")
             for r in range(3 + ROW_OFFSET, 7 + ROW_OFFSET):
-                cell = sheet.cell(row=r, column=col_idx); cell.font = Font(size=10, color=TEXT_COLOR); 
-                cell.alignment = Alignment(horizontal='center', vertical='center', wrap_text=(r==3+ROW_OFFSET))
+                cell = sheet.cell(row=r, column=col_idx); cell.font = font(size=10, color=TEXT_COLOR); 
+                cell.alignment = alignment(horizontal='center', vertical='center', wrap_text=(r==3+ROW_OFFSET))
                 if r in [5 + ROW_OFFSET, 6 + ROW_OFFSET]: cell.number_format = '0.0%'
 
         # --- B. 每日感悟 ---
         sheet.row_dimensions[REMARK_ROW].height = None 
         sheet.merge_cells(start_row=REMARK_ROW, start_column=1 + COL_OFFSET, end_row=REMARK_ROW, end_column=7 + COL_OFFSET)
-        remark_title = sheet.cell(row=REMARK_ROW, column=1 + COL_OFFSET); remark_title.value = "📝 每日感悟 / 备忘录"; remark_title.font = Font(bold=True, size=12, color=TEXT_COLOR); remark_title.fill = HEADER_FILL; remark_title.alignment = Alignment(horizontal='center', vertical='center'); remark_title.border = BORDER_STYLE
+        remark_title = sheet.cell(row=REMARK_ROW, column=1 + COL_OFFSET); remark_title.value = "📝 每日感悟 / 备忘录"; remark_title.font = font(bold=True, size=12, color=TEXT_COLOR); remark_title.fill = HEADER_FILL; remark_title.alignment = alignment(horizontal='center', vertical='center'); remark_title.border = BORDER_STYLE
         for c in range(1 + COL_OFFSET, 8 + COL_OFFSET): sheet.cell(row=REMARK_ROW, column=c).border = BORDER_STYLE
         for d in range(1, num_days + 1):
-            cell = sheet.cell(row=REMARK_ROW, column=d + 7 + COL_OFFSET); cell.border = BORDER_STYLE; cell.alignment = Alignment(horizontal='left', vertical='top', wrap_text=True); cell.font = Font(size=10, color=TEXT_COLOR); cell.protection = Protection(locked=False)
+            cell = sheet.cell(row=REMARK_ROW, column=d + 7 + COL_OFFSET); cell.border = BORDER_STYLE; cell.alignment = alignment(horizontal='left', vertical='top', wrap_text=True); cell.font = font(size=10, color=TEXT_COLOR); cell.protection = protection(locked=False)
 
         # --- C. 表头 ---
         sheet.row_dimensions[HEADER_START].height = 35; sheet.row_dimensions[HEADER_START + 1].height = 35
         main_headers = [("C", "序号"), ("D", "类别"), ("E", "习惯事项"), ("F", "目标\n天数"), ("G", "达成率"), ("H", "坚持\n天数"), ("I", "对比\n上月")]
         for col_let, label in main_headers:
-            sheet.merge_cells(f"{col_let}{HEADER_START}:{col_let}{HEADER_START+1}"); cell = sheet[f"{col_let}{HEADER_START}"]; cell.value = label; cell.font = Font(bold=True, size=13, color=TEXT_COLOR); cell.fill = HEADER_FILL; cell.alignment = Alignment(horizontal='center', vertical='center', wrap_text=True); cell.border = BORDER_STYLE; sheet[f"{col_let}{HEADER_START+1}"].border = BORDER_STYLE
+            sheet.merge_cells(f"{col_let}{HEADER_START}:{col_let}{HEADER_START+1}"); cell = sheet[f"{col_let}{HEADER_START}"]; cell.value = label; cell.font = font(bold=True, size=13, color=TEXT_COLOR); cell.fill = HEADER_FILL; cell.alignment = alignment(horizontal='center', vertical='center', wrap_text=True); cell.border = BORDER_STYLE; sheet[f"{col_let}{HEADER_START+1}"].border = BORDER_STYLE
         weekdays = ["周一", "周二", "周三", "周四", "周五", "周六", "周日"]
         for d in range(1, num_days + 1):
             col_idx = d + 7 + COL_OFFSET; day_of_week = date(year, month_num, d).weekday()
             for r, val in [(HEADER_START, weekdays[day_of_week]), (HEADER_START + 1, d)]:
-                cell = sheet.cell(row=r, column=col_idx, value=val); cell.font = Font(bold=True, size=11, color=TEXT_COLOR); cell.fill = HEADER_FILL; cell.border = BORDER_STYLE; cell.alignment = Alignment(horizontal='center', vertical='center')
+                cell = sheet.cell(row=r, column=col_idx, value=val); cell.font = font(bold=True, size=11, color=TEXT_COLOR); cell.fill = HEADER_FILL; cell.border = BORDER_STYLE; cell.alignment = alignment(horizontal='center', vertical='center')
 
         # --- D. 数据行 ---
         checkin_area_range = f"{get_column_letter(8+COL_OFFSET)}{MAIN_TABLE_START}:{get_column_letter(num_days + 7 + COL_OFFSET)}{MAIN_TABLE_START + max_items - 1}"
@@ -192,11 +192,11 @@ def generate_perfect_365_excel(filename="365天打卡模板_v4_顶置看板版.x
                     if month_num > 1: prev = f"{year}年{month_num-1}月打卡"; cell.value = f'=IF(E{row}<>"", IFERROR((G{row}-\'{prev}\'!G{row})/\'{prev}\'!G{row}, 0), "")'
                     else: cell.value = f'=IF(E{row}<>"", 0, "")'
                     cell.number_format = '0.0%'
-                cell.font = Font(color=TEXT_COLOR); 
-                cell.alignment = Alignment(horizontal='center', vertical='center', wrap_text=(col_let == "E"))
+                cell.font = font(color=TEXT_COLOR); 
+                cell.alignment = alignment(horizontal='center', vertical='center', wrap_text=(col_let == "E"))
                 cell.border = BORDER_STYLE
             for d in range(1, num_days + 1):
-                cell = sheet.cell(row=row, column=d + 7 + COL_OFFSET); cell.alignment = Alignment(horizontal='center', vertical='center'); cell.font = Font(size=12, color=TEXT_COLOR); cell.protection = Protection(locked=False)
+                cell = sheet.cell(row=row, column=d + 7 + COL_OFFSET); cell.alignment = alignment(horizontal='center', vertical='center'); cell.font = font(size=12, color=TEXT_COLOR); cell.protection = protection(locked=False)
 
         # --- 💡 E. 条件格式 (优先级重构) ---
         table_full_range = f"C{MAIN_TABLE_START}:{get_column_letter(num_days + 7 + COL_OFFSET)}{MAIN_TABLE_START + max_items - 1}"
@@ -1,10 +1,32 @@
 import openpyxl
-from openpyxl.styles import Font, Alignment, Border, Side, PatternFill, Protection
-from openpyxl.utils import get_column_letter
+from openpyxl.utils import get_column_letter, column_index_from_string
+from openpyxl.utils.cell import coordinate_to_tuple
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.worksheet.cell_range import CellRange
 from openpyxl.formatting.rule import FormulaRule, ColorScaleRule
 from openpyxl.worksheet.datavalidation import DataValidation
+from openpyxl.worksheet.formula import ArrayFormula
+from openpyxl.writer.excel import ExcelWriter
+from openpyxl.worksheet._writer import WorksheetWriter
+from openpyxl.worksheet.dimensions import SheetDimension
+from openpyxl.drawing.spreadsheet_drawing import SpreadsheetDrawing
+from openpyxl.styles.borders import Border, DEFAULT_BORDER
+from openpyxl.styles.cell_style import StyleArray
+from openpyxl.styles.numbers import BUILTIN_FORMATS_REVERSE, BUILTIN_FORMATS_MAX_SIZE
+from openpyxl.cell.cell import ERROR_CODES
+from openpyxl.utils.datetime import to_excel
+from openpyxl.packaging.custom import StringProperty
 import calendar
-from datetime import date, timedelta
+import json
+import re
+import time
+from contextlib import nullcontext
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from io import BytesIO
+from xml.sax.saxutils import escape
+from zipfile import ZipFile, ZIP_DEFLATED, ZIP_STORED
+import tracker_styles
+from tracker_formula import FormulaEvaluator, plain_value, write_cached_values
 
 # ==========================================
 # 🎨 全局样式与色系配置
@@ -29,36 +51,539 @@ class TrackerTheme:
     SCALE_GREEN = "86EFAC"
     SCALE_WHITE = "FFFFFF"
 
+    # 样式对象统一走 tracker_styles 注册表：同参数只创建一次，按引用复用
     @classmethod
     def get_border(cls, color=None):
-        side = Side(style='thin', color=color or cls.BORDER_COLOR)
-        return Border(left=side, right=side, top=side, bottom=side)
+        return tracker_styles.border(color or cls.BORDER_COLOR)
 
     @classmethod
     def get_fill(cls, color):
-        return PatternFill(start_color=color, end_color=color, fill_type="solid")
+        return tracker_styles.fill(color)
 
     @classmethod
     def get_no_border(cls):
-        return Border(left=Side(style=None), right=Side(style=None), top=Side(style=None), bottom=Side(style=None))
+        return tracker_styles.no_border()
+
+    @classmethod
+    def font(cls, **kwargs):
+        return tracker_styles.font(**kwargs)
+
+    @classmethod
+    def alignment(cls, **kwargs):
+        return tracker_styles.alignment(**kwargs)
+
+    @classmethod
+    def protection(cls, locked=True):
+        return tracker_styles.protection(locked=locked)
+
+# ==========================================
+# 🧮 条件格式合并：公式形状相同的规则合成一条多区域规则
+# ==========================================
+_CF_REF = re.compile(r"(?<![A-Za-z0-9_.])(\$?)([A-Z]{1,3})(\$?)(\d+)(?![\w(])")
+
+def _formula_shape(formula, anchor_row, anchor_col):
+    # 把公式里的 A1 引用改写成相对锚点 (区域左上角) 的 R1C1 形式，字符串常量原样保留
+    def repl(m):
+        col_abs, col, row_abs, row = m.groups()
+        c = column_index_from_string(col)
+        return (f"C{c}" if col_abs else f"C[{c - anchor_col}]") + (f"R{row}" if row_abs else f"R[{int(row) - anchor_row}]")
+    parts = re.split(r'("[^"]*")', formula)
+    return "".join(p if i % 2 else _CF_REF.sub(repl, p) for i, p in enumerate(parts))
+
+def _range_key(cr):
+    # 与 openpyxl 写出 sqref 时的排序一致：先列后行
+    return (cr.min_col, cr.min_row, cr.max_col, cr.max_row)
+
+def _range_independent(rule):
+    # 每格结果只取决于本格 (与所在区域的其他格无关) 的规则才能跨区域合并；色阶 / 数据条 / 图标集要求阈值都是固定数值
+    if rule.type in ("top10", "aboveAverage", "duplicateValues", "uniqueValues"): return False
+    scale = rule.colorScale or rule.dataBar or rule.iconSet
+    return scale is None or all(v.type == "num" for v in scale.cfvo)
+
+def consolidate_cf(records):
+    # records: [(区域字符串, 规则)]，按添加顺序。返回 [(合并后的区域字符串, 规则)]，规则顺序即优先级顺序。
+    # 1) 公式形状 (相对各自左上角)、样式与 stopIfTrue 都相同的规则合并为一条；
+    # 2) 同一规则下被其他区域完全覆盖的区域视为冗余，直接丢弃。
+    # 结果取决于整个区域取值的规则 (百分位 / 最值色阶、前 N 项、高于平均、重复值等) 合并后含义会变，不参与合并。
+    groups = {}
+    for n, (sqref, rule) in enumerate(records):
+        ranges = sorted((CellRange(r) for r in sqref.split()), key=_range_key)
+        anchor = ranges[0]
+        shape = tuple(_formula_shape(f, anchor.min_row, anchor.min_col) for f in (rule.formula or []))
+        key = (rule.type, rule.stopIfTrue, repr(rule.dxf), repr(rule.colorScale), shape) if _range_independent(rule) else n
+        groups.setdefault(key, []).append((ranges, rule))
+    merged = []
+    for entries in groups.values():
+        ranges = [r for rs, _ in entries for r in rs]
+        ranges = [r for i, r in enumerate(ranges) if not any(o.issuperset(r) and (o != r or j < i) for j, o in enumerate(ranges) if j != i)]
+        ranges.sort(key=_range_key)
+        first = min(entries, key=lambda e: _range_key(e[0][0]))
+        top_left = (min(r.min_row for r in ranges), min(r.min_col for r in ranges))
+        if first[1].formula and (ranges[0].min_row, ranges[0].min_col) != top_left:
+            # 首个区域不在左上角时 Excel 的相对引用锚点会错位，这种情况不合并
+            merged.extend((" ".join(str(r) for r in rs), rule) for rs, rule in entries)
+        else:
+            merged.append((" ".join(str(r) for r in ranges), first[1]))
+    return merged
+
+class _TimedZipFile(ZipFile):
+    # 累计压缩写入各部件的耗时 (openpyxl 的工作表 XML 先写临时文件再 write 进包，其余部件走 writestr)
+    seconds = 0.0
+
+    def write(self, *args, **kwargs):
+        start = time.perf_counter()
+        try: return super().write(*args, **kwargs)
+        finally: self.seconds += time.perf_counter() - start
+
+    def writestr(self, *args, **kwargs):
+        start = time.perf_counter()
+        try: return super().writestr(*args, **kwargs)
+        finally: self.seconds += time.perf_counter() - start
+
+# ==========================================
+# 🔗 共享公式：一列中只有行号递增的公式只存一份文本
+# ==========================================
+class _SharedFormula(ArrayFormula):
+    # <f t="shared">：区域首格写出 ref 与公式文本，其余格只写 si，由 Excel 按行偏移推导；
+    # formula 保留本格的完整公式，供缓存值求值器使用
+    t = "shared"
+
+    def __init__(self, formula, si, ref=None):
+        super().__init__(ref, formula if ref else None)
+        self.si, self.formula = si, formula
+
+    def __iter__(self):
+        yield "t", "shared"
+        if self.ref: yield "ref", self.ref
+        yield "si", str(self.si)
+
+# ==========================================
+# 🚰 流式写出 (write-only 工作簿的行序缓冲)
+# ==========================================
+class _BufferedCell:
+    __slots__ = ("value", "font", "fill", "border", "alignment", "protection", "number_format")
+
+    def __init__(self):
+        self.value = self.font = self.fill = self.border = self.alignment = self.protection = self.number_format = None
+
+class _StreamingSheet:
+    # 对外提供与普通 Worksheet 相同的写入接口 (cell / ws["A1"] / merge_cells / add_data_validation)，
+    # 单元格先以轻量记录缓冲在本表内；搭建代码写完一段行后调用 release(row)，把 row 之前的行按行号顺序
+    # 写入 write-only 工作表并释放缓冲，flush() 写出剩余的行，峰值内存只与最大的一段行有关。
+    # 列宽要在首次写出前、行高 / 隐藏要在该行写出前设置；已写出的行不能再写入。
+    # sheet_view、protection、行列尺寸、条件格式等其余属性直接转发给底层工作表。
+    def __init__(self, ws, keep_values=False):
+        object.__setattr__(self, "_ws", ws)
+        object.__setattr__(self, "_rows", {})
+        object.__setattr__(self, "_next_row", 1)
+        # 已写出的单元格数与取值 (cached_values 需要整表取值，keep_values 时保留)
+        object.__setattr__(self, "emitted_cells", 0)
+        object.__setattr__(self, "values", {} if keep_values else None)
+
+    def __getattr__(self, name):
+        return getattr(self._ws, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._ws, name, value)
+
+    def cell(self, row, column, value=None):
+        cells = self._rows.get(row)
+        if cells is None:
+            if row < self._next_row: raise RuntimeError(f"{self._ws.title}: 第 {row} 行已经写出，不能再写入")
+            cells = self._rows[row] = {}
+        cell = cells.get(column)
+        if cell is None: cell = cells[column] = _BufferedCell()
+        if value is not None: cell.value = value
+        return cell
+
+    def __getitem__(self, coordinate):
+        return self.cell(*coordinate_to_tuple(coordinate))
+
+    def merge_cells(self, range_string=None, start_row=None, start_column=None, end_row=None, end_column=None):
+        self._ws.merged_cells.add(CellRange(range_string=range_string, min_col=start_column, min_row=start_row, max_col=end_column, max_row=end_row))
+
+    def add_data_validation(self, data_validation):
+        self._ws.data_validations.append(data_validation)
+
+    def release(self, row):
+        # 写出 row 之前 (不含 row) 尚未写出的行；中间的空行以空行占位，最后一个已写入的行之后不补空行
+        ws, rows, values = self._ws, self._rows, self.values
+        row = min(row, max(rows, default=0) + 1)
+        for r in range(self._next_row, row):
+            cells = rows.pop(r, None)
+            if not cells: ws.append([]); continue
+            out = [None] * max(cells)
+            for c, bc in cells.items():
+                wc = WriteOnlyCell(ws, bc.value)
+                if bc.font is not None: wc.font = bc.font
+                if bc.fill is not None: wc.fill = bc.fill
+                if bc.border is not None: wc.border = bc.border
+                if bc.alignment is not None: wc.alignment = bc.alignment
+                if bc.protection is not None: wc.protection = bc.protection
+                if bc.number_format is not None: wc.number_format = bc.number_format
+                if values is not None and bc.value is not None: values[(r, c)] = plain_value(bc.value)
+                out[c - 1] = wc
+            ws.append(out)
+            object.__setattr__(self, "emitted_cells", self.emitted_cells + len(cells))
+        object.__setattr__(self, "_next_row", max(self._next_row, row))
+
+    def flush(self):
+        self.release(max(self._rows, default=0) + 1)
+
+# ==========================================
+# 📝 直接写 XML：单元格不建 openpyxl 对象，sheetData 直接拼成文本
+# ==========================================
+# 搭建代码与流式写出共用 _BufferedCell 缓冲；flush() 时把整张表的 <sheetData> 渲染为文本存在底层工作表上，
+# 保存时由 _XmlExcelWriter 拼进工作表 XML。合并区、条件格式、数据验证、保护、视图与行列尺寸这些元素
+# 数量很少，仍交给 openpyxl 序列化。单元格写法与 openpyxl 一致 (内联字符串、公式 <f> + 空 <v />)，
+# 样式编号在同一工作簿的样式表中登记，结果与 openpyxl 后端逐格等价 (见 tests/tracker_checks.verify_xml_backend)。
+class _XmlStyles:
+    # 样式对象 -> 单元格样式编号 (cellXfs 序号)；tracker_styles 按引用复用样式，以对象 id 为键缓存
+    def __init__(self, wb):
+        self.wb = wb
+        self._ids = {}
+
+    def style_id(self, bc):
+        key = (id(bc.font), id(bc.fill), id(bc.border), id(bc.alignment), id(bc.protection), bc.number_format)
+        hit = self._ids.get(key)
+        if hit is not None: return hit[0]
+        wb, fmt = self.wb, bc.number_format
+        style = StyleArray()
+        if bc.font is not None: style.fontId = wb._fonts.add(bc.font)
+        if bc.fill is not None: style.fillId = wb._fills.add(bc.fill)
+        if bc.border is not None: style.borderId = wb._borders.add(bc.border)
+        if bc.alignment is not None: style.alignmentId = wb._alignments.add(bc.alignment)
+        if bc.protection is not None: style.protectionId = wb._protections.add(bc.protection)
+        if fmt is not None: style.numFmtId = BUILTIN_FORMATS_REVERSE[fmt] if fmt in BUILTIN_FORMATS_REVERSE else wb._number_formats.add(fmt) + BUILTIN_FORMATS_MAX_SIZE
+        sid = wb._cell_styles.add(style) if any(style) else None
+        # 同时持有样式对象，避免对象被回收后 id 被复用
+        self._ids[key] = (sid, bc.font, bc.fill, bc.border, bc.alignment, bc.protection)
+        return sid
+
+def _cell_xml(ref, sid, v):
+    s = "" if sid is None else f' s="{sid}"'
+    if v is None: return f'<c r="{ref}"{s} t="n" />'
+    if v.__class__ is _SharedFormula:
+        if v.ref is None: return f'<c r="{ref}"{s}><f t="shared" si="{v.si}" /><v /></c>'
+        return f'<c r="{ref}"{s}><f t="shared" ref="{v.ref}" si="{v.si}">{escape(v.text[1:])}</f><v /></c>'
+    if v.__class__ is str:
+        if len(v) > 1 and v[0] == "=": return f'<c r="{ref}"{s}><f>{escape(v[1:])}</f><v /></c>'
+        if not v: return f'<c r="{ref}"{s} t="inlineStr" />'
+        if v in ERROR_CODES: return f'<c r="{ref}"{s} t="e"><v>{v}</v></c>'
+        space = ' xml:space="preserve"' if v.strip() != v else ""
+        return f'<c r="{ref}"{s} t="inlineStr"><is><t{space}>{escape(v)}</t></is></c>'
+    if isinstance(v, bool): return f'<c r="{ref}"{s} t="b"><v>{int(v)}</v></c>'
+    if isinstance(v, (date, datetime, dt_time, timedelta)): v = to_excel(v)
+    if isinstance(v, (int, float)): return f'<c r="{ref}"{s} t="n"><v>{"%.16g" % v}</v></c>'
+    raise TypeError(f"{ref}: 不支持的单元格值类型 {type(v).__name__}")
+
+class _XmlSheet(_StreamingSheet):
+    def __init__(self, ws, styles, keep_values=False):
+        super().__init__(ws, keep_values)
+        object.__setattr__(self, "_styles", styles)
+
+    def release(self, row):
+        # 整表在 flush() 时一次渲染，单元格记录本身很轻，不分段写出
+        pass
+
+    def merge_cells(self, range_string=None, start_row=None, start_column=None, end_row=None, end_column=None):
+        # 与 openpyxl 的 MergedCellRange 一致：右下角的右 / 下边框并入左上角，区内其余格清空，
+        # 边缘格继承左上角对应一侧的边框，所有格继承左上角的保护设置 (未设置边框的格按默认边框处理)
+        cr = CellRange(range_string=range_string, min_col=start_column, min_row=start_row, max_col=end_column, max_row=end_row)
+        self._ws.merged_cells.add(cr)
+        top_left = self.cell(cr.min_row, cr.min_col)
+        end = self._rows.get(cr.max_row, {}).get(cr.max_col)
+        if end is not None and end is not top_left:
+            end_border = end.border or DEFAULT_BORDER
+            top_left.border = (top_left.border or DEFAULT_BORDER) + Border(right=end_border.right, bottom=end_border.bottom)
+        for r, c in cr.cells:
+            if (r, c) != (cr.min_row, cr.min_col): self._rows.setdefault(r, {}).pop(c, None)
+        border = top_left.border or DEFAULT_BORDER
+        for name in ("top", "left", "right", "bottom"):
+            side = getattr(border, name)
+            if side and side.style is None: continue
+            for r, c in getattr(cr, name):
+                cell = self.cell(r, c)
+                cell.border = (cell.border or DEFAULT_BORDER) + Border(**{name: side})
+        if top_left.protection is not None:
+            for r, c in cr.cells:
+                if (r, c) != (cr.min_row, cr.min_col): self.cell(r, c).protection = top_left.protection
+
+    def flush(self):
+        ws, rows, style_id, values = self._ws, self._rows, self._styles.style_id, self.values
+        dims = ws.row_dimensions
+        letters = [""] + [get_column_letter(c) for c in range(1, max((max(cells, default=0) for cells in rows.values()), default=0) + 1)]
+        out, bounds = ["<sheetData>"], []
+        for r in sorted(rows.keys() | dims.keys()):
+            cells = rows.get(r, {})
+            attrs = "".join(f' {k}="{v}"' for k, v in dims[r]) if r in dims else ""
+            out.append(f'<row r="{r}"{attrs}>')
+            for c in sorted(cells):
+                bc = cells[c]
+                if values is not None and bc.value is not None: values[(r, c)] = plain_value(bc.value)
+                sid = style_id(bc)
+                if bc.value is None and sid is None: continue
+                out.append(_cell_xml(f"{letters[c]}{r}", sid, bc.value))
+            out.append("</row>")
+            if cells: bounds.append((r, min(cells), max(cells)))
+        out.append("</sheetData>")
+        # 尺寸范围与 openpyxl 的 calculate_dimension 相同：所有已创建的单元格 (含合并区内的格)
+        for cr in ws.merged_cells: bounds.append((cr.min_row, cr.min_col, cr.max_col)); bounds.append((cr.max_row, cr.min_col, cr.max_col))
+        if bounds:
+            min_c, max_c = min(b[1] for b in bounds), max(b[2] for b in bounds)
+            ws._xml_dimension = f"{get_column_letter(min_c)}{min(b[0] for b in bounds)}:{get_column_letter(max_c)}{max(b[0] for b in bounds)}"
+        else:
+            ws._xml_dimension = "A1:A1"
+        ws._xml_sheet_data = "".join(out).encode("utf-8")
+        object.__setattr__(self, "emitted_cells", sum(len(cells) for cells in rows.values()))
+        rows.clear()
+
+class _XmlWorksheetWriter(WorksheetWriter):
+    # 除 sheetData 外沿用 openpyxl 的写法，sheetData 先留空元素占位，写完后替换为预先渲染的文本
+    def write_dimensions(self):
+        self.xf.send(SheetDimension(self.ws._xml_dimension).to_tree())
+
+    def write_rows(self):
+        xf = self.xf.send(True)
+        with xf.element("sheetData"): pass
+        self.xf.send(None)
+
+    def cleanup(self):
+        pass
+
+class _XmlExcelWriter(ExcelWriter):
+    def write_worksheet(self, ws):
+        ws._drawing = SpreadsheetDrawing()
+        ws._drawing.charts = ws._charts
+        ws._drawing.images = ws._images
+        writer = _XmlWorksheetWriter(ws, out=BytesIO())
+        writer.write()
+        ws._rels = writer._rels
+        xml = writer.out.getvalue()
+        head, sep, tail = xml.partition(b"<sheetData />")
+        if not sep: head, sep, tail = xml.partition(b"<sheetData></sheetData>")
+        self._archive.writestr(ws.path[1:], head + ws._xml_sheet_data + tail)
+        self.manifest.append(ws)
 
 class HabitTrackerGenerator:
-    def __init__(self, filename="365天打卡模板_v5_正式版.xlsx", year=2026, max_items=50):
+    # 配置页预置事项：[类别, 事项, 目标天数, 积极标志]
+    DEFAULT_ITEMS = [["生活", "早睡早起", 21, "✅🔥"], ["生活", "跑步", 21, "🏃‍♂️💪"], ["学习", "睡前阅读", 10, "📖💡"]]
+    # 表结构版本：调整任何工作表的布局 / 公式 / 样式时加 1，tracker_update 据此判断已有文件是否需要重建
+    LAYOUT_VERSION = 1
+    PARAMS_PROPERTY = "daka365.params"
+    GALLERY_TITLE = "📅 年度画廊 {}"
+    YOY_TITLE = "📈 同比环比分析"
+
+    def __init__(self, filename="365天打卡模板_v5_正式版.xlsx", year=2026, max_items=50, streaming=False, items=None, cached_values=False, positive_strategy="sumproduct", profiler=None, gallery="full", gallery_page_size=None, years=None, backend="openpyxl", shared_formulas=False, months=None, streaks=None):
         self.filename = filename
-        self.year = year
+        # 多年模式：years=[2025, 2026] 时一个工作簿含多年月度表，共用事项配置页，1 月环比接上一年 12 月，另生成同比环比分析表
+        self.years = sorted(set(years)) if years else [year]
+        if self.years != list(range(self.years[0], self.years[0] + len(self.years))): raise ValueError(f"years 必须是连续年份: {years!r}")
+        self.year = self.years[0]
+        # months=N 只生成 1~N 月的月度表 (也可传截止日期，取该日所在月)，年度看板与画廊只引用这些月份；后续月份用 tracker_update 追加
+        if isinstance(months, date): months = 12 if months.year > self.year else months.month if months.year == self.year else 1
+        self.months = 12 if months is None else months
+        if not 1 <= self.months <= 12: raise ValueError(f"months 必须在 1~12 之间: {months!r}")
+        if self.months < 12 and len(self.years) > 1: raise ValueError("months 只支持单年工作簿")
         self.max_items = max_items
-        self.wb = openpyxl.Workbook()
+        self.items = self.DEFAULT_ITEMS if items is None else items
+        if len(self.items) > max_items: raise ValueError(f"预置事项数 {len(self.items)} 超过 max_items={max_items}")
+        # streaming=True 时使用 write-only 工作簿：每张表按行顺序写出，内存只随单张表增长
+        self.streaming = streaming
+        # backend="xml" 时单元格不经 openpyxl 对象，直接渲染为工作表 XML 文本 (见 _XmlSheet)，与 streaming 互斥
+        if backend not in ("openpyxl", "xml"): raise ValueError(f"未知的 backend: {backend!r}")
+        if backend == "xml" and streaming: raise ValueError("backend='xml' 已按行整表写出，不能与 streaming=True 同时使用")
+        self.backend = backend
+        self.wb = openpyxl.Workbook(write_only=streaming)
+        if not streaming: self.wb.remove(self.wb.active)
+        self._xml_styles = _XmlStyles(self.wb) if backend == "xml" else None
+        # 快照数据源 (见 tracker_snapshot)：设置后年度看板写入静态数值而非跨表公式
+        self.snapshot = None
+        self._pending_cf, self.cf_stats = {}, {}
+        # cached_values=True 时保存后为每个公式写入求值结果 (见 tracker_formula)，预览工具无需重算即可显示
+        self.cached_values = cached_values
+        # 积极天数 (月度表 I 列) 的算法："sumproduct" 为整行数组 SEARCH；"helper" 为隐藏辅助格逐格判定后 SUM，重算更省
+        if positive_strategy not in ("sumproduct", "helper"): raise ValueError(f"未知的 positive_strategy: {positive_strategy!r}")
+        self.positive_strategy = positive_strategy
+        # 年度画廊："full" 为全部 max_items 个方块 (空事项靠条件格式隐藏)；"configured" 只为已配置的事项生成方块
+        # gallery_page_size=N 时画廊拆到独立的「📅 年度画廊 1/2/...」工作表，每页 N 个方块，年度看板只保留目录
+        if gallery not in ("full", "configured"): raise ValueError(f"未知的 gallery: {gallery!r}")
+        if gallery_page_size is not None and gallery_page_size < 1: raise ValueError(f"gallery_page_size 必须为正整数: {gallery_page_size!r}")
+        self.gallery, self.gallery_page_size = gallery, gallery_page_size
+        # shared_formulas=True 时月度主表 C~L 列写成共享公式 (每列一份公式文本)，工作表 XML 更小、Excel 加载与重算更省
+        self.shared_formulas = shared_formulas
+        # 连续打卡天数 (月度看板「当前连续 / 最长连续」两行)："formulas" 为隐藏辅助区逐日累计 (每格一个标量 IF，跨月、跨年接续)；
+        # "values" 写入 streak_values 中的静态结果 {(年, 月, 事项序号): (当前连续, 最长连续)}，由 tracker_streak.month_streaks 计算
+        if streaks not in (None, "formulas", "values"): raise ValueError(f"未知的 streaks: {streaks!r}")
+        self.streaks, self.streak_values = streaks, None
+        self.gallery_slots = None  # 画廊方块对应的配置序号 (0 起)；为 None 时按 gallery 模式推算，增量更新时由已填写的配置页决定
+        # 分阶段剖析器 (见 tracker_profile.PhaseProfiler)；为 None 时不做任何记录
+        self.profiler = profiler
+        self.cells_written = 0
+        self._cell_values = {}
         self.theme = TrackerTheme
         self.row_offset = 2
         self.col_offset = 2
         self.main_table_start = 14 + self.row_offset # 行 16
         self.remark_row = 11 + self.row_offset # 行 13
+        # 列号 -> 列字母查找表：覆盖年度画廊 (前 119 列) 与月度看板里程碑区 (M 列起 max_items 列)
+        self.cols = [""] + [get_column_letter(c) for c in range(1, max(120, 11 + self.col_offset + self.max_items))]
         
-    def generate(self):
-        self._setup_config_sheet()
-        self._setup_annual_summary_sheet()
-        self._setup_monthly_sheets()
-        self._save()
+    def generate(self, target=None, compresslevel=None):
+        # target: 输出路径或可写的二进制文件对象 (如 BytesIO)，缺省为 filename；返回 target
+        # compresslevel: 0 为不压缩 (ZIP_STORED，最快、文件最大)，1~9 为 deflate 级别，None 为 zlib 默认 (6)
+        with self._phase("config"): self._setup_config_sheet()
+        for year in self.years:
+            self.year = year
+            with self._phase(self._year_phase("annual")): self._setup_annual_summary_sheet()
+            self._setup_gallery_sheets()
+            self._setup_monthly_sheets()
+        self.year = self.years[0]
+        if len(self.years) > 1:
+            with self._phase("yoy"): self._setup_yoy_sheet()
+        self._stamp_params()
+        with self._phase("save") as record: return self._save(record, target, compresslevel)
+
+    def generate_bytes(self, compresslevel=None):
+        # 在内存中生成，直接返回 xlsx 字节，不经过文件系统
+        return self.generate(BytesIO(), compresslevel).getvalue()
+
+    def params(self):
+        # 决定表结构的生成参数，写入文档自定义属性，供增量更新时比对
+        return {"layout": self.LAYOUT_VERSION, "year": self.year, "max_items": self.max_items, "positive_strategy": self.positive_strategy,
+                "gallery": self.gallery, "gallery_page_size": self.gallery_page_size, **({"years": self.years} if len(self.years) > 1 else {}),
+                **({"shared_formulas": True} if self.shared_formulas else {}),
+                **({"months": self.months} if self.months < 12 else {}), **({"streaks": self.streaks} if self.streaks else {})}
+
+    def _stamp_params(self):
+        props = self.wb.custom_doc_props
+        for prop in [p for p in props if p.name == self.PARAMS_PROPERTY]: props.props.remove(prop)
+        props.append(StringProperty(name=self.PARAMS_PROPERTY, value=json.dumps(self.params(), ensure_ascii=False, sort_keys=True)))
+
+    def _phase(self, name):
+        if self.profiler is None: return nullcontext({})
+        return self.profiler.phase(name, counter=lambda: self.cells_written)
+
+    def _year_phase(self, name):
+        return f"{name}@{self.year}" if len(self.years) > 1 else name
+
+    # --- 多年模式下按年份区分的表名 ---
+    def _annual_title(self, year=None):
+        return "📅 年度汇总看板" if len(self.years) == 1 else f"📅 {year or self.year} 年度汇总看板"
+
+    def _gallery_title(self, p):
+        return self.GALLERY_TITLE.format(p) if len(self.years) == 1 else f"📅 {self.year} 年度画廊 {p}"
+
+    def _prev_month(self, month_num):
+        # 上月 (年, 月)：1 月接上一年 12 月 (多年模式且上一年在本工作簿内)，否则没有上月
+        if month_num > 1: return self.year, month_num - 1
+        if self.year - 1 in self.years: return self.year - 1, 12
+        return None
+
+    def _prev_month_title(self, month_num):
+        prev = self._prev_month(month_num)
+        return f"{prev[0]}年{prev[1]}月打卡" if prev else None
+
+    # --- 跨表汇总公式引用的单元格 ---
+    def _cfg_items_ref(self):
+        return f"事项配置页!$C$2:$C${self.max_items+1}"
+
+    def _month_ref(self, year, m, cell):
+        # 月度看板数值格 (E5~E10)
+        return f"'{year}年{m}月打卡'!{cell}"
+
+    def _month_hits_ref(self, year, m):
+        # 月度主表坚持天数列 (H 列)
+        return f"'{year}年{m}月打卡'!H{self.main_table_start}:H{self.main_table_start+self.max_items-1}"
+
+    def _annual_ref(self, year, i):
+        return f"'{self._annual_title(year)}'!{self._annual_metric_cell(i)}"
+
+    def _create_sheet(self, title, index=None):
+        ws = self.wb.create_sheet(title, index)
+        if self.backend == "xml": return _XmlSheet(ws, self._xml_styles, self.cached_values)
+        return _StreamingSheet(ws, self.cached_values) if self.streaming else ws
+
+    def _release(self, ws, row):
+        # 流式写出时，搭建代码写完一段行 (row 之前的行不再改动) 后调用，把这些行写出并释放缓冲
+        if isinstance(ws, _StreamingSheet): ws.release(row)
+
+    def _add_cf(self, ws, range_string, rule):
+        # 条件格式先登记，收尾时统一合并后再写入工作表
+        self._pending_cf.setdefault(ws.title, []).append((range_string, rule))
+
+    def _finish_sheet(self, ws):
+        records = self._pending_cf.pop(ws.title, [])
+        merged = consolidate_cf(records)
+        for range_string, rule in merged: ws.conditional_formatting.add(range_string, rule)
+        self.cf_stats[ws.title] = (len(records), len(merged))
+        if isinstance(ws, _StreamingSheet):
+            # 写出时逐行计数并 (cached_values 时) 记录取值
+            ws.flush()
+            self.cells_written += ws.emitted_cells
+            if self.cached_values: self._cell_values[ws.title] = ws.values
+            return
+        self.cells_written += len(ws._cells)
+        if self.cached_values: self._cell_values[ws.title] = {k: plain_value(c.value) for k, c in ws._cells.items() if c.value is not None}
+
+    def cf_rule_counts(self):
+        # 每张表的条件格式规则数：{表名: (合并前, 合并后)}
+        return dict(self.cf_stats)
+
+    # ==========================================
+    # 🧩 公式模板：与行无关的部分预先拼好，逐格只需 format(数据行号 {0}, 配置行号 {1}, 辅助格行号 {2})
+    # ==========================================
+    def _gallery_day_templates(self):
+        # 年度画廊每个 (月, 日) 一个模板，引用对应月度表的当日打卡格
+        tpls = {}
+        for m in range(1, 13):
+            ref = f"'{self.year}年{m}月打卡'!"
+            num_days = calendar.monthrange(self.year, m)[1]
+            # 尚未生成的月份只留空格子，追加该月时随年度看板一起重建
+            if m > self.months: tpls[m] = [None] * num_days; continue
+            tpls[m] = ['=IF(事项配置页!$C${1}="", "", IF(' + ref + self.cols[d + 10 + self.col_offset] + '{0}<>"", ' + ref + self.cols[d + 10 + self.col_offset] + '{0}, ""))' for d in range(1, num_days + 1)]
+        return tpls
+
+    def _monthly_row_templates(self, month_num, num_days):
+        # 月度主表 C~L 列：(列号, 公式模板, 对齐, 数字格式)
+        daily = self.cols[11 + self.col_offset] + "{0}:" + self.cols[num_days + 10 + self.col_offset] + "{0}"
+        cfg = '=IF(事项配置页!$C${1}<>"", 事项配置页!'
+        prev_title = self._prev_month_title(month_num)
+        if prev_title:
+            prev = f"'{prev_title}'!"
+            k_tpl = '=IF(E{0}<>"", IFERROR((G{0}-' + prev + 'G{0})/' + prev + 'G{0}, 0), "")'
+            l_tpl = '=IF(E{0}<>"", IFERROR((J{0}-' + prev + 'J{0})/' + prev + 'J{0}, 0), "")'
+        else:
+            k_tpl = l_tpl = '=IF(E{0}<>"", 0, "")'
+        if self.positive_strategy == "helper":
+            helper = self.cols[11 + self.col_offset] + "{2}:" + self.cols[num_days + 10 + self.col_offset] + "{2}"
+            positive = '=IF(E{0}<>"", IF(事项配置页!$E${1}="", H{0}, SUM(' + helper + ')), "")'
+        else:
+            positive = '=IF(E{0}<>"", IF(事项配置页!$E${1}="", H{0}, SUMPRODUCT(--ISNUMBER(SEARCH(' + daily + ', 事项配置页!$E${1}))*(' + daily + '<>""))), "")'
+        center = self.theme.alignment(horizontal='center', vertical='center', wrap_text=False, shrink_to_fit=False)
+        tpls = [
+            (3, cfg + 'A{1}, "")', center, None),
+            (4, cfg + 'B{1}, "")', center, None),
+            (5, cfg + 'C{1}, "")', self.theme.alignment(horizontal='center', vertical='center', wrap_text=True, shrink_to_fit=False), None),
+            (6, cfg + 'D{1}, "")', center, None),
+            (7, '=IF(E{0}<>"", IFERROR(H{0}/F{0}, 0), "")', center, '0.0%'),
+            (8, '=IF(E{0}<>"", COUNTIF(' + daily + ',"<>" ), "")', center, None),
+            (9, positive, center, None),
+            (10, '=IF(E{0}<>"", IFERROR(I{0}/F{0}, 0), "")', center, '0.0%'),
+            (11, k_tpl, self.theme.alignment(horizontal='center', vertical='center', wrap_text=False, shrink_to_fit=True), '0.0%'),
+            (12, l_tpl, self.theme.alignment(horizontal='center', vertical='center', wrap_text=False, shrink_to_fit=True), '0.0%'),
+        ]
+        # 共享公式按行偏移推导，配置页引用改为行相对 ($C2 而非 $C$2)，每格结果不变
+        if self.shared_formulas: tpls = [(c, tpl.replace("${1}", "{1}"), align, fmt) for c, tpl, align, fmt in tpls]
+        return tpls
+
+    def _positive_helper_templates(self, num_days):
+        # helper 策略的辅助格：每个打卡格对应一个标量 SEARCH，空格直接短路为 0
+        return [(d + 10 + self.col_offset, '=IF(' + self.cols[d + 10 + self.col_offset] + '{0}="", 0, --ISNUMBER(SEARCH(' + self.cols[d + 10 + self.col_offset] + '{0}, 事项配置页!$E${1})))') for d in range(1, num_days + 1)]
+
+    def _streak_helper_templates(self, num_days):
+        # 连续天数辅助格：当日有打卡则为前一天 (1 日为 L 列接续的上月末) 的累计值 + 1，否则归 0
+        return [(d + 10 + self.col_offset, '=IF(' + self.cols[d + 10 + self.col_offset] + '{0}="", 0, ' + self.cols[d + 9 + self.col_offset] + '{1}+1)') for d in range(1, num_days + 1)]
 
     def _apply_common_settings(self, sheet):
         sheet.sheet_view.showGridLines = False
@@ -69,8 +594,7 @@ class HabitTrackerGenerator:
         sheet.protection.formatCells = False; sheet.protection.insertRows = False; sheet.protection.deleteRows = False; sheet.protection.sort = False; sheet.protection.autoFilter = False
 
     def _setup_config_sheet(self):
-        ws = self.wb.active
-        ws.title = "事项配置页"
+        ws = self._create_sheet("事项配置页")
         self._apply_common_settings(ws)
         
         headers = ["序号", "类别", "事项", "目标天数", "积极标志"]
@@ -78,32 +602,34 @@ class HabitTrackerGenerator:
         h_fill, h_border = self.theme.get_fill(self.theme.DASHBOARD_COLOR), self.theme.get_border()
         for i, h in enumerate(headers, 1):
             cell = ws.cell(row=1, column=i, value=h)
-            cell.font = Font(bold=True, size=14); cell.fill = h_fill; cell.border = h_border; cell.alignment = Alignment(horizontal='center', vertical='center')
+            cell.font = self.theme.font(bold=True, size=14); cell.fill = h_fill; cell.border = h_border; cell.alignment = self.theme.alignment(horizontal='center', vertical='center')
+
+        ws.column_dimensions['A'].width = 8; ws.column_dimensions['B'].width = 12; ws.column_dimensions['C'].width = 45; ws.column_dimensions['D'].width = 15; ws.column_dimensions['E'].width = 15
 
         for r in range(2, self.max_items + 2):
             ws.row_dimensions[r].height = 35
             for c in range(1, 27): 
-                cell = ws.cell(row=r, column=c); cell.protection = Protection(locked=False)
-                cell.alignment = Alignment(horizontal='center', vertical='center', wrap_text=(c==3))
+                cell = ws.cell(row=r, column=c); cell.protection = self.theme.protection(locked=False)
+                cell.alignment = self.theme.alignment(horizontal='center', vertical='center', wrap_text=(c==3))
                 if c == 1: cell.value = f'=IF(C{r}<>"", ROW()-1, "")'
                 # 积极标志列（E列）字体调大
-                if c == 5: cell.font = Font(size=20)
-
-        ws.column_dimensions['A'].width = 8; ws.column_dimensions['B'].width = 12; ws.column_dimensions['C'].width = 45; ws.column_dimensions['D'].width = 15; ws.column_dimensions['E'].width = 15
+                if c == 5: cell.font = self.theme.font(size=20)
+            if r - 2 < len(self.items):
+                for c_idx, val in enumerate(self.items[r - 2], 2): ws.cell(row=r, column=c_idx, value=val)
+            self._release(ws, r + 1)
         
         dv = DataValidation(type="custom", formula1=f'COUNTIF($C$2:$C${self.max_items+1}, C2)<=1', showErrorMessage=True, errorStyle="stop")
         dv.errorTitle, dv.error = "❌ 事项重复", "该事项已经存在！请勿重复添加。"
         ws.add_data_validation(dv); dv.add(f"C2:C{self.max_items+1}")
 
         full_row_range = f"A2:Z{self.max_items + 1}"; visible_data_range = f"A2:E{self.max_items + 1}"
-        ws.conditional_formatting.add(full_row_range, FormulaRule(formula=[f'$C2=""'], font=Font(color="FFFFFF"), fill=PatternFill(start_color="FFFFFF", end_color="FFFFFF", fill_type="solid"), border=self.theme.get_no_border(), stopIfTrue=True))
-        ws.conditional_formatting.add(visible_data_range, FormulaRule(formula=['$C2<>""'], border=self.theme.get_border()))
-
-        for r_idx, row_data in enumerate([["生活", "早睡早起", 21, "✅🔥"], ["生活", "跑步", 21, "🏃‍♂️💪"], ["学习", "睡前阅读", 10, "📖💡"]], 2):
-            for c_idx, val in enumerate(row_data, 2): ws.cell(row=r_idx, column=c_idx, value=val)
+        self._add_cf(ws, full_row_range, FormulaRule(formula=[f'$C2=""'], font=self.theme.font(color="FFFFFF"), fill=self.theme.get_fill("FFFFFF"), border=self.theme.get_no_border(), stopIfTrue=True))
+        self._add_cf(ws, visible_data_range, FormulaRule(formula=['$C2<>""'], border=self.theme.get_border()))
+        self._finish_sheet(ws)
 
     def _setup_annual_summary_sheet(self):
-        ws = self.wb.create_sheet("📅 年度汇总看板", 1)
+        # 单年时紧跟配置页；多年时按年份顺序依次追加
+        ws = self._create_sheet(self._annual_title(), 1 if len(self.years) == 1 else None)
         self._apply_common_settings(ws)
         ws.freeze_panes = None 
         
@@ -112,216 +638,404 @@ class HabitTrackerGenerator:
         dash_y = 1 + self.row_offset
         ws.merge_cells(start_row=dash_y, start_column=1+self.col_offset, end_row=dash_y, end_column=76+self.col_offset) 
         title_cell = ws.cell(row=dash_y, column=1+self.col_offset, value="🏆 全年度打卡看板")
-        title_cell.font = Font(bold=True, size=26); title_cell.alignment = Alignment(horizontal='center', vertical='center')
+        title_cell.font = self.theme.font(bold=True, size=26); title_cell.alignment = self.theme.alignment(horizontal='center', vertical='center')
         ws.row_dimensions[dash_y].height = 60 
         
         # --- 全指标排版 (4 + 3 两行排列，防止超出屏幕) ---
         metric_cols = [1+self.col_offset + i*17 for i in range(4)] # 增大间距，每项占 10 列，间隔 7 列
         
-        # 预先生成公式部分
-        avg_rate_formula = ",".join([f"'{self.year}年{m}月打卡'!E7" for m in range(1, 13)])
-        avg_pos_formula = ",".join([f"'{self.year}年{m}月打卡'!E8" for m in range(1, 13)])
-        total_hits_formula = ",".join([f"SUM('{self.year}年{m}月打卡'!H{self.main_table_start}:H{self.main_table_start+self.max_items-1})" for m in range(1, 13)])
-        active_days_formula = ",".join([f"'{self.year}年{m}月打卡'!E9" for m in range(1, 13)])
+        # 预先生成公式部分 (months<12 时只汇总已生成的月份，平均值与月均按这些月份计算)
+        avg_rate_formula = ",".join([self._month_ref(self.year, m, "E7") for m in range(1, self.months + 1)])
+        avg_pos_formula = ",".join([self._month_ref(self.year, m, "E8") for m in range(1, self.months + 1)])
+        total_hits_formula = ",".join([f"SUM({self._month_hits_ref(self.year, m)})" for m in range(1, self.months + 1)])
+        active_days_formula = ",".join([self._month_ref(self.year, m, "E9") for m in range(1, self.months + 1)])
 
         metrics = [
-            ("年度总事项", f'=COUNTIF(事项配置页!$C$2:$C${self.max_items+1}, "?*")', None),
+            ("年度总事项", f'=COUNTIF({self._cfg_items_ref()}, "?*")', None),
             ("年度平均打卡率", f"=IFERROR(AVERAGE({avg_rate_formula}), 0)", '0.0%'),
             ("年度平均积极率", f"=IFERROR(AVERAGE({avg_pos_formula}), 0)", '0.0%'),
             ("累计打卡总次数", f"=SUM({total_hits_formula})", None),
             ("累计活跃总天数", f"=SUM({active_days_formula})", None),
-            ("月均打卡次数", f"=IFERROR(SUM({total_hits_formula})/12, 0)", '0.0'),
-            ("年度综合评分", f"=({get_column_letter(metric_cols[2])}{dash_y+3}*40) + ({get_column_letter(metric_cols[1])}{dash_y+3}*20) + ({get_column_letter(metric_cols[0])}{dash_y+7}/365*20) + (IFERROR({get_column_letter(metric_cols[2])}{dash_y+3}/{get_column_letter(metric_cols[1])}{dash_y+3}, 0)*20)", '0.0')
+            ("月均打卡次数", f"=IFERROR(SUM({total_hits_formula})/{self.months}, 0)", '0.0'),
+            ("年度综合评分", f"=({self.cols[metric_cols[2]]}{dash_y+3}*40) + ({self.cols[metric_cols[1]]}{dash_y+3}*20) + ({self.cols[metric_cols[0]]}{dash_y+7}/365*20) + (IFERROR({self.cols[metric_cols[2]]}{dash_y+3}/{self.cols[metric_cols[1]]}{dash_y+3}, 0)*20)", '0.0')
         ]
 
+        if self.snapshot is not None:
+            metrics = [(label, value, fmt) for (label, _, fmt), value in zip(metrics, self.snapshot.annual_metrics())]
+
         for i, (label, formula, fmt) in enumerate(metrics):
             # 前 4 个在第一行 (dash_y+2)，后 3 个在第二行 (dash_y+6)
             row_off = 2 if i < 4 else 6
             curr_c = metric_cols[i % 4]
             
             ws.merge_cells(start_row=dash_y+row_off, start_column=curr_c, end_row=dash_y+row_off, end_column=curr_c+9)
-            ws.cell(row=dash_y+row_off, column=curr_c, value=label).fill = l_fill; ws.cell(row=dash_y+row_off, column=curr_c).alignment = Alignment(horizontal='center', vertical='center')
+            ws.cell(row=dash_y+row_off, column=curr_c, value=label).fill = l_fill; ws.cell(row=dash_y+row_off, column=curr_c).alignment = self.theme.alignment(horizontal='center', vertical='center')
             ws.merge_cells(start_row=dash_y+row_off+1, start_column=curr_c, end_row=dash_y+row_off+2, end_column=curr_c+9)
             val_cell = ws.cell(row=dash_y+row_off+1, column=curr_c, value=formula)
-            val_cell.font = Font(bold=True, size=28); val_cell.alignment = Alignment(horizontal='center', vertical='center'); val_cell.border = c_border
+            val_cell.font = self.theme.font(bold=True, size=28); val_cell.alignment = self.theme.alignment(horizontal='center', vertical='center'); val_cell.border = c_border
             if fmt: val_cell.number_format = fmt
 
         # 画廊排版调整
         gallery_start_y = dash_y + 11 
-        block_width, block_height = 34, 18 
+        self._gallery_columns(ws)
+        if self.gallery_page_size is None: self._setup_gallery(ws, self._gallery_slots(), gallery_start_y)
+        else: self._setup_gallery_index(ws, gallery_start_y)
+        self._finish_sheet(ws)
+
+    # ==========================================
+    # 🖼️ 年度画廊：每个事项一个「12 月 × 31 日」方块，每行两个
+    # ==========================================
+    def _gallery_slots(self):
+        if self.gallery_slots is not None: return list(self.gallery_slots)
+        if self.gallery == "full": return list(range(self.max_items))
+        return [i for i, item in enumerate(self.items) if len(item) > 1 and item[1] not in (None, "")]
+
+    def _gallery_pages(self):
+        slots = self._gallery_slots()
+        return [slots[k:k + self.gallery_page_size] for k in range(0, len(slots), self.gallery_page_size)] or [[]]
+
+    def _setup_gallery_index(self, ws, start_y):
+        # 分页模式下年度看板的画廊目录：每页一行，点击跳转
+        h_fill, c_border, center = self.theme.get_fill(self.theme.HEADER_COLOR), self.theme.get_border(), self.theme.alignment(horizontal='center', vertical='center')
+        ws.merge_cells(start_row=start_y, start_column=1+self.col_offset, end_row=start_y, end_column=32+self.col_offset)
+        head = ws.cell(row=start_y, column=1+self.col_offset, value="🖼️ 年度画廊目录")
+        head.font = self.theme.font(bold=True, size=16); head.alignment = self.theme.alignment(horizontal='left', vertical='center')
+        ws.row_dimensions[start_y].height = 35
+        for p, chunk in enumerate(self._gallery_pages(), 1):
+            r = start_y + p
+            ws.row_dimensions[r].height = 25
+            ws.merge_cells(start_row=r, start_column=1+self.col_offset, end_row=r, end_column=10+self.col_offset)
+            link = ws.cell(row=r, column=1+self.col_offset, value=f'=HYPERLINK("#\'{self._gallery_title(p)}\'!A1", "📖 第 {p} 页")')
+            link.font = self.theme.font(bold=True, color="2563EB", underline="single"); link.fill = h_fill; link.border = c_border; link.alignment = center
+            ws.merge_cells(start_row=r, start_column=11+self.col_offset, end_row=r, end_column=32+self.col_offset)
+            span = f"事项序号 {chunk[0] + 1} ~ {chunk[-1] + 1}" if chunk else "暂无事项"
+            ws.cell(row=r, column=11+self.col_offset, value=f"{span}（共 {len(chunk)} 项）").alignment = self.theme.alignment(horizontal='left', vertical='center')
+
+    def _setup_gallery_sheets(self):
+        if self.gallery_page_size is None: return
+        for p, chunk in enumerate(self._gallery_pages(), 1):
+            with self._phase(self._year_phase(f"gallery:{p}")):
+                ws = self._create_sheet(self._gallery_title(p), 1 + p if len(self.years) == 1 else None)
+                self._apply_common_settings(ws)
+                self._gallery_columns(ws)
+                dash_y = 1 + self.row_offset
+                ws.merge_cells(start_row=dash_y, start_column=1+self.col_offset, end_row=dash_y, end_column=50+self.col_offset)
+                title = ws.cell(row=dash_y, column=1+self.col_offset, value=f"🖼️ 年度画廊 · 第 {p} 页")
+                title.font = self.theme.font(bold=True, size=22); title.alignment = self.theme.alignment(horizontal='left', vertical='center')
+                ws.row_dimensions[dash_y].height = 50
+                ws.merge_cells(start_row=dash_y, start_column=51+self.col_offset, end_row=dash_y, end_column=66+self.col_offset)
+                back = ws.cell(row=dash_y, column=51+self.col_offset, value=f'=HYPERLINK("#\'{self._annual_title()}\'!A1", "↩ 返回年度看板")')
+                back.font = self.theme.font(color="2563EB", underline="single"); back.alignment = self.theme.alignment(horizontal='right', vertical='center')
+                self._setup_gallery(ws, chunk, dash_y + 2)
+                self._finish_sheet(ws)
+
+    def _gallery_columns(self, ws, block_width=34):
+        # 画廊列宽：年度看板的指标卡片也按此网格排布
         ws.column_dimensions['A'].width = 3
         ws.column_dimensions['B'].width = 3
         for c in range(1, 120):
-            col_let = get_column_letter(c)
+            col_let = self.cols[c]
             if c <= self.col_offset: continue 
             adj_c = c - self.col_offset
             if (adj_c-1) % block_width == 0: ws.column_dimensions[col_let].width = 8 
             elif (adj_c-1) % block_width < 32: ws.column_dimensions[col_let].width = 4.5 # 进一步微调列宽
             else: ws.column_dimensions[col_let].width = 6 
 
-        for i in range(self.max_items):
-            col_idx, row_idx, cfg_r = (i % 2) * block_width + 1 + self.col_offset, (i // 2) * block_height + gallery_start_y, i + 2
+    def _setup_gallery(self, ws, slots, gallery_start_y):
+        c_border, h_fill = self.theme.get_border(), self.theme.get_fill(self.theme.HEADER_COLOR)
+        block_width, block_height = 34, 18 
+        cols, center = self.cols, self.theme.alignment(horizontal='center', vertical='center')
+        day_font, blank_fill = self.theme.font(size=11), self.theme.get_fill("F1F5F9")
+        day_tpls = self._gallery_day_templates()
+        # 空事项方块隐藏：方块对应连续的配置行时由行列位置反推配置行，所有方块共用同一条规则；否则每个方块各自判断
+        contiguous = slots == list(range(slots[0], slots[0] + len(slots))) if slots else True
+        hide_formula = f'INDEX({self._cfg_items_ref()}, INT((ROW()-{gallery_start_y})/{block_height})*2+INT((COLUMN()-{1+self.col_offset})/{block_width})+{slots[0] + 1 if slots else 1})=""'
+        self._release(ws, gallery_start_y)
+        for pos, i in enumerate(slots):
+            col_idx, row_idx, cfg_r = (pos % 2) * block_width + 1 + self.col_offset, (pos // 2) * block_height + gallery_start_y, i + 2
             ws.merge_cells(start_row=row_idx, start_column=col_idx, end_row=row_idx, end_column=col_idx + 31)
-            title_cell = ws.cell(row=row_idx, column=col_idx, value=f'=IF(事项配置页!$C${cfg_r}<>"", "🔥 " & 事项配置页!$C${cfg_r}, "")')
-            title_cell.font = Font(bold=True, size=16); title_cell.alignment = Alignment(horizontal='left', vertical='center')
+            title_cell = ws.cell(row=row_idx, column=col_idx, value=f'=IF(事项配置页!$C${cfg_r}<>"", "🔥 " & 事项配置页!$C${cfg_r}, "")' if self.snapshot is None else self.snapshot.gallery_title(i))
+            title_cell.font = self.theme.font(bold=True, size=16); title_cell.alignment = self.theme.alignment(horizontal='left', vertical='center')
             ws.row_dimensions[row_idx].height = 35
 
-            block_range = f"{get_column_letter(col_idx)}{row_idx}:{get_column_letter(col_idx+31)}{row_idx+13}"
-            ws.conditional_formatting.add(block_range, FormulaRule(formula=[f'事项配置页!$C${cfg_r}=""'], font=Font(color="FFFFFF"), fill=PatternFill(start_color="FFFFFF", end_color="FFFFFF", fill_type="solid"), border=self.theme.get_no_border(), stopIfTrue=True))
+            block_range = f"{cols[col_idx]}{row_idx}:{cols[col_idx+31]}{row_idx+13}"
+            self._add_cf(ws, block_range, FormulaRule(formula=[hide_formula if contiguous else f'事项配置页!$C${cfg_r}=""'], font=self.theme.font(color="FFFFFF"), fill=self.theme.get_fill("FFFFFF"), border=self.theme.get_no_border(), stopIfTrue=True))
 
             for d in range(1, 32):
                 c = col_idx + d; cell = ws.cell(row=row_idx+1, column=c, value=d)
-                cell.fill = h_fill; cell.border = c_border; cell.alignment = Alignment(horizontal='center', vertical='center')
+                cell.fill = h_fill; cell.border = c_border; cell.alignment = center
 
+            data_row = self.main_table_start + i
             for m in range(1, 13):
                 r = row_idx + 1 + m; ws.row_dimensions[r].height = 22.5 # 微调行高为 22.5，保持正方形比例
-                ws.cell(row=r, column=col_idx, value=f"{m}月").fill = h_fill; ws.cell(row=r, column=col_idx).border = c_border; ws.cell(row=r, column=col_idx).alignment = Alignment(horizontal='center', vertical='center')
-                m_name = f"{self.year}年{m}月打卡"; num_days = calendar.monthrange(self.year, m)[1]
+                ws.cell(row=r, column=col_idx, value=f"{m}月").fill = h_fill; ws.cell(row=r, column=col_idx).border = c_border; ws.cell(row=r, column=col_idx).alignment = center
+                # 引用月度表中 M 列以后的每日打卡数据：整月公式一次性批量拼好
+                if self.snapshot is None: formulas = [tpl and tpl.format(data_row, cfg_r) for tpl in day_tpls[m]]
+                else: formulas = [self.snapshot.gallery_day(i, m, d) for d in range(1, len(day_tpls[m]) + 1)]
                 for d in range(1, 32):
-                    curr_c = col_idx + d
-                    if d <= num_days:
-                        # 引用月度表中 M 列以后的每日打卡数据
-                        formula = f'=IF(事项配置页!$C${cfg_r}="", "", IF(\'{m_name}\'!{get_column_letter(d + 12)}{16 + i}<>"", \'{m_name}\'!{get_column_letter(d + 12)}{16 + i}, ""))'
-                        cell = ws.cell(row=r, column=curr_c, value=formula)
-                        cell.alignment = Alignment(horizontal='center', vertical='center')
-                        cell.font = Font(size=11) # 字体适配 22.5 行高
+                    cell = ws.cell(row=r, column=col_idx + d)
+                    if d <= len(formulas):
+                        cell.value = formulas[d - 1]; cell.alignment = center
+                        cell.font = day_font # 字体适配 22.5 行高
                     else:
-                        ws.cell(row=r, column=curr_c).fill = PatternFill(start_color="F1F5F9", end_color="F1F5F9", fill_type="solid")
-                    ws.cell(row=r, column=curr_c).border = c_border
+                        cell.fill = blank_fill
+                    cell.border = c_border
 
-            heat_range = f"{get_column_letter(col_idx+1)}{row_idx+2}:{get_column_letter(col_idx+31)}{row_idx+13}"
-            ws.conditional_formatting.add(heat_range, FormulaRule(formula=[f'AND({get_column_letter(col_idx+1)}{row_idx+2}<>"", {get_column_letter(col_idx+1)}{row_idx+2}<>0)'], fill=self.theme.get_fill(self.theme.SUCCESS_BG_COLOR), font=Font(color=self.theme.SUCCESS_TEXT_COLOR, bold=True, size=11), border=c_border))
+            heat_range = f"{cols[col_idx+1]}{row_idx+2}:{cols[col_idx+31]}{row_idx+13}"
+            self._add_cf(ws, heat_range, FormulaRule(formula=[f'AND({cols[col_idx+1]}{row_idx+2}<>"", {cols[col_idx+1]}{row_idx+2}<>0)'], fill=self.theme.get_fill(self.theme.SUCCESS_BG_COLOR), font=self.theme.font(color=self.theme.SUCCESS_TEXT_COLOR, bold=True, size=11), border=c_border))
+            # 每行两个方块，右侧方块写完即可写出这一行方块
+            if pos % 2 == 1: self._release(ws, row_idx + block_height)
 
     def _setup_monthly_sheets(self):
-        for month_num in range(1, 13):
-            ws = self.wb.create_sheet(title=f"{self.year}年{month_num}月打卡")
-            num_days = calendar.monthrange(self.year, month_num)[1]; self._apply_common_settings(ws); ws.freeze_panes = f"M{self.main_table_start}"
-            c_border, l_fill, d_fill, h_fill = self.theme.get_border(), self.theme.get_fill(self.theme.SUMMARY_LABEL_COLOR), self.theme.get_fill(self.theme.DASHBOARD_COLOR), self.theme.get_fill(self.theme.HEADER_COLOR)
-
-            dash_y = self.row_offset + 1; ws.merge_cells(start_row=dash_y, start_column=3, end_row=dash_y, end_column=12)
-            ws.cell(row=dash_y, column=3, value="🏆 我的坚持成就榜").font = Font(bold=True, size=16); ws.cell(row=dash_y, column=3).alignment = Alignment(horizontal='center', vertical='center')
-            stat_row = dash_y + 1; ws.row_dimensions[stat_row].height = 35
-            ws.merge_cells(start_row=stat_row, start_column=3, end_row=stat_row, end_column=4)
-            ws.cell(row=stat_row, column=3, value="成长维度"); ws.cell(row=stat_row, column=5, value="当前状态"); ws.cell(row=stat_row, column=6, value="对比\n上月")
-            for c in range(3, 7): ws.cell(row=stat_row, column=c).font = Font(bold=True, size=12); ws.cell(row=stat_row, column=c).fill = l_fill; ws.cell(row=stat_row, column=c).border = c_border; ws.cell(row=stat_row, column=c).alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-
-            helper_row = self.main_table_start + self.max_items
-            for d in range(1, num_days + 1):
-                col_let = get_column_letter(d + 10 + self.col_offset); ws.cell(row=helper_row, column=d + 10 + self.col_offset, value=f'=IF(COUNTA({col_let}{self.main_table_start}:{col_let}{self.main_table_start+self.max_items-1})>0, 1, 0)')
-            ws.row_dimensions[helper_row].visible = False 
-
-            labels = ["事项", "坚持事项", "平均打卡率", "平均积极率", "累计活跃天", "月度综合评分"]
-            for i, label in enumerate(labels):
-                r = i + 1 + stat_row; ws.row_dimensions[r].height = 45 if i == 0 else 35
-                ws.merge_cells(start_row=r, start_column=3, end_row=r, end_column=4)
-                cell_l = ws.cell(row=r, column=3, value=label); cell_l.border = c_border; ws.cell(row=r, column=4).border = c_border; cell_l.alignment = Alignment(horizontal='center', vertical='center', wrap_text=(i==0))
-                val_c, mom_c = ws.cell(row=r, column=5), ws.cell(row=r, column=6); val_c.border = mom_c.border = c_border; val_c.alignment = mom_c.alignment = Alignment(horizontal='center', vertical='center')
-                if i == 0: val_c.value = f'=COUNTIF(E{self.main_table_start}:E{self.main_table_start+self.max_items-1}, "?*")'
-                elif i == 1: val_c.value = f'=COUNTIF(H{self.main_table_start}:H{self.main_table_start+self.max_items-1},">0")'
-                elif i == 2: val_c.value, val_c.number_format = f'=IFERROR(AVERAGE(G{self.main_table_start}:G{self.main_table_start+self.max_items-1}),0)', '0.0%'
-                elif i == 3: val_c.value, val_c.number_format = f'=IFERROR(AVERAGE(J{self.main_table_start}:J{self.main_table_start+self.max_items-1}),0)', '0.0%'
-                elif i == 4: val_c.value = f'=SUM({get_column_letter(11+self.col_offset)}{helper_row}:{get_column_letter(num_days+10+self.col_offset)}{helper_row})'
-                elif i == 5: 
-                    # 月度综合评分逻辑：(积极率*40) + (打卡率*20) + (活跃天占比*20) + (质量比因子*20)
-                    # 引用：E7=平均打卡率, E8=平均积极率, E9=累计活跃天
-                    formula = f'=(E8*40) + (E7*20) + (E9/{num_days}*20) + (IFERROR(E8/E7, 0)*20)'
-                    val_c.value, val_c.number_format = formula, '0.0'
-                if month_num > 1:
-                    prev = f"{self.year}年{month_num-1}月打卡"; curr_cell = f"E{r}"; mom_c.value = f'=IFERROR(({curr_cell}-\'{prev}\'!{curr_cell})/\'{prev}\'!{curr_cell},0)'
-                else: mom_c.value = 0
-                mom_c.number_format = '0.0%'
-
-            dash_right = 11 + self.col_offset; ws.merge_cells(start_row=dash_y, start_column=dash_right, end_row=dash_y, end_column=num_days + 10 + self.col_offset)
-            ws.cell(row=dash_y, column=dash_right, value="🔥 事项坚持里程碑").font = Font(bold=True, size=16); ws.cell(row=dash_y, column=dash_right).alignment = Alignment(horizontal='center', vertical='center')
-            ws.cell(row=stat_row, column=10 + self.col_offset, value="习惯达成").fill = l_fill; ws.cell(row=stat_row, column=10 + self.col_offset).border = c_border; ws.cell(row=stat_row, column=10 + self.col_offset).alignment = Alignment(horizontal='center', vertical='center')
-            
-            # 顶部看板：增加对比上月的两个维度
-            milestone_labels = ["事项", "已坚持", "打卡率", "积极率", "打卡对比", "积极对比"]
-            for i, label in enumerate(milestone_labels):
-                cell = ws.cell(row=stat_row + i + 1, column=10 + self.col_offset, value=label); cell.fill = d_fill; cell.border = c_border; cell.alignment = Alignment(horizontal='center', vertical='center', wrap_text=(i==0))
+        for month_num in range(1, self.months + 1):
+            with self._phase(self._year_phase(f"month:{month_num}")): self._setup_monthly_sheet(month_num)
 
-            for i in range(self.max_items):
-                col_idx, m_r = i + 11 + self.col_offset, self.main_table_start + i
-                ws.cell(row=stat_row+1, column=col_idx, value=f"=IF(E{m_r}<>\"\", E{m_r}, \"\")").alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-                ws.cell(row=stat_row+2, column=col_idx, value=f"=IF(E{m_r}<>\"\", H{m_r}, \"\")").alignment = Alignment(horizontal='center', vertical='center')
-                ws.cell(row=stat_row+3, column=col_idx, value=f"=IF(E{m_r}<>\"\", IFERROR(G{m_r},0), \"\")").number_format = '0.0%'; ws.cell(row=stat_row+3, column=col_idx).alignment = Alignment(horizontal='center', vertical='center', shrink_to_fit=True)
-                ws.cell(row=stat_row+4, column=col_idx, value=f"=IF(E{m_r}<>\"\", IFERROR(J{m_r},0), \"\")").number_format = '0.0%'; ws.cell(row=stat_row+4, column=col_idx).alignment = Alignment(horizontal='center', vertical='center', shrink_to_fit=True)
-                ws.cell(row=stat_row+5, column=col_idx, value=f"=IF(E{m_r}<>\"\", IFERROR(K{m_r},0), \"\")").number_format = '0.0%'; ws.cell(row=stat_row+5, column=col_idx).alignment = Alignment(horizontal='center', vertical='center', shrink_to_fit=True)
-                ws.cell(row=stat_row+6, column=col_idx, value=f"=IF(E{m_r}<>\"\", IFERROR(L{m_r},0), \"\")").number_format = '0.0%'; ws.cell(row=stat_row+6, column=col_idx).alignment = Alignment(horizontal='center', vertical='center', shrink_to_fit=True)
-
-            ws.row_dimensions[self.remark_row].height = None 
-            ws.merge_cells(start_row=self.remark_row, start_column=1+self.col_offset, end_row=self.remark_row, end_column=10+self.col_offset)
-            for col_i in range(1+self.col_offset, 11+self.col_offset):
-                cell = ws.cell(row=self.remark_row, column=col_i); cell.fill = h_fill; cell.border = c_border
-                if col_i == 1+self.col_offset: cell.value = "📝 每日感悟 / 备忘录"; cell.font = Font(bold=True); cell.alignment = Alignment(horizontal='center', vertical='center')
-            for d in range(1, num_days+1): ws.cell(row=self.remark_row, column=d+10+self.col_offset).border = c_border; ws.cell(row=self.remark_row, column=d+10+self.col_offset).protection = Protection(locked=False); ws.cell(row=self.remark_row, column=d+10+self.col_offset).alignment = Alignment(horizontal='left', vertical='top', wrap_text=True)
-
-            ws.row_dimensions[self.main_table_start-2].height = 35; ws.row_dimensions[self.main_table_start-1].height = 35
-            ws.column_dimensions['A'].width = 3; ws.column_dimensions['B'].width = 3
-            headers_cfg = [("C", "序号", 8), ("D", "类别", 12), ("E", "事项", 25), ("F", "目标\n天数", 10), ("G", "打卡率", 12), ("H", "坚持\n天数", 12), ("I", "积极\n天数", 12), ("J", "积极率", 12), ("K", "打卡\n对比", 12), ("L", "积极\n对比", 12)]
-            for cl, label, width in headers_cfg:
-                ws.merge_cells(f"{cl}{self.main_table_start-2}:{cl}{self.main_table_start-1}"); cell = ws[f"{cl}{self.main_table_start-2}"]; cell.value = label; cell.font = Font(bold=True, size=13); cell.fill = h_fill; cell.border = c_border; cell.alignment = Alignment(horizontal='center', vertical='center', wrap_text=True); ws[f"{cl}{self.main_table_start-1}"].border = c_border; ws.column_dimensions[cl].width = width
-            for d in range(1, num_days+1):
-                col_idx = d+10+self.col_offset; dt = date(self.year, month_num, d)
-                for r, val in [(self.main_table_start-2, ["周一", "周二", "周三", "周四", "周五", "周六", "周日"][dt.weekday()]), (self.main_table_start-1, d)]:
-                    c = ws.cell(row=r, column=col_idx, value=val); c.font = Font(bold=True, size=11); c.fill = h_fill; c.border = c_border; c.alignment = Alignment(horizontal='center', vertical='center')
-                ws.column_dimensions[get_column_letter(col_idx)].width = 8.5 
-
-            dv_lock = DataValidation(type="custom", formula1=f'=$E{self.main_table_start}<>""', showErrorMessage=True, errorStyle="stop")
-            dv_lock.errorTitle, dv_lock.error = "❌ 无法打卡", "该行尚未设置【事项】！请先前往事项配置页添加事项。"
-            ws.add_data_validation(dv_lock); dv_lock.add(f"{get_column_letter(11+self.col_offset)}{self.main_table_start}:{get_column_letter(num_days+10+self.col_offset)}{self.main_table_start+self.max_items-1}")
+    def _setup_monthly_sheet(self, month_num):
+        ws = self._create_sheet(f"{self.year}年{month_num}月打卡")
+        num_days = calendar.monthrange(self.year, month_num)[1]; self._apply_common_settings(ws); ws.freeze_panes = f"M{self.main_table_start}"
+        c_border, l_fill, d_fill, h_fill = self.theme.get_border(), self.theme.get_fill(self.theme.SUMMARY_LABEL_COLOR), self.theme.get_fill(self.theme.DASHBOARD_COLOR), self.theme.get_fill(self.theme.HEADER_COLOR)
+
+        dash_y = self.row_offset + 1; ws.merge_cells(start_row=dash_y, start_column=3, end_row=dash_y, end_column=12)
+        ws.cell(row=dash_y, column=3, value="🏆 我的坚持成就榜").font = self.theme.font(bold=True, size=16); ws.cell(row=dash_y, column=3).alignment = self.theme.alignment(horizontal='center', vertical='center')
+        stat_row = dash_y + 1; ws.row_dimensions[stat_row].height = 35
+        ws.merge_cells(start_row=stat_row, start_column=3, end_row=stat_row, end_column=4)
+        ws.cell(row=stat_row, column=3, value="成长维度"); ws.cell(row=stat_row, column=5, value="当前状态"); ws.cell(row=stat_row, column=6, value="对比\n上月")
+        for c in range(3, 7): ws.cell(row=stat_row, column=c).font = self.theme.font(bold=True, size=12); ws.cell(row=stat_row, column=c).fill = l_fill; ws.cell(row=stat_row, column=c).border = c_border; ws.cell(row=stat_row, column=c).alignment = self.theme.alignment(horizontal='center', vertical='center', wrap_text=True)
+
+        helper_row = self.main_table_start + self.max_items
+        streak_row = helper_row + 1 + (self.max_items if self.positive_strategy == "helper" else 0)
+
+        labels = ["事项", "坚持事项", "平均打卡率", "平均积极率", "累计活跃天", "月度综合评分"]
+        for i, label in enumerate(labels):
+            r = i + 1 + stat_row; ws.row_dimensions[r].height = 45 if i == 0 else 35
+            ws.merge_cells(start_row=r, start_column=3, end_row=r, end_column=4)
+            cell_l = ws.cell(row=r, column=3, value=label); cell_l.border = c_border; ws.cell(row=r, column=4).border = c_border; cell_l.alignment = self.theme.alignment(horizontal='center', vertical='center', wrap_text=(i==0))
+            val_c, mom_c = ws.cell(row=r, column=5), ws.cell(row=r, column=6); val_c.border = mom_c.border = c_border; val_c.alignment = mom_c.alignment = self.theme.alignment(horizontal='center', vertical='center')
+            if i == 0: val_c.value = f'=COUNTIF(E{self.main_table_start}:E{self.main_table_start+self.max_items-1}, "?*")'
+            elif i == 1: val_c.value = f'=COUNTIF(H{self.main_table_start}:H{self.main_table_start+self.max_items-1},">0")'
+            elif i == 2: val_c.value, val_c.number_format = f'=IFERROR(AVERAGE(G{self.main_table_start}:G{self.main_table_start+self.max_items-1}),0)', '0.0%'
+            elif i == 3: val_c.value, val_c.number_format = f'=IFERROR(AVERAGE(J{self.main_table_start}:J{self.main_table_start+self.max_items-1}),0)', '0.0%'
+            elif i == 4: val_c.value = f'=SUM({self.cols[11+self.col_offset]}{helper_row}:{self.cols[num_days+10+self.col_offset]}{helper_row})'
+            elif i == 5: 
+                # 月度综合评分逻辑：(积极率*40) + (打卡率*20) + (活跃天占比*20) + (质量比因子*20)
+                # 引用：E7=平均打卡率, E8=平均积极率, E9=累计活跃天
+                formula = f'=(E8*40) + (E7*20) + (E9/{num_days}*20) + (IFERROR(E8/E7, 0)*20)'
+                val_c.value, val_c.number_format = formula, '0.0'
+            prev = self._prev_month(month_num)
+            if prev:
+                curr_cell = f"E{r}"; prev_ref = self._month_ref(*prev, curr_cell); mom_c.value = f'=IFERROR(({curr_cell}-{prev_ref})/{prev_ref},0)'
+            else: mom_c.value = 0
+            mom_c.number_format = '0.0%'
+
+        dash_right = 11 + self.col_offset; ws.merge_cells(start_row=dash_y, start_column=dash_right, end_row=dash_y, end_column=num_days + 10 + self.col_offset)
+        ws.cell(row=dash_y, column=dash_right, value="🔥 事项坚持里程碑").font = self.theme.font(bold=True, size=16); ws.cell(row=dash_y, column=dash_right).alignment = self.theme.alignment(horizontal='center', vertical='center')
+        ws.cell(row=stat_row, column=10 + self.col_offset, value="习惯达成").fill = l_fill; ws.cell(row=stat_row, column=10 + self.col_offset).border = c_border; ws.cell(row=stat_row, column=10 + self.col_offset).alignment = self.theme.alignment(horizontal='center', vertical='center')
+        
+        # 顶部看板：增加对比上月的两个维度
+        milestone_labels = ["事项", "已坚持", "打卡率", "积极率", "打卡对比", "积极对比"]
+        for i, label in enumerate(milestone_labels):
+            cell = ws.cell(row=stat_row + i + 1, column=10 + self.col_offset, value=label); cell.fill = d_fill; cell.border = c_border; cell.alignment = self.theme.alignment(horizontal='center', vertical='center', wrap_text=(i==0))
+
+        for i in range(self.max_items):
+            col_idx, m_r = i + 11 + self.col_offset, self.main_table_start + i
+            ws.cell(row=stat_row+1, column=col_idx, value=f"=IF(E{m_r}<>\"\", E{m_r}, \"\")").alignment = self.theme.alignment(horizontal='center', vertical='center', wrap_text=True)
+            ws.cell(row=stat_row+2, column=col_idx, value=f"=IF(E{m_r}<>\"\", H{m_r}, \"\")").alignment = self.theme.alignment(horizontal='center', vertical='center')
+            ws.cell(row=stat_row+3, column=col_idx, value=f"=IF(E{m_r}<>\"\", IFERROR(G{m_r},0), \"\")").number_format = '0.0%'; ws.cell(row=stat_row+3, column=col_idx).alignment = self.theme.alignment(horizontal='center', vertical='center', shrink_to_fit=True)
+            ws.cell(row=stat_row+4, column=col_idx, value=f"=IF(E{m_r}<>\"\", IFERROR(J{m_r},0), \"\")").number_format = '0.0%'; ws.cell(row=stat_row+4, column=col_idx).alignment = self.theme.alignment(horizontal='center', vertical='center', shrink_to_fit=True)
+            ws.cell(row=stat_row+5, column=col_idx, value=f"=IF(E{m_r}<>\"\", IFERROR(K{m_r},0), \"\")").number_format = '0.0%'; ws.cell(row=stat_row+5, column=col_idx).alignment = self.theme.alignment(horizontal='center', vertical='center', shrink_to_fit=True)
+            ws.cell(row=stat_row+6, column=col_idx, value=f"=IF(E{m_r}<>\"\", IFERROR(L{m_r},0), \"\")").number_format = '0.0%'; ws.cell(row=stat_row+6, column=col_idx).alignment = self.theme.alignment(horizontal='center', vertical='center', shrink_to_fit=True)
+        if self.streaks: self._setup_streak_rows(ws, month_num, num_days, stat_row + 7, streak_row)
+
+        ws.row_dimensions[self.remark_row].height = None 
+        ws.merge_cells(start_row=self.remark_row, start_column=1+self.col_offset, end_row=self.remark_row, end_column=10+self.col_offset)
+        for col_i in range(1+self.col_offset, 11+self.col_offset):
+            cell = ws.cell(row=self.remark_row, column=col_i); cell.fill = h_fill; cell.border = c_border
+            if col_i == 1+self.col_offset: cell.value = "📝 每日感悟 / 备忘录"; cell.font = self.theme.font(bold=True); cell.alignment = self.theme.alignment(horizontal='center', vertical='center')
+        for d in range(1, num_days+1): ws.cell(row=self.remark_row, column=d+10+self.col_offset).border = c_border; ws.cell(row=self.remark_row, column=d+10+self.col_offset).protection = self.theme.protection(locked=False); ws.cell(row=self.remark_row, column=d+10+self.col_offset).alignment = self.theme.alignment(horizontal='left', vertical='top', wrap_text=True)
+
+        ws.row_dimensions[self.main_table_start-2].height = 35; ws.row_dimensions[self.main_table_start-1].height = 35
+        ws.column_dimensions['A'].width = 3; ws.column_dimensions['B'].width = 3
+        headers_cfg = [("C", "序号", 8), ("D", "类别", 12), ("E", "事项", 25), ("F", "目标\n天数", 10), ("G", "打卡率", 12), ("H", "坚持\n天数", 12), ("I", "积极\n天数", 12), ("J", "积极率", 12), ("K", "打卡\n对比", 12), ("L", "积极\n对比", 12)]
+        for cl, label, width in headers_cfg:
+            ws.merge_cells(f"{cl}{self.main_table_start-2}:{cl}{self.main_table_start-1}"); cell = ws[f"{cl}{self.main_table_start-2}"]; cell.value = label; cell.font = self.theme.font(bold=True, size=13); cell.fill = h_fill; cell.border = c_border; cell.alignment = self.theme.alignment(horizontal='center', vertical='center', wrap_text=True); ws[f"{cl}{self.main_table_start-1}"].border = c_border; ws.column_dimensions[cl].width = width
+        for d in range(1, num_days+1):
+            col_idx = d+10+self.col_offset; dt = date(self.year, month_num, d)
+            for r, val in [(self.main_table_start-2, ["周一", "周二", "周三", "周四", "周五", "周六", "周日"][dt.weekday()]), (self.main_table_start-1, d)]:
+                c = ws.cell(row=r, column=col_idx, value=val); c.font = self.theme.font(bold=True, size=11); c.fill = h_fill; c.border = c_border; c.alignment = self.theme.alignment(horizontal='center', vertical='center')
+            ws.column_dimensions[self.cols[col_idx]].width = 8.5 
+
+        dv_lock = DataValidation(type="custom", formula1=f'=$E{self.main_table_start}<>""', showErrorMessage=True, errorStyle="stop")
+        dv_lock.errorTitle, dv_lock.error = "❌ 无法打卡", "该行尚未设置【事项】！请先前往事项配置页添加事项。"
+        ws.add_data_validation(dv_lock); dv_lock.add(f"{self.cols[11+self.col_offset]}{self.main_table_start}:{self.cols[num_days+10+self.col_offset]}{self.main_table_start+self.max_items-1}")
+
+        row_tpls = self._monthly_row_templates(month_num, num_days)
+        self._release(ws, self.main_table_start)
+        for i in range(self.max_items):
+            row = self.main_table_start + i; cfg_r = i + 2; ws.row_dimensions[row].height = 40 
+            for si, (col_idx, tpl, align, num_fmt) in enumerate(row_tpls):
+                formula = tpl.format(row, cfg_r, helper_row + 1 + i)
+                if self.shared_formulas:
+                    col = self.cols[col_idx]
+                    formula = _SharedFormula(formula, si, f"{col}{row}:{col}{self.main_table_start + self.max_items - 1}" if i == 0 else None)
+                cell = ws.cell(row=row, column=col_idx, value=formula); cell.alignment = align
+                if num_fmt: cell.number_format = num_fmt
+            for d in range(1, num_days+1): 
+                c = ws.cell(row=row, column=d+10+self.col_offset)
+                c.protection = self.theme.protection(locked=False)
+                c.alignment = self.theme.alignment(horizontal='center', vertical='center')
+                c.font = self.theme.font(size=20)
+            self._release(ws, row + 1)
+        self._setup_monthly_helpers(ws, month_num, num_days, helper_row, streak_row)
+
+        end_let = self.cols[num_days+10+self.col_offset]; start_r, end_r = self.main_table_start, self.main_table_start + self.max_items - 1
+        rate_rule = ColorScaleRule(start_type='num', start_value=0, start_color=self.theme.SCALE_RED, mid_type='num', mid_value=0.5, mid_color=self.theme.SCALE_YELLOW, end_type='num', end_value=1, end_color=self.theme.SCALE_GREEN)
+        growth_rule = ColorScaleRule(start_type='num', start_value=-1, start_color=self.theme.SCALE_RED, mid_type='num', mid_value=0, mid_color=self.theme.SCALE_WHITE, end_type='num', end_value=1, end_color=self.theme.SCALE_GREEN)
 
+        self._add_cf(ws, f"C{start_r}:{end_let}{end_r}", FormulaRule(formula=[f'$E{start_r}=""'], font=self.theme.font(color="FFFFFF"), fill=self.theme.get_fill("FFFFFF"), border=self.theme.get_no_border(), stopIfTrue=True))
+        self._add_cf(ws, f"E{stat_row+3}", rate_rule); self._add_cf(ws, f"E{stat_row+4}", rate_rule); self._add_cf(ws, f"E{stat_row+6}", rate_rule)
+        self._add_cf(ws, f"F{stat_row+1}:F{stat_row+6}", growth_rule)
+        dash_heat_let, dash_heat_end = self.cols[11+self.col_offset], self.cols[10+self.col_offset+self.max_items]
+        self._add_cf(ws, f"{dash_heat_let}{stat_row+3}:{dash_heat_end}{stat_row+3}", rate_rule)
+        self._add_cf(ws, f"{dash_heat_let}{stat_row+4}:{dash_heat_end}{stat_row+4}", rate_rule)
+        self._add_cf(ws, f"{dash_heat_let}{stat_row+5}:{dash_heat_end}{stat_row+6}", growth_rule)
+        self._add_cf(ws, f"G{start_r}:G{end_r}", rate_rule); self._add_cf(ws, f"J{start_r}:J{end_r}", rate_rule); self._add_cf(ws, f"K{start_r}:L{end_r}", growth_rule)
+        self._add_cf(ws, f"M{start_r}:{end_let}{end_r}", FormulaRule(formula=[f'LEN(TRIM(M{start_r}))>0'], fill=self.theme.get_fill(self.theme.SUCCESS_BG_COLOR), font=self.theme.font(color=self.theme.SUCCESS_TEXT_COLOR, bold=True, size=20), border=c_border, stopIfTrue=True))
+        zebra_ranges = f"C{start_r}:F{end_r} H{start_r}:J{end_r} M{start_r}:{end_let}{end_r}"
+        self._add_cf(ws, zebra_ranges, FormulaRule(formula=[f'MOD(ROW()-{start_r},2)=1'], fill=self.theme.get_fill(self.theme.ZEBRA_COLOR)))
+        self._add_cf(ws, f"C{start_r}:{end_let}{end_r}", FormulaRule(formula=[f'$E{start_r}<>""'], border=c_border))
+        self._add_cf(ws, f"{dash_heat_let}{stat_row+1}:{dash_heat_end}{stat_row+(8 if self.streaks else 6)}", FormulaRule(formula=[f'{dash_heat_let}{stat_row+1}<>""'], border=c_border))
+        self._add_cf(ws, f"{dash_heat_let}{self.remark_row}:{end_let}{self.remark_row}", FormulaRule(formula=[f'LEN(TRIM({dash_heat_let}{self.remark_row}))>0'], fill=self.theme.get_fill(self.theme.REMARK_COLOR), stopIfTrue=True))
+        self._finish_sheet(ws)
+
+    def _setup_monthly_helpers(self, ws, month_num, num_days, helper_row, streak_row):
+        # 主表之下的隐藏辅助行 (活跃辅助行、积极辅助格、连续天数)，写在主表之后，流式写出时逐行写出
+        for d in range(1, num_days + 1):
+            col_let = self.cols[d + 10 + self.col_offset]; ws.cell(row=helper_row, column=d + 10 + self.col_offset, value=f'=IF(COUNTA({col_let}{self.main_table_start}:{col_let}{self.main_table_start+self.max_items-1})>0, 1, 0)')
+        ws.row_dimensions[helper_row].visible = False 
+        self._release(ws, helper_row + 1)
+        if self.positive_strategy == "helper":
+            # 辅助格区域：紧接在活跃辅助行之下，第 i 行对应主表第 i 个事项
+            helper_tpls = self._positive_helper_templates(num_days)
+            for i in range(self.max_items):
+                h_r = helper_row + 1 + i; ws.row_dimensions[h_r].hidden = True
+                for col_idx, tpl in helper_tpls: ws.cell(row=h_r, column=col_idx, value=tpl.format(self.main_table_start + i, i + 2))
+                self._release(ws, h_r + 1)
+        if self.streaks == "formulas":
+            # 连续天数辅助区：首行 C 列为「今天」是本月第几天 (未到本月为 0，已过为月末)，其下第 i 行逐日累计第 i 个事项；
+            # L 列接上月最后一天的累计值，连续打卡跨月 (多年模式下跨年) 不断开
+            ws.row_dimensions[streak_row].hidden = True
+            ws.cell(row=streak_row, column=3, value=f"=MAX(0, MIN({num_days}, TODAY()-DATE({self.year},{month_num},1)+1))")
+            prev = self._prev_month(month_num)
+            carry = f"'{prev[0]}年{prev[1]}月打卡'!{self.cols[calendar.monthrange(*prev)[1] + 10 + self.col_offset]}" if prev else None
+            streak_tpls = self._streak_helper_templates(num_days)
             for i in range(self.max_items):
-                row = self.main_table_start + i; cfg_r = i + 2; ws.row_dimensions[row].height = 40 
-                for col_idx, col_let in enumerate(["C", "D", "E", "F", "G", "H", "I", "J", "K", "L"], 1):
-                    cell = ws[f"{col_let}{row}"]; cell.alignment = Alignment(horizontal='center', vertical='center', wrap_text=(col_let=="E"), shrink_to_fit=(col_let in ["K", "L"]))
-                    if col_let == "C": cell.value = f"=IF(事项配置页!$C${cfg_r}<>\"\", 事项配置页!A{cfg_r}, \"\")"
-                    elif col_let == "D": cell.value = f"=IF(事项配置页!$C${cfg_r}<>\"\", 事项配置页!B{cfg_r}, \"\")"
-                    elif col_let == "E": cell.value = f"=IF(事项配置页!$C${cfg_r}<>\"\", 事项配置页!C{cfg_r}, \"\")"
-                    elif col_let == "F": cell.value = f"=IF(事项配置页!$C${cfg_r}<>\"\", 事项配置页!D{cfg_r}, \"\")"
-                    elif col_let == "G": cell.value = f'=IF(E{row}<>"", IFERROR(H{row}/F{row}, 0), "")'; cell.number_format = '0.0%'
-                    elif col_let == "H": cell.value = f'=IF(E{row}<>"", COUNTIF({get_column_letter(11+self.col_offset)}{row}:{get_column_letter(num_days + 10 + self.col_offset)}{row},"<>" ), "")'
-                    elif col_let == "I": 
-                        daily_range = f"{get_column_letter(11+self.col_offset)}{row}:{get_column_letter(num_days + 10 + self.col_offset)}{row}"
-                        cell.value = f'=IF(E{row}<>"", IF(事项配置页!$E${cfg_r}="", H{row}, SUMPRODUCT(--ISNUMBER(SEARCH({daily_range}, 事项配置页!$E${cfg_r}))*({daily_range}<>""))), "")'
-                    elif col_let == "J": cell.value = f'=IF(E{row}<>"", IFERROR(I{row}/F{row}, 0), "")'; cell.number_format = '0.0%'
-                    elif col_let == "K": # 打卡对比
-                        if month_num > 1: prev = f"{self.year}年{month_num-1}月打卡"; cell.value = f'=IF(E{row}<>"", IFERROR((G{row}-\'{prev}\'!G{row})/\'{prev}\'!G{row}, 0), "")'
-                        else: cell.value = f'=IF(E{row}<>"", 0, "")'
-                        cell.number_format = '0.0%'
-                    elif col_let == "L": # 积极对比
-                        if month_num > 1: prev = f"{self.year}年{month_num-1}月打卡"; cell.value = f'=IF(E{row}<>"", IFERROR((J{row}-\'{prev}\'!J{row})/\'{prev}\'!J{row}, 0), "")'
-                        else: cell.value = f'=IF(E{row}<>"", 0, "")'
-                        cell.number_format = '0.0%'
-                for d in range(1, num_days+1): 
-                    c = ws.cell(row=row, column=d+10+self.col_offset)
-                    c.protection = Protection(locked=False)
-                    c.alignment = Alignment(horizontal='center', vertical='center')
-                    c.font = Font(size=20)
-
-            end_let = get_column_letter(num_days+10+self.col_offset); start_r, end_r = self.main_table_start, self.main_table_start + self.max_items - 1
-            rate_rule = ColorScaleRule(start_type='num', start_value=0, start_color=self.theme.SCALE_RED, mid_type='num', mid_value=0.5, mid_color=self.theme.SCALE_YELLOW, end_type='num', end_value=1, end_color=self.theme.SCALE_GREEN)
-            growth_rule = ColorScaleRule(start_type='num', start_value=-1, start_color=self.theme.SCALE_RED, mid_type='num', mid_value=0, mid_color=self.theme.SCALE_WHITE, end_type='num', end_value=1, end_color=self.theme.SCALE_GREEN)
-
-            ws.conditional_formatting.add(f"C{start_r}:{end_let}{end_r}", FormulaRule(formula=[f'$E{start_r}=""'], font=Font(color="FFFFFF"), fill=PatternFill(start_color="FFFFFF", end_color="FFFFFF", fill_type="solid"), border=self.theme.get_no_border(), stopIfTrue=True))
-            ws.conditional_formatting.add(f"E{stat_row+3}", rate_rule); ws.conditional_formatting.add(f"E{stat_row+4}", rate_rule); ws.conditional_formatting.add(f"E{stat_row+6}", rate_rule)
-            ws.conditional_formatting.add(f"F{stat_row+1}:F{stat_row+6}", growth_rule)
-            dash_heat_let, dash_heat_end = get_column_letter(11+self.col_offset), get_column_letter(10+self.col_offset+self.max_items)
-            ws.conditional_formatting.add(f"{dash_heat_let}{stat_row+3}:{dash_heat_end}{stat_row+3}", rate_rule)
-            ws.conditional_formatting.add(f"{dash_heat_let}{stat_row+4}:{dash_heat_end}{stat_row+4}", rate_rule)
-            ws.conditional_formatting.add(f"{dash_heat_let}{stat_row+5}:{dash_heat_end}{stat_row+6}", growth_rule)
-            ws.conditional_formatting.add(f"G{start_r}:G{end_r}", rate_rule); ws.conditional_formatting.add(f"J{start_r}:J{end_r}", rate_rule); ws.conditional_formatting.add(f"K{start_r}:L{end_r}", growth_rule)
-            ws.conditional_formatting.add(f"M{start_r}:{end_let}{end_r}", FormulaRule(formula=[f'LEN(TRIM(M{start_r}))>0'], fill=self.theme.get_fill(self.theme.SUCCESS_BG_COLOR), font=Font(color=self.theme.SUCCESS_TEXT_COLOR, bold=True, size=20), border=c_border, stopIfTrue=True))
-            zebra_ranges = f"C{start_r}:F{end_r} H{start_r}:J{end_r} M{start_r}:{end_let}{end_r}"
-            ws.conditional_formatting.add(zebra_ranges, FormulaRule(formula=[f'MOD(ROW()-{start_r},2)=1'], fill=self.theme.get_fill(self.theme.ZEBRA_COLOR)))
-            ws.conditional_formatting.add(f"C{start_r}:{end_let}{end_r}", FormulaRule(formula=[f'$E{start_r}<>""'], border=c_border))
-            ws.conditional_formatting.add(f"{dash_heat_let}{stat_row+1}:{dash_heat_end}{stat_row+6}", FormulaRule(formula=[f'{dash_heat_let}{stat_row+1}<>""'], border=c_border))
-            ws.conditional_formatting.add(f"{dash_heat_let}{self.remark_row}:{end_let}{self.remark_row}", FormulaRule(formula=[f'LEN(TRIM({dash_heat_let}{self.remark_row}))>0'], fill=self.theme.get_fill(self.theme.REMARK_COLOR), stopIfTrue=True))
-
-    def _save(self):
-        self.wb.save(self.filename)
-        print(f"✅ V5 默认缩放90% & 留白优化版已生成！")
+                s_r = streak_row + 1 + i; ws.row_dimensions[s_r].hidden = True
+                ws.cell(row=s_r, column=10 + self.col_offset, value=f"={carry}{s_r}" if carry else 0)
+                for col_idx, tpl in streak_tpls: ws.cell(row=s_r, column=col_idx, value=tpl.format(self.main_table_start + i, s_r))
+                self._release(ws, s_r + 1)
+
+    def _setup_streak_rows(self, ws, month_num, num_days, top, streak_row):
+        # 看板「当前连续 / 最长连续」：当前连续取「今天」的累计值 (今天还没打卡时取昨天，不算中断)，最长连续为年初 (多年模式下为第一年年初) 至本月末的最大累计值
+        c_border, d_fill, center = self.theme.get_border(), self.theme.get_fill(self.theme.DASHBOARD_COLOR), self.theme.alignment(horizontal='center', vertical='center')
+        for k, label in enumerate(("当前连续", "最长连续")):
+            ws.row_dimensions[top + k].height = 35
+            cell = ws.cell(row=top + k, column=10 + self.col_offset, value=label); cell.fill = d_fill; cell.border = c_border; cell.alignment = center
+        prev_title = self._prev_month_title(month_num)
+        today = f"$C${streak_row}"
+        streak_values = self.streak_values
+        if self.streaks == "values" and streak_values is None:
+            # 未给出 streak_values (新建模板，尚无打卡)：已配置的事项记为 0，空行与公式版一样留空
+            streak_values = {(self.year, month_num, i): (0, 0) for i, item in enumerate(self.items) if len(item) > 1 and item[1] not in (None, "")}
+        for i in range(self.max_items):
+            col_idx, m_r, s_r = i + 11 + self.col_offset, self.main_table_start + i, streak_row + 1 + i
+            if self.streaks == "formulas":
+                run = f"{self.cols[10 + self.col_offset]}{s_r}:{self.cols[num_days + 10 + self.col_offset]}{s_r}"
+                prev_longest = f", '{prev_title}'!{self.cols[col_idx]}{top + 1}" if prev_title else ""
+                current = f'=IF(E{m_r}<>"", IF({today}=0, 0, MAX(INDEX({run}, {today}+1), INDEX({run}, {today}))), "")'
+                longest = f'=IF(E{m_r}<>"", MAX({run}{prev_longest}), "")'
+            else:
+                current, longest = streak_values.get((self.year, month_num, i), (None, None))
+            for k, v in enumerate((current, longest)): ws.cell(row=top + k, column=col_idx, value=v).alignment = center
+
+    # ==========================================
+    # 📈 同比环比分析 (多年模式)：每年每月的看板指标先汇总成一列，环比 / 同比只在本表的汇总区内相减，
+    # 公式数只随年数线性增长 (每个指标每年 13 行 × 3 列)
+    # ==========================================
+    def _annual_metric_cell(self, i):
+        # 年度看板第 i 个指标的数值格 (与 _setup_annual_summary_sheet 的排版一致)
+        dash_y = 1 + self.row_offset
+        return f"{self.cols[1 + self.col_offset + (i % 4) * 17]}{dash_y + (2 if i < 4 else 6) + 1}"
+
+    def _setup_yoy_sheet(self):
+        ws = self._create_sheet(self.YOY_TITLE, 1)
+        self._apply_common_settings(ws)
+        c_border, h_fill, l_fill = self.theme.get_border(), self.theme.get_fill(self.theme.HEADER_COLOR), self.theme.get_fill(self.theme.SUMMARY_LABEL_COLOR)
+        center = self.theme.alignment(horizontal='center', vertical='center')
+        growth_rule = ColorScaleRule(start_type='num', start_value=-1, start_color=self.theme.SCALE_RED, mid_type='num', mid_value=0, mid_color=self.theme.SCALE_WHITE, end_type='num', end_value=1, end_color=self.theme.SCALE_GREEN)
+        first_col, last_col = 1 + self.col_offset, 1 + self.col_offset + 3 * len(self.years)
+        ws.column_dimensions['A'].width = 3; ws.column_dimensions['B'].width = 3; ws.column_dimensions[self.cols[first_col]].width = 10
+        for c in range(first_col + 1, last_col + 1): ws.column_dimensions[self.cols[c]].width = 12
+
+        dash_y = 1 + self.row_offset
+        ws.merge_cells(start_row=dash_y, start_column=first_col, end_row=dash_y, end_column=last_col)
+        title = ws.cell(row=dash_y, column=first_col, value=f"📈 {self.years[0]}~{self.years[-1]} 跨年同比 / 环比分析")
+        title.font = self.theme.font(bold=True, size=20); title.alignment = center
+        ws.row_dimensions[dash_y].height = 50
+
+        # (指标, 月度表数值格, 年度看板指标序号, 数字格式)
+        metrics = [("平均打卡率", "E7", 1, '0.0%'), ("平均积极率", "E8", 2, '0.0%'), ("累计活跃天", "E9", 4, '0'), ("综合评分", "E10", 6, '0.0')]
+        for k, (label, month_cell, annual_i, fmt) in enumerate(metrics):
+            top = dash_y + 2 + k * 16
+            ws.merge_cells(start_row=top, start_column=first_col, end_row=top, end_column=last_col)
+            head = ws.cell(row=top, column=first_col, value=f"📊 {label}")
+            head.font = self.theme.font(bold=True, size=14); head.fill = l_fill; head.alignment = center
+            ws.row_dimensions[top].height = 30
+            ws.cell(row=top + 1, column=first_col, value="月份")
+            for r in range(top + 2, top + 15): ws.cell(row=r, column=first_col, value=f"{r - top - 1}月" if r < top + 14 else "全年")
+            ratio_ranges = []
+            for j, year in enumerate(self.years):
+                v = first_col + 1 + 3 * j; val_let, mom_let, yoy_let, prev_let = self.cols[v], self.cols[v + 1], self.cols[v + 2], self.cols[v - 3]
+                for c, text in ((v, f"{year}年"), (v + 1, "环比"), (v + 2, "同比")): ws.cell(row=top + 1, column=c, value=text)
+                for m in range(1, 14):
+                    r = top + 1 + m
+                    # 汇总列：逐月引用月度表看板，「全年」引用该年年度看板
+                    ws.cell(row=r, column=v, value=f"={self._month_ref(year, m, month_cell)}" if m <= 12 else f"={self._annual_ref(year, annual_i)}").number_format = fmt
+                    if m <= 12:
+                        # 环比：上一行；1 月取上一年 12 月 (上一年汇总列的最后一个月)
+                        prev = f"{val_let}{r-1}" if m > 1 else (f"{prev_let}{top + 13}" if j > 0 else None)
+                        ws.cell(row=r, column=v + 1, value=f"=IFERROR(({val_let}{r}-{prev})/{prev}, 0)" if prev else 0).number_format = '0.0%'
+                    if j > 0: ws.cell(row=r, column=v + 2, value=f"=IFERROR(({val_let}{r}-{prev_let}{r})/{prev_let}{r}, 0)").number_format = '0.0%'
+                ratio_ranges.append(f"{mom_let}{top + 2}:{yoy_let}{top + 14}")
+            for r in range(top + 1, top + 15):
+                ws.row_dimensions[r].height = 25
+                for c in range(first_col, last_col + 1):
+                    cell = ws.cell(row=r, column=c); cell.border = c_border; cell.alignment = center
+                    if r == top + 1 or c == first_col or r == top + 14: cell.fill = h_fill; cell.font = self.theme.font(bold=True)
+            self._add_cf(ws, " ".join(ratio_ranges), growth_rule)
+        self._finish_sheet(ws)
+
+    def _save(self, record=None, target=None, compresslevel=None):
+        # 与 Workbook.save 等价，但经由计时的 ZipFile 写出，以区分 XML 序列化与压缩写入的耗时
+        record = {} if record is None else record
+        target = self.filename if target is None else target
+        start = time.perf_counter()
+        # 写缓存值时先在内存中打包 (不压缩)，回写缓存值时再按 compresslevel 压缩到 target，省去一次落盘与重读
+        out = BytesIO() if self.cached_values else target
+        if self.cached_values: compression, level = ZIP_STORED, None
+        else: compression, level = (ZIP_STORED, None) if compresslevel == 0 else (ZIP_DEFLATED, compresslevel)
+        archive = _TimedZipFile(out, "w", compression, allowZip64=True, compresslevel=level)
+        self.wb.properties.modified = datetime.now(tz=timezone.utc).replace(tzinfo=None)
+        (_XmlExcelWriter if self.backend == "xml" else ExcelWriter)(self.wb, archive).save()
+        record["zip_seconds"] = archive.seconds
+        record["serialize_seconds"] = time.perf_counter() - start - archive.seconds
+        if self.cached_values:
+            start = time.perf_counter()
+            write_cached_values(out, FormulaEvaluator(self._cell_values), compresslevel, target)
+            record["cache_seconds"] = time.perf_counter() - start
+        return target
 
 if __name__ == "__main__":
     generator = HabitTrackerGenerator(year=2026)
     generator.generate()
+    print(f"✅ V5 默认缩放90% & 留白优化版已生成！")
+    for title, (before, after) in generator.cf_rule_counts().items(): print(f"   {title}: 条件格式规则 {before} -> {after}")
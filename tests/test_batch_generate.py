@@ -0,0 +1,41 @@
+import json
+import pytest
+from batch_generate import load_manifest, main, run_batch
+
+def write_jsonl(path, rows):
+    path.write_text("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in rows), encoding="utf-8")
+    return str(path)
+
+@pytest.mark.parametrize("filename", ["../x.xlsx", "sub/../../x.xlsx", "/tmp/x.xlsx", ".."])
+def test_filename_outside_out_dir_is_rejected(tmp_path, filename):
+    (job,) = load_manifest(write_jsonl(tmp_path / "m.jsonl", [{"user": "a", "filename": filename}]))
+    assert "error" in job and "--out-dir" in job["error"]
+
+def test_duplicate_filenames_are_rejected(tmp_path):
+    rows = [{"user": "a"}, {"user": "b", "filename": "a_2026.xlsx"}, {"user": "c", "filename": "sub/c.xlsx"}, {"user": "d", "filename": "sub/./c.xlsx"}]
+    jobs = load_manifest(write_jsonl(tmp_path / "m.jsonl", rows))
+    assert ["error" in j for j in jobs] == [False, True, False, True]
+    assert "第 1 行" in jobs[1]["error"] and "第 3 行" in jobs[3]["error"]
+
+def test_non_object_lines_are_rejected(tmp_path):
+    # 合法 JSON 但不是对象的行记为失败，不中断整批
+    path = tmp_path / "m.jsonl"
+    path.write_text('[1, 2]\n"x"\n{"user": "a"}\n', encoding="utf-8")
+    jobs = load_manifest(str(path))
+    assert ["error" in j for j in jobs] == [True, True, False]
+    assert "不是 JSON 对象" in jobs[0]["error"] and jobs[1]["user"] == "第2行" and jobs[2]["filename"] == "a_2026.xlsx"
+
+def test_run_batch_writes_inside_out_dir(tmp_path):
+    rows = [{"user": "a", "max_items": 5}, {"user": "b", "max_items": 5, "filename": "sub/b.xlsx"}, {"user": "c", "filename": "../c.xlsx"}]
+    out = tmp_path / "out"
+    summary = run_batch(load_manifest(write_jsonl(tmp_path / "m.jsonl", rows)), str(out), workers=2)
+    assert (summary["ok"], summary["failed"]) == (2, 1)
+    assert sorted(p.relative_to(out).as_posix() for p in out.rglob("*.xlsx")) == ["a_2026.xlsx", "sub/b.xlsx"]
+    assert not (tmp_path / "c.xlsx").exists()
+
+def test_streaming_with_cache_dir_is_rejected(tmp_path, capsys):
+    manifest = write_jsonl(tmp_path / "m.jsonl", [{"user": "a", "max_items": 5}])
+    with pytest.raises(SystemExit): main([manifest, "--out-dir", str(tmp_path), "--streaming", "--cache-dir", str(tmp_path / "cache")])
+    assert "--cache-dir" in capsys.readouterr().err
+    with pytest.raises(ValueError, match="cache_dir"): run_batch(load_manifest(manifest), str(tmp_path), streaming=True, cache_dir=str(tmp_path / "cache"))
+    assert not (tmp_path / "a_2026.xlsx").exists()
@@ -0,0 +1,18 @@
+from benchmark import compare
+
+def result(seconds=1.0, phases=None, sheets=None):
+    return {"id": "v5-50-2026", "seconds": seconds, "peak_mb": 10.0, "bytes": 1000, "phases": phases or {}, "sheets": sheets or {"表": [1, 2, 3]}}
+
+def test_compare_flags_phase_regressions():
+    base = {"results": [result(phases={"config": 0.2, "save": 0.5, "month:1": 0.05})]}
+    now = {"results": [result(phases={"config": 0.2, "save": 0.8, "month:1": 0.09})]}
+    regressions, changes = compare(now, base)
+    # month:1 低于 0.1s，计时抖动不算回归
+    assert len(regressions) == 1 and "save" in regressions[0]
+    assert changes == []
+
+def test_compare_reports_total_and_structure_changes():
+    base = {"results": [result()]}
+    regressions, changes = compare({"results": [result(seconds=2.0, sheets={"表": [1, 2, 4]})]}, base)
+    assert len(regressions) == 1 and "seconds" in regressions[0]
+    assert len(changes) == 1
@@ -0,0 +1,102 @@
+import io
+import zipfile
+import openpyxl
+import pytest
+from openpyxl.formatting.rule import ColorScaleRule
+from generate_excel_v5 import HabitTrackerGenerator, consolidate_cf
+from tracker_checks import VERIFY_ITEMS, verify_lazy_months, verify_positive_strategy, verify_streaming, verify_xml_backend
+
+YEAR, MAX_ITEMS = 2026, 8
+
+def zip_parts(data):
+    # 压缩包内各部件的内容 (文档时间戳除外)
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        return {name: zf.read(name) for name in zf.namelist() if name != "docProps/core.xml"}
+
+@pytest.mark.parametrize("seed", range(3))
+def test_positive_strategies_agree(seed):
+    assert verify_positive_strategy(YEAR, MAX_ITEMS, seed=seed) == []
+
+LAYOUTS = [
+    {}, {"positive_strategy": "helper"}, {"gallery": "configured", "gallery_page_size": 2, "items": VERIFY_ITEMS}, {"years": [YEAR - 1, YEAR]},
+    {"shared_formulas": True, "positive_strategy": "helper"},
+    {"streaks": "formulas", "positive_strategy": "helper", "years": [YEAR - 1, YEAR]},
+]
+
+@pytest.mark.parametrize("options", LAYOUTS)
+def test_xml_backend_matches_openpyxl(options):
+    assert verify_xml_backend(**{"year": YEAR, "max_items": MAX_ITEMS, **options}) == []
+
+@pytest.mark.parametrize("options", LAYOUTS)
+def test_streaming_matches_default(options):
+    assert verify_streaming(**{"year": YEAR, "max_items": MAX_ITEMS, **options}) == []
+
+def test_streaming_rejects_rows_already_written(tmp_path):
+    gen = HabitTrackerGenerator(filename=str(tmp_path / "s.xlsx"), year=YEAR, max_items=MAX_ITEMS, streaming=True)
+    ws = gen._create_sheet("s")
+    ws.cell(1, 1, "a"); ws.cell(3, 1, "b")
+    ws.release(3)
+    with pytest.raises(RuntimeError): ws.cell(2, 1, "c")
+    ws.cell(3, 2, "d"); ws.cell(5, 1, "e")
+    # 写完后保存，write-only 工作表随工作簿一起关闭
+    gen._finish_sheet(ws); gen._save()
+    saved = openpyxl.load_workbook(gen.filename)["s"]
+    assert [[c.value for c in row] for row in saved.iter_rows()] == [["a", None], [None, None], ["b", "d"], [None, None], ["e", None]]
+
+def test_streaming_counts_cells_and_values(tmp_path):
+    # 逐段写出时计数与缓存值在写出时记录；默认写出的计数还包含合并区的占位格，只比较取值 (输出等价由 verify_streaming 校验)
+    gens = [HabitTrackerGenerator(filename=str(tmp_path / f"{streaming}.xlsx"), year=YEAR, max_items=MAX_ITEMS, items=VERIFY_ITEMS, streaming=streaming, cached_values=True)
+            for streaming in (False, True)]
+    for gen in gens: gen.generate()
+    assert 0 < gens[1].cells_written <= gens[0].cells_written
+    assert gens[0]._cell_values == gens[1]._cell_values
+
+@pytest.mark.parametrize("start, months, options", [
+    (1, 12, {}), (3, 4, {}), (2, 12, {"gallery": "configured", "gallery_page_size": 2, "items": VERIFY_ITEMS}),
+    (5, 12, {"positive_strategy": "helper"}), (11, 12, {"shared_formulas": True}), (6, 9, {"streaks": "formulas"}),
+])
+def test_appended_months_match_direct_generation(start, months, options):
+    assert verify_lazy_months(start, months, **{"year": YEAR, "max_items": MAX_ITEMS, **options}) == []
+
+@pytest.mark.parametrize("backend", ["openpyxl", "xml"])
+def test_generate_targets_agree(tmp_path, backend):
+    # 路径、文件对象与 generate_bytes() 三种输出方式得到相同的工作簿
+    path = tmp_path / "out.xlsx"
+    HabitTrackerGenerator(filename=str(path), max_items=MAX_ITEMS, backend=backend).generate()
+    buf = io.BytesIO()
+    assert HabitTrackerGenerator(filename=None, max_items=MAX_ITEMS, backend=backend).generate(buf) is buf
+    data = HabitTrackerGenerator(filename=None, max_items=MAX_ITEMS, backend=backend).generate_bytes()
+    assert zip_parts(path.read_bytes()) == zip_parts(buf.getvalue()) == zip_parts(data)
+
+@pytest.mark.parametrize("cached_values", [False, True])
+def test_compresslevel(cached_values):
+    gen = lambda: HabitTrackerGenerator(filename=None, max_items=MAX_ITEMS, backend="xml", cached_values=cached_values)
+    stored, fast, deflated = gen().generate_bytes(compresslevel=0), gen().generate_bytes(compresslevel=1), gen().generate_bytes(compresslevel=9)
+    with zipfile.ZipFile(io.BytesIO(stored)) as zf: assert {i.compress_type for i in zf.infolist()} == {zipfile.ZIP_STORED}
+    with zipfile.ZipFile(io.BytesIO(deflated)) as zf: assert {i.compress_type for i in zf.infolist()} == {zipfile.ZIP_DEFLATED}
+    assert len(deflated) < len(fast) < len(stored)
+    assert zip_parts(stored) == zip_parts(fast) == zip_parts(deflated)
+
+@pytest.mark.parametrize("backend", ["openpyxl", "xml"])
+def test_cached_values_are_readable(tmp_path, backend):
+    # 不重算、只读缓存值 (data_only) 即可看到配置页、看板与月度表的结果
+    path = tmp_path / "cached.xlsx"
+    HabitTrackerGenerator(filename=str(path), year=YEAR, max_items=MAX_ITEMS, items=VERIFY_ITEMS, backend=backend, cached_values=True, streaks="formulas").generate()
+    wb = openpyxl.load_workbook(path, data_only=True)
+    config, annual, month = wb["事项配置页"], wb["📅 年度汇总看板"], wb[f"{YEAR}年1月打卡"]
+    n = len(VERIFY_ITEMS)
+    assert [config.cell(r, 1).value for r in range(2, MAX_ITEMS + 2)] == list(range(1, n + 1)) + [None] * (MAX_ITEMS - n)
+    assert annual["C6"].value == month["E5"].value == n and annual["C14"].value == "🔥 早睡早起"
+    # 月度主表 C~F 列取自配置页：序号、类别、事项、目标天数
+    assert [[month.cell(16 + i, c).value for c in range(3, 7)] for i in range(n)] == [[i + 1, *item[:3]] for i, item in enumerate(VERIFY_ITEMS)]
+    assert (month["E6"].value, month["E9"].value, annual["T6"].value, month["M12"].value) == (0, 0, 0, 0)
+    # 依赖 TODAY() 的「今天是本月第几天」与「当前连续」不写缓存值，留给 Excel 打开时重算
+    assert month["C25"].value is None and all(month.cell(11, 13 + i).value is None for i in range(n))
+    formulas = openpyxl.load_workbook(path)[f"{YEAR}年1月打卡"]
+    assert "TODAY()" in formulas["C25"].value and formulas["M11"].value.startswith("=IF(")
+
+def test_consolidate_cf_merges_only_range_independent_scales():
+    num = ColorScaleRule(start_type="num", start_value=0, start_color="FFFFFF", end_type="num", end_value=1, end_color="00FF00")
+    pct = ColorScaleRule(start_type="percentile", start_value=10, start_color="FFFFFF", end_type="max", end_color="00FF00")
+    merged = consolidate_cf([("A1:A5", num), ("C1:C5", num), ("E1:E5", pct), ("G1:G5", pct)])
+    assert [sqref for sqref, _ in merged] == ["A1:A5 C1:C5", "E1:E5", "G1:G5"]
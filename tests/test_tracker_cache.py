@@ -0,0 +1,30 @@
+import pytest
+from generate_excel_v5 import HabitTrackerGenerator
+from tracker_cache import TemplateCache
+from tracker_checks import VERIFY_ITEMS, compare_dumps, workbook_dump
+
+def test_cached_values_is_rejected(tmp_path):
+    cache = TemplateCache(str(tmp_path / "cache"))
+    with pytest.raises(ValueError, match="cached_values"): cache.key(VERIFY_ITEMS, max_items=8, cached_values=True)
+    with pytest.raises(ValueError, match="cached_values"): cache.generate(str(tmp_path / "out.xlsx"), VERIFY_ITEMS, max_items=8, cached_values=True)
+    assert not (tmp_path / "out.xlsx").exists()
+    assert list((tmp_path / "cache").iterdir()) == []
+
+@pytest.mark.parametrize("options", [{}, {"gallery": "configured", "gallery_page_size": 2}])
+def test_patched_template_matches_direct_generation(tmp_path, options):
+    cache = TemplateCache(str(tmp_path / "cache"))
+    for n, items in enumerate([VERIFY_ITEMS, VERIFY_ITEMS[:3]]):
+        cached, direct = tmp_path / f"cached{n}.xlsx", tmp_path / f"direct{n}.xlsx"
+        cache.generate(str(cached), items, max_items=8, **options)
+        HabitTrackerGenerator(filename=str(direct), max_items=8, items=items, **options).generate()
+        assert compare_dumps(workbook_dump(str(direct)), workbook_dump(str(cached))) == []
+
+def test_compresslevel_applies_to_output(tmp_path):
+    # 两个缓存共用同一份模板，输出只差压缩级别：内容相同，9 级比 1 级小
+    sizes = {}
+    for level in (1, 9):
+        out = tmp_path / f"level{level}.xlsx"
+        TemplateCache(str(tmp_path / "cache"), compresslevel=level).generate(str(out), VERIFY_ITEMS, max_items=8)
+        sizes[level] = out.stat().st_size
+    assert sizes[9] < sizes[1]
+    assert compare_dumps(workbook_dump(str(tmp_path / "level1.xlsx")), workbook_dump(str(tmp_path / "level9.xlsx"))) == []
@@ -0,0 +1,66 @@
+import csv
+import io
+from datetime import date
+import openpyxl
+import pytest
+from generate_excel_v5 import HabitTrackerGenerator
+from tracker_checks import VERIFY_ITEMS, random_checkins
+from tracker_export import FIELDS, iter_records, read_npz, write_csv, write_npz
+from tracker_formula import as_text
+from tracker_reader import POSITIVE, is_blank, read_checkins
+
+YEAR = 2026
+# 感悟：1 月 1 日同时有打卡，其余两天清空当天打卡，只留感悟
+REMARKS = {(1, 1): "新年第一天", (3, 8): "休息日", (12, 31): " 全年完成 "}
+REMARK_ONLY = {(3, 8), (12, 31)}
+
+@pytest.fixture(scope="module")
+def filled(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("export") / "filled.xlsx")
+    gen = HabitTrackerGenerator(filename=path, year=YEAR, max_items=8, items=VERIFY_ITEMS)
+    gen.generate()
+    checkins = random_checkins(gen, 0.1, seed=0)
+    checkins[(1, 0, 1)] = "✅"
+    wb = openpyxl.load_workbook(path)
+    for (m, i, d), v in checkins.items():
+        if (m, d) not in REMARK_ONLY: wb[f"{YEAR}年{m}月打卡"].cell(gen.main_table_start + i, d + 10 + gen.col_offset, v)
+    for (m, d), v in REMARKS.items(): wb[f"{YEAR}年{m}月打卡"].cell(gen.remark_row, d + 10 + gen.col_offset, v)
+    wb.save(path)
+    return path
+
+def expected_records(path):
+    # 由 read_checkins 独立推出的长表：按日期、事项顺序；未设积极标志的事项每次打卡都算积极；只有感悟的日子输出一条空记录
+    data = read_checkins(path)
+    records = []
+    for d, day in enumerate(data.dates.tolist()):
+        remark, hit = data.remarks[d], False
+        for i, item in enumerate(data.items):
+            if item is None or not data.codes[i, d]: continue
+            hit = True
+            records.append((day, item[0], item[1], data.symbols[data.codes[i, d]], is_blank(item[3]) or data.states[i, d] == POSITIVE, remark))
+        if not hit and remark is not None: records.append((day, None, None, None, None, remark))
+    return records
+
+def test_records_match_read_checkins(filled):
+    records, expected = list(iter_records(filled)), expected_records(filled)
+    assert records == expected
+    # 覆盖到：未设积极标志的事项 (阅读) 有打卡且都算积极、有积极标志的事项两种判定都有、只有感悟的日子
+    unflagged = [r for r in records if r[2] == "阅读"]
+    assert unflagged and all(r[4] for r in unflagged)
+    assert {r[4] for r in records if r[2] == "早睡早起"} == {True, False}
+    assert [(r[0], r[5]) for r in records if r[1] is None] == [(date(YEAR, m, d), REMARKS[m, d]) for m, d in sorted(REMARK_ONLY)]
+
+def test_csv_round_trip(filled):
+    f = io.StringIO()
+    expected = expected_records(filled)
+    assert write_csv(iter_records(filled), f) == len(expected)
+    rows = list(csv.reader(io.StringIO(f.getvalue())))
+    assert tuple(rows[0]) == FIELDS
+    assert rows[1:] == [[day.isoformat(), as_text(c), as_text(i), as_text(v), "" if pos is None else str(int(pos)), as_text(rm)] for day, c, i, v, pos, rm in expected]
+
+def test_npz_round_trip(filled, tmp_path):
+    path = str(tmp_path / "records.npz")
+    expected = expected_records(filled)
+    assert write_npz(iter_records(filled), path) == len(expected)
+    text = lambda v: None if v is None else as_text(v)
+    assert list(read_npz(path)) == [(day, c, i, text(v), pos, rm) for day, c, i, v, pos, rm in expected]
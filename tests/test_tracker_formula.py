@@ -0,0 +1,16 @@
+import openpyxl
+from tracker_formula import FormulaEvaluator, workbook_cells, write_cached_values
+
+def test_uncacheable_formulas_have_no_cached_value(tmp_path):
+    # 易变函数、不支持的函数与定义名称 (及引用到它们的公式) 不写缓存值；其余公式照常写入
+    path = str(tmp_path / "f.xlsx")
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    for r, formula in enumerate(["=TODAY()", "=A1+1", "=FOO(1)", "=IFERROR(A3, 0)", "=LIMIT*2", "=SUM(1, 2)", "=A6&\"x\""], 1):
+        ws.cell(r, 1, formula)
+    wb.save(path)
+    ev = FormulaEvaluator(workbook_cells(wb))
+    write_cached_values(path, ev)
+    assert [c.value for (c,) in openpyxl.load_workbook(path, data_only=True).active.iter_rows()] == [None] * 5 + [3, "3x"]
+    assert ev.uncached == {(ws.title, r, 1) for r in range(1, 6)}
+    assert openpyxl.load_workbook(path).active["A3"].value == "=FOO(1)"
@@ -0,0 +1,10 @@
+import random
+from tracker_checks import CHECKIN_POOL, verify_month_metrics
+
+def test_month_metrics_match_formulas():
+    # 用户 0：1 月与 3 月有打卡、2 月为空月 (3 月对比上月除以 0 记为 0，2 月对比 1 月为 -100%)，其余月份全空；
+    # 用户 1：随机打卡两个月
+    sparse = {(1, 0, 1): "✅", (1, 0, 2): "x", (1, 1, 5): "💪", (1, 4, 9): 1, (3, 2, 10): "📖", (3, 3, 31): "ok"}
+    rng = random.Random(0)
+    dense = {(m, i, d): rng.choice(CHECKIN_POOL) for m in (6, 7) for i in range(6) for d in range(1, 31) if rng.random() < 0.5}
+    assert verify_month_metrics([sparse, dense]) == []
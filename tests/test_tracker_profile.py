@@ -0,0 +1,26 @@
+import tracemalloc
+from generate_excel_v5 import HabitTrackerGenerator
+from tracker_profile import PhaseProfiler
+
+PHASES = ["config", "annual"] + [f"month:{m}" for m in range(1, 13)] + ["save"]
+
+def test_phases_cover_generation(tmp_path):
+    seen = []
+    with PhaseProfiler(callback=lambda r: seen.append(r["phase"])) as prof:
+        gen = HabitTrackerGenerator(filename=str(tmp_path / "p.xlsx"), year=2026, max_items=5, profiler=prof)
+        gen.generate()
+    assert not tracemalloc.is_tracing()
+    assert [r["phase"] for r in prof.records] == seen == PHASES
+    # 各阶段写入单元格数之和即总数；保存阶段拆出序列化与压缩耗时
+    assert prof.total("cells") == gen.cells_written and prof.records[-1]["cells"] == 0
+    assert all("peak_mb" in r and r["seconds"] >= 0 for r in prof.records)
+    save = prof.records[-1]
+    assert save["serialize_seconds"] + save["zip_seconds"] <= save["seconds"]
+    text = prof.report()
+    assert all(p in text for p in PHASES) and "zip_seconds=" in text and "合计" in text
+
+def test_without_memory_tracing(tmp_path):
+    with PhaseProfiler(trace_memory=False) as prof:
+        HabitTrackerGenerator(filename=str(tmp_path / "p.xlsx"), year=2026, max_items=5, profiler=prof, cached_values=True).generate()
+    assert not any("peak_mb" in r for r in prof.records)
+    assert "cache_seconds" in prof.records[-1] and "cache_seconds=" in prof.report()
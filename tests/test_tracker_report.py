@@ -0,0 +1,42 @@
+import pytest
+from generate_excel_v5 import HabitTrackerGenerator
+from tracker_report import format_report, formula_shape, workbook_report
+
+YEAR, MAX_ITEMS = 2026, 5
+
+@pytest.mark.parametrize("formula, row, col, shape", [
+    # 本表引用相对本格，$ 部分保持绝对
+    ("IF(E16<>\"\", H16/$F$16, \"\")", 16, 7, 'IF(C[-2]R[0]<>"", C[1]R[0]/C6R16, "")'),
+    # 跨表引用只保留表名：画廊按模板换算出的不同目标格属于同一形状
+    ("IF(事项配置页!$C$2=\"\", \"\", '2026年1月打卡'!M16)", 40, 3, "IF(事项配置页!#=\"\", \"\", '2026年1月打卡'!#)"),
+    ("IF(事项配置页!$C$3=\"\", \"\", '2026年1月打卡'!N17)", 41, 9, "IF(事项配置页!#=\"\", \"\", '2026年1月打卡'!#)"),
+    # 区域、像单元格地址的带引号表名、表名中的转义引号；字符串常量不动
+    ("SUM('AB1'!H16:H20)+A1&\"x!A1\"&'it''s'!C3", 2, 2, "SUM('AB1'!#:#)+C[-1]R[-1]&\"x!A1\"&'it''s'!#"),
+])
+def test_formula_shape(formula, row, col, shape):
+    assert formula_shape(formula, row, col) == shape
+
+def report(tmp_path, name, **options):
+    path = str(tmp_path / name)
+    HabitTrackerGenerator(filename=path, year=YEAR, max_items=MAX_ITEMS, backend="xml", **options).generate()
+    full = workbook_report(path, top=100)
+    return {s["title"]: s for s in full["sheets"]}, full
+
+def test_cross_sheet_templates_count_once(tmp_path):
+    sheets, full = report(tmp_path, "plain.xlsx")
+    annual = next(s for t, s in sheets.items() if "年度汇总看板" in t)
+    gallery = [t for t in annual["top_shapes"] if "打卡'!#<>" in t["shape"]]
+    # 画廊每月一种形状，每种覆盖该月天数 × 方块数
+    assert len(gallery) == 12 and sum(t["count"] for t in gallery) == 365 * MAX_ITEMS
+    month = sheets[f"{YEAR}年1月打卡"]
+    # 月度主表 C~F 列 (取配置页 A~D 列) 不论行号都是同一形状
+    assert {"count": 4 * MAX_ITEMS, "shape": 'IF(事项配置页!#<>"", 事项配置页!#, "")'} in month["top_shapes"]
+    assert annual["source"] == "_setup_annual_summary_sheet / _setup_gallery" and month["source"] == "_setup_monthly_sheet"
+    text = format_report(full, sort="xml_bytes")
+    assert all(t in text for t in sheets) and "styles.xml" in text
+
+def test_shared_formulas_keep_counts(tmp_path):
+    # 共享公式的从属格按首格形状计入：与逐格写出公式的工作簿统计一致
+    plain, _ = report(tmp_path, "plain.xlsx")
+    shared, _ = report(tmp_path, "shared.xlsx", shared_formulas=True)
+    assert {t: (s["formulas"], s["shapes"]) for t, s in plain.items()} == {t: (s["formulas"], s["shapes"]) for t, s in shared.items()}
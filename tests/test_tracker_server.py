@@ -0,0 +1,96 @@
+import threading
+from concurrent.futures import Future
+import pytest
+from generate_excel_v5 import HabitTrackerGenerator
+from tracker_server import MAX_ITEMS, ByteLRU, GenerationService, cache_key, normalize_params
+
+def test_byte_lru_evicts_by_total_bytes():
+    cache = ByteLRU(10)
+    cache.put("a", b"aaaa"); cache.put("b", b"bbbb")
+    assert cache.get("a") == b"aaaa"  # 访问后 a 变为最新，下次先淘汰 b
+    cache.put("c", b"cccc")
+    assert (cache.get("b"), len(cache), cache.bytes) == (None, 2, 8)
+    cache.put("a", b"a" * 7)  # 同键替换按新长度计数，超限时淘汰最久未用的 c
+    assert (cache.get("c"), cache.get("a"), cache.bytes) == (None, b"a" * 7, 7)
+    cache.put("big", b"x" * 11)  # 单个结果超过上限：不缓存，也不挤掉已有条目
+    assert (cache.get("big"), len(cache), cache.bytes) == (None, 1, 7)
+
+def test_normalize_params_canonical_forms():
+    # 查询串文本、JSON 字段、显式写出默认值与省略默认值得到同一个缓存键
+    base = normalize_params({"year": "2026"})
+    assert base["max_items"] == 50 and base["months"] == 12 and base["items"] == HabitTrackerGenerator.DEFAULT_ITEMS
+    assert cache_key(normalize_params({"year": 2026, "max_items": "50", "months": "", "positive_strategy": "sumproduct"})) == cache_key(base)
+    items = [["生活", "早睡", 21, "✅"]]
+    forms = ['[["生活", "早睡", 21, "✅"]]', items, [{"category": "生活", "item": "早睡", "target": 21, "flag": "✅"}]]
+    assert len({cache_key(normalize_params({"year": "2026", "items": f})) for f in forms}) == 1
+    years = [normalize_params({"years": y}) for y in ("2027,2026,2026", "[2026, 2027]", [2027, 2026])]
+    assert all(p == years[0] for p in years) and years[0]["years"] == [2026, 2027] and years[0]["year"] == 2026
+    assert cache_key(normalize_params({"years": "2026"})) == cache_key(base)
+
+@pytest.mark.parametrize("raw, message", [
+    ({"colour": "red"}, "未知参数"),
+    ({"max_items": str(MAX_ITEMS + 1)}, "max_items"),
+    ({"years": "2020,2021,2022,2023,2024,2025"}, "years"),
+    ({"max_items": "1", "items": '[["a", "b", 1, ""], ["c", "d", 1, ""]]'}, "超过 max_items"),
+])
+def test_normalize_params_rejects(raw, message):
+    with pytest.raises(ValueError, match=message): normalize_params(raw)
+
+class GatedPool:
+    # 代替进程池：渲染结果在 release 之后才返回，用来让并发请求确定地撞上进行中的渲染
+    def __init__(self, result):
+        self.result, self.calls = result, 0
+        self.submitted, self.release = threading.Event(), threading.Event()
+
+    def submit(self, fn, *args):
+        self.calls += 1
+        fut = Future()
+        def finish():
+            self.release.wait()
+            if isinstance(self.result, Exception): fut.set_exception(self.result)
+            else: fut.set_result(self.result)
+        threading.Thread(target=finish).start()
+        self.submitted.set()
+        return fut
+
+    def shutdown(self):
+        pass
+
+def concurrent_gets(service, params, n):
+    results = [None] * n
+    def get(k):
+        try: results[k] = service.get(params)
+        except Exception as e: results[k] = e
+    threads = [threading.Thread(target=get, args=(0,))]
+    threads[0].start()
+    service._pool.submitted.wait(5)
+    threads += [threading.Thread(target=get, args=(k,)) for k in range(1, n)]
+    for t in threads[1:]: t.start()
+    while service.counts["requests"] < n: threading.Event().wait(0.01)
+    service._pool.release.set()
+    for t in threads: t.join(5)
+    return results
+
+@pytest.fixture
+def service():
+    # 进程池换成 GatedPool，真实的进程池直接关闭
+    service = GenerationService(workers=1)
+    service.close()
+    return service
+
+def test_inflight_requests_share_one_render(service):
+    service._pool = GatedPool(b"xlsx")
+    params = normalize_params({"year": "2026"})
+    results = concurrent_gets(service, params, 3)
+    assert sorted(source for _, source in results) == ["miss", "shared", "shared"]
+    assert all(data == b"xlsx" for data, _ in results) and service._pool.calls == 1
+    assert service.get(params) == (b"xlsx", "hit") and service._pool.calls == 1
+    stats = service.stats()
+    assert (stats["requests"], stats["hit"], stats["miss"], stats["shared"], stats["inflight"]) == (4, 1, 1, 2, 0)
+
+def test_failed_render_is_shared_but_not_cached(service):
+    service._pool = GatedPool(ValueError("渲染失败"))
+    params = normalize_params({"year": "2026"})
+    results = concurrent_gets(service, params, 2)
+    assert all(isinstance(r, ValueError) for r in results) and service._pool.calls == 1
+    assert service.counts["errors"] == 2 and len(service.cache) == 0 and not service._inflight
@@ -0,0 +1,49 @@
+import numpy as np
+import openpyxl
+import pytest
+from generate_excel_v5 import HabitTrackerGenerator
+from tracker_reader import CheckinData
+from tracker_snapshot import AnnualSnapshot, snapshot_workbook
+from tracker_checks import VERIFY_ITEMS, verify_snapshot
+
+YEAR = 2026
+ANNUAL_TITLE = "📅 年度汇总看板"
+ITEMS = [["生活", "早睡早起", 20, "✅"], ["学习", "阅读", 10, ""]]
+# {(月, 事项序号, 日): 打卡值}：早睡早起有一次不命中积极标志；阅读未设积极标志，每次打卡都算积极
+CHECKINS = {(1, 0, 1): "✅", (1, 0, 2): "x", (1, 1, 2): "📖", (3, 1, 10): 1}
+
+def test_snapshot_writes_dashboard_values(tmp_path):
+    src, dst = str(tmp_path / "filled.xlsx"), str(tmp_path / "snapshot.xlsx")
+    gen = HabitTrackerGenerator(filename=src, year=YEAR, max_items=4, items=ITEMS)
+    gen.generate()
+    wb = openpyxl.load_workbook(src)
+    for (m, i, d), v in CHECKINS.items(): wb[f"{YEAR}年{m}月打卡"].cell(gen.main_table_start + i, d + 10 + gen.col_offset, v)
+    wb.save(src)
+    snapshot_workbook(src, dst)
+    ws = openpyxl.load_workbook(dst)[ANNUAL_TITLE]
+    values = [c.value for row in ws.iter_rows() for c in row]
+    assert not any(isinstance(v, str) and v.startswith("=") for v in values)
+    # 7 项指标：前 4 项在第 6 行、后 3 项在第 10 行，每项间隔 17 列
+    metrics = [ws.cell(6 if i < 4 else 10, 3 + (i % 4) * 17).value for i in range(7)]
+    rate, positive = (0.1 + 0.05) / 12, (0.075 + 0.05) / 12  # 1 月、3 月各事项打卡率 / 积极率的平均，再按 12 个月平均
+    assert metrics[:6] == [2, pytest.approx(rate), pytest.approx(positive), 4, 3, pytest.approx(4 / 12)]
+    assert metrics[6] == pytest.approx(positive * 40 + rate * 20 + 3 / 365 * 20 + positive / rate * 20)
+    assert {"🔥 早睡早起", "🔥 阅读", "📖"} <= set(values)
+
+# (月数, 生成参数)：全年、按月懒生成的部分年份与按已配置事项分页的画廊
+@pytest.mark.parametrize("months, options", [(12, {}), (3, {}), (7, {"gallery": "configured", "gallery_page_size": 2, "items": VERIFY_ITEMS})])
+def test_snapshot_matches_dashboard_formulas(months, options):
+    assert verify_snapshot(months, **{"year": 2026, "max_items": 8, **options}) == []
+
+def test_gallery_title_matches_formula_text():
+    # 看板公式 "🔥 " & 事项 把数字 1.0 拼成 "1"、逻辑值拼成 "TRUE"
+    items = [("a", 1.0, 10, ""), ("b", 2.5, 10, ""), ("c", True, 10, ""), None]
+    data = CheckinData(2026, items, np.zeros((4, 365), dtype=np.uint16), [None], np.full(365, None, dtype=object))
+    snap = AnnualSnapshot(data)
+    assert [snap.gallery_title(i) for i in range(4)] == ["🔥 1", "🔥 2.5", "🔥 TRUE", ""]
+
+def test_multi_year_workbook_is_rejected(tmp_path):
+    src = str(tmp_path / "multi.xlsx")
+    HabitTrackerGenerator(filename=src, years=[2025, 2026], max_items=4).generate()
+    with pytest.raises(ValueError, match="多年工作簿"): snapshot_workbook(src, str(tmp_path / "out.xlsx"))
+    assert not (tmp_path / "out.xlsx").exists()
@@ -0,0 +1,32 @@
+from datetime import date
+import openpyxl
+import pytest
+from generate_excel_v5 import HabitTrackerGenerator
+from tracker_checks import VERIFY_ITEMS, verify_positive_streaks, verify_streaks
+
+THIS_YEAR = date.today().year
+
+# 今年 (当前连续落在年中) 与往年，两种积极天数策略 (辅助区行号不同)；每天都打卡时累计链贯穿全年；多年工作簿跨年接续
+@pytest.mark.parametrize("year", sorted({2026, THIS_YEAR - 1, THIS_YEAR}))
+@pytest.mark.parametrize("strategy", ["sumproduct", "helper"])
+@pytest.mark.parametrize("fill_ratio", [0.8, 1.0])
+def test_streak_formulas_match_engine(year, strategy, fill_ratio):
+    assert verify_streaks(year, 8, fill_ratio=fill_ratio, positive_strategy=strategy) == []
+
+@pytest.mark.parametrize("strategy", ["sumproduct", "helper"])
+@pytest.mark.parametrize("fill_ratio", [0.8, 1.0])
+def test_multi_year_streaks_carry_over(strategy, fill_ratio):
+    assert verify_streaks(THIS_YEAR, 8, fill_ratio=fill_ratio, positive_strategy=strategy, years=[THIS_YEAR - 1, THIS_YEAR]) == []
+
+@pytest.mark.parametrize("strategy", ["sumproduct", "helper"])
+@pytest.mark.parametrize("seed", range(2))
+def test_positive_hits_match_column_i(strategy, seed):
+    # VERIFY_ITEMS 含积极标志为空的事项 (阅读)，其每次打卡都算积极
+    assert verify_positive_streaks(2026, 8, seed=seed, positive_strategy=strategy) == []
+
+def test_values_without_streak_values_are_zero(tmp_path):
+    # 新建模板没有 streak_values：已配置的事项当前 / 最长连续为 0，空行留空 (与公式版无打卡时一致)
+    path = tmp_path / "values.xlsx"
+    HabitTrackerGenerator(filename=str(path), year=2026, max_items=8, items=VERIFY_ITEMS[:3] + [["其他", "", 5, ""]], streaks="values").generate()
+    ws = openpyxl.load_workbook(path)["2026年3月打卡"]
+    assert [[ws.cell(r, 13 + i).value for i in range(5)] for r in (11, 12)] == [[0, 0, 0, None, None]] * 2
@@ -0,0 +1,82 @@
+import re
+import zipfile
+from datetime import time
+import openpyxl
+import pytest
+from generate_excel_v5 import HabitTrackerGenerator
+from tracker_checks import VERIFY_ITEMS, compare_dumps, workbook_dump
+from tracker_reader import read_checkins
+from tracker_update import update_workbook
+
+YEAR = 2026
+# 用户数据：配置页新增一行事项 (第 8 行)、几个月的打卡 (含时间值) 与每日感悟
+NEW_ITEM = ["运动", "俯卧撑", 12, "💪"]
+CHECKINS = {(1, 0, 1): "✅", (1, 0, 31): "✅🔥", (6, 2, 15): 1, (6, 6, 30): "💪", (12, 1, 31): time(6, 30)}
+REMARKS = {(1, 1): "新年第一天", (6, 15): " 前后有空格 ", (12, 31): "全年完成"}
+
+def generate_filled(path, max_items, **options):
+    gen = HabitTrackerGenerator(filename=str(path), year=YEAR, max_items=max_items, items=VERIFY_ITEMS[:3], **options)
+    gen.generate()
+    wb = openpyxl.load_workbook(path)
+    for c, v in enumerate(NEW_ITEM, 2): wb["事项配置页"].cell(8, c, v)
+    for (m, i, d), v in CHECKINS.items(): wb[f"{YEAR}年{m}月打卡"].cell(gen.main_table_start + i, d + 10 + gen.col_offset, v)
+    for (m, d), v in REMARKS.items(): wb[f"{YEAR}年{m}月打卡"].cell(gen.remark_row, d + 10 + gen.col_offset, v)
+    wb.save(path)
+    return str(path)
+
+def to_shared_strings(path):
+    # 模拟 Excel 保存过的文件：工作表里的内联字符串改为共享字符串表 (openpyxl 自己只写内联字符串)
+    with zipfile.ZipFile(path) as zf: parts = {info: zf.read(info.filename) for info in zf.infolist()}
+    strings = []
+    def repl(m):
+        strings.append(m.group(3))
+        return f'<c r="{m.group(1)}"{m.group(2)} t="s"><v>{len(strings) - 1}</v></c>'
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for info, data in parts.items():
+            if info.filename.startswith("xl/worksheets/"):
+                data = re.sub(r'<c r="(\w+)"( s="\d+")? t="inlineStr"><is><t(?: xml:space="preserve")?>(.*?)</t></is></c>', repl, data.decode("utf-8")).encode("utf-8")
+            elif info.filename == "[Content_Types].xml":
+                data = data.replace(b"</Types>", b'<Override PartName="/xl/sharedStrings.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml" /></Types>')
+            elif info.filename == "xl/_rels/workbook.xml.rels":
+                data = data.replace(b"</Relationships>", b'<Relationship Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/sharedStrings" Target="sharedStrings.xml" Id="rIdSST" /></Relationships>')
+            zf.writestr(info, data)
+        sst = "".join(f'<si><t xml:space="preserve">{s}</t></si>' for s in strings)
+        zf.writestr("xl/sharedStrings.xml", f'<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" count="{len(strings)}" uniqueCount="{len(strings)}">{sst}</sst>')
+    assert strings
+
+def assert_same_data(a, b):
+    a, b = read_checkins(a), read_checkins(b)
+    assert b.items[:len(a.items)] == a.items and not any(b.items[len(a.items):])
+    assert [a.values(i) for i in range(a.max_items)] == [b.values(i) for i in range(a.max_items)]
+    assert list(a.remarks) == list(b.remarks)
+
+@pytest.mark.parametrize("cached_values", [False, True])
+def test_grow_max_items_keeps_user_data(tmp_path, cached_values):
+    # 整本重建 (配置页、年度看板、全部月度表)：结果与直接按新 max_items 生成再填入同样的数据完全一致
+    src, dst = generate_filled(tmp_path / "src.xlsx", 8), str(tmp_path / "dst.xlsx")
+    report = update_workbook(src, dst, max_items=12, cached_values=cached_values)
+    assert report["rebuilt"] == ["config", "annual", "months"]
+    assert report["kept_cells"] == len(NEW_ITEM) + sum(v != "" for item in VERIFY_ITEMS[:3] for v in item) + len(CHECKINS) + len(REMARKS)
+    assert_same_data(src, dst)
+    direct = generate_filled(tmp_path / "direct.xlsx", 12)
+    assert compare_dumps(workbook_dump(direct), workbook_dump(dst)) == []
+
+def test_update_keeps_shared_strings_of_untouched_sheets(tmp_path):
+    # 只重建月度表：配置页与年度看板原样拼回，仍引用原文件的共享字符串表
+    src = generate_filled(tmp_path / "src.xlsx", 8)
+    to_shared_strings(src)
+    dst = str(tmp_path / "dst.xlsx")
+    assert update_workbook(src, dst, positive_strategy="helper")["rebuilt"] == ["months"]
+    with zipfile.ZipFile(src) as a, zipfile.ZipFile(dst) as b:
+        assert a.read("xl/worksheets/sheet1.xml") == b.read("xl/worksheets/sheet1.xml")
+        assert a.read("xl/sharedStrings.xml") == b.read("xl/sharedStrings.xml")
+    assert_same_data(src, dst)
+    direct = generate_filled(tmp_path / "direct.xlsx", 8, positive_strategy="helper")
+    assert compare_dumps(workbook_dump(direct), workbook_dump(dst)) == []
+
+def test_lost_cells_abort_without_writing(tmp_path):
+    # 缩小 max_items 时已填写的行不再可编辑：整体放弃，原文件不变
+    src = generate_filled(tmp_path / "src.xlsx", 8)
+    before = open(src, "rb").read()
+    with pytest.raises(ValueError, match="不再可编辑"): update_workbook(src, max_items=5)
+    assert open(src, "rb").read() == before
@@ -0,0 +1,206 @@
+import calendar
+import os
+import random
+import tempfile
+from datetime import date
+import numpy as np
+import openpyxl
+from generate_excel_v5 import HabitTrackerGenerator
+from tracker_formula import FormulaEvaluator, workbook_cells
+from tracker_metrics import MONTH_LABELS, compute_batch
+from tracker_reader import CheckinData
+from tracker_snapshot import snapshot_workbook
+from tracker_streak import checkin_hits, month_streaks
+from tracker_update import update_workbook
+
+# ==========================================
+# ✅ 测试辅助：随机打卡数据与各项一致性校验，供 tests/ 下的用例调用
+# ==========================================
+# 公式结果用项目自带的求值器 (tracker_formula) 在内存中计算，校验的是「与求值器口径一致」，不代表与 Excel 重算逐值等价。
+# 各校验函数返回差异列表，为空即通过；参数组合由调用它们的 pytest 用例给出。
+
+# 随机打卡值：既有命中积极标志的符号，也有数字、普通文本与 SEARCH 通配符
+CHECKIN_POOL = ["✅", "🔥", "✅🔥", "🏃‍♂️", "💪", "📖", "💡", "x", "X", "ok", 1, 2.5, "1", "*", "?", "~*", "早睡"]
+VERIFY_ITEMS = [["生活", "早睡早起", 21, "✅🔥"], ["运动", "跑步", 15, "🏃‍♂️💪"], ["学习", "阅读", 10, ""], ["其他", "记账", "20", "OK"], ["其他", "冥想", 0, 1], ["其他", "通配", 5, "a*b"]]
+
+def build_cells(year, max_items, items, **options):
+    # 只执行各表的搭建步骤、不落盘，返回求值器所需的单元格字典
+    gen = HabitTrackerGenerator(filename=None, year=year, max_items=max_items, items=items, **options)
+    gen._setup_config_sheet()
+    for gen.year in gen.years:
+        gen._setup_annual_summary_sheet()
+        gen._setup_monthly_sheets()
+    return gen, workbook_cells(gen.wb)
+
+def random_checkins(gen, fill_ratio, seed):
+    # {(月, 事项序号, 日): 打卡值}
+    rng = random.Random(seed)
+    return {(m, i, d): rng.choice(CHECKIN_POOL) for m in range(1, 13) for i in range(gen.max_items) for d in range(1, calendar.monthrange(gen.year, m)[1] + 1) if rng.random() < fill_ratio}
+
+def fill_checkins(gen, cells, checkins):
+    for (m, i, d), v in checkins.items():
+        cells[f"{gen.year}年{m}月打卡"][(gen.main_table_start + i, d + 10 + gen.col_offset)] = v
+
+def verify_positive_strategy(year=2026, max_items=8, items=VERIFY_ITEMS, fill_ratio=0.4, seed=0):
+    # 对比 sumproduct 与 helper 两种积极天数算法：逐月逐行比较 I 列，并核对全部看板数值
+    runs = {}
+    for strategy in ("sumproduct", "helper"):
+        gen, cells = build_cells(year, max_items, items, positive_strategy=strategy)
+        fill_checkins(gen, cells, random_checkins(gen, fill_ratio, seed))
+        runs[strategy] = (gen, FormulaEvaluator(cells))
+    gen, base = runs["sumproduct"]
+    _, helper = runs["helper"]
+    mismatches = []
+    for m in range(1, 13):
+        title = f"{year}年{m}月打卡"
+        cells = [(r, 9) for r in range(gen.main_table_start, gen.main_table_start + max_items)] + [(r, c) for r in range(5, 11) for c in (5, 6)]
+        for r, c in cells:
+            a, b = base.value(title, r, c), helper.value(title, r, c)
+            if a != b: mismatches.append((title, r, c, a, b))
+    return mismatches
+
+def verify_streaks(year=2026, max_items=8, items=VERIFY_ITEMS, fill_ratio=0.8, seed=0, positive_strategy="sumproduct", years=None):
+    # streaks="formulas" 的看板公式 (求值器按今天计算) 与 tracker_streak 对同一份打卡数据的结果逐格比较；years 为多年工作簿 (跨年接续)
+    gen, cells = build_cells(year, max_items, items, streaks="formulas", positive_strategy=positive_strategy, years=years)
+    datas = []
+    for k, gen.year in enumerate(gen.years):
+        checkins = random_checkins(gen, fill_ratio, seed + 1000 * k)
+        fill_checkins(gen, cells, checkins)
+        codes = np.zeros((max_items, 366 if calendar.isleap(gen.year) else 365), dtype=np.uint16)
+        for (m, i, d) in checkins: codes[i, date(gen.year, m, d).timetuple().tm_yday - 1] = 1
+        datas.append(CheckinData(gen.year, [tuple(it[:4]) for it in items] + [None] * (max_items - len(items)), codes, [None, "✅"], np.full(codes.shape[1], None, dtype=object)))
+    ev = FormulaEvaluator(cells)
+    mismatches = []
+    # 倒序求值：先取最后一年 12 月，整条逐日累计链由求值器自己按依赖顺序算完
+    for (y, m, i), expected in sorted(month_streaks(datas).items(), reverse=True):
+        title, col = f"{y}年{m}月打卡", i + 11 + gen.col_offset
+        got = (ev.value(title, 11, col), ev.value(title, 12, col))
+        if got != expected: mismatches.append((title, i, got, expected))
+    return mismatches
+
+def checkin_data(year, max_items, items, checkins):
+    # 与 fill_checkins 写入的打卡值对应的 CheckinData (相同的值共用一个编码)
+    codes = np.zeros((max_items, 366 if calendar.isleap(year) else 365), dtype=np.uint16)
+    symbols, ids = [None], {}
+    for (m, i, d), v in checkins.items():
+        code = ids.setdefault((v.__class__, v), len(ids) + 1)
+        if code == len(symbols): symbols.append(v)
+        codes[i, date(year, m, d).timetuple().tm_yday - 1] = code
+    return CheckinData(year, [tuple(it[:4]) for it in items] + [None] * (max_items - len(items)), codes, symbols, np.full(codes.shape[1], None, dtype=object))
+
+def verify_positive_streaks(year=2026, max_items=8, items=VERIFY_ITEMS, fill_ratio=0.8, seed=0, positive_strategy="sumproduct"):
+    # positive=True 的打卡矩阵逐月计数应等于 I 列 (积极天数) 的公式结果；积极标志为空的事项每次打卡都算积极
+    gen, cells = build_cells(year, max_items, items, positive_strategy=positive_strategy)
+    checkins = random_checkins(gen, fill_ratio, seed)
+    fill_checkins(gen, cells, checkins)
+    data = checkin_data(year, max_items, items, checkins)
+    hits = checkin_hits(data, positive=True)
+    ev = FormulaEvaluator(cells)
+    mismatches = []
+    for m in range(1, 13):
+        title = f"{year}年{m}月打卡"
+        for i in range(len(items)):
+            got, expected = ev.value(title, gen.main_table_start + i, 9), int(hits[i, data.month_slice(m)].sum())
+            if got != expected: mismatches.append((title, i, got, expected))
+    return mismatches
+
+def verify_month_metrics(checkin_sets, year=2026, max_items=8, items=VERIFY_ITEMS):
+    # 多份打卡数据一起交给 compute_batch (每份一个用户)，各用户每月的 E5~E10 与 F5~F10 (对比上月) 应等于公式求值结果
+    datas, evs = [], []
+    for checkins in checkin_sets:
+        gen, cells = build_cells(year, max_items, items)
+        fill_checkins(gen, cells, checkins)
+        datas.append(checkin_data(year, max_items, items, checkins))
+        evs.append(FormulaEvaluator(cells))
+    out = compute_batch(datas)
+    mismatches = []
+    for u, ev in enumerate(evs):
+        for m in range(1, 13):
+            title = f"{year}年{m}月打卡"
+            for r, label in enumerate(MONTH_LABELS, 5):
+                for col, group in ((5, "month"), (6, "month_mom")):
+                    got, expected = ev.value(title, r, col), out[group][label][u, m - 1]
+                    if not (isinstance(got, (int, float)) and abs(got - expected) < 1e-9): mismatches.append((u, title, r, col, got, expected))
+    return mismatches
+
+def workbook_dump(path):
+    # 工作簿的可比较内容：表顺序、单元格值与样式、合并区、行高列宽、条件格式、数据验证、冻结窗格、保护、自定义属性
+    wb = openpyxl.load_workbook(path)
+    style = lambda c: (repr(c.font), repr(c.fill), repr(c.border), repr(c.alignment), repr(c.protection), c.number_format)
+    dump = {"sheets": wb.sheetnames, "props": sorted((p.name, p.value) for p in wb.custom_doc_props)}
+    for ws in wb.worksheets:
+        dump[ws.title] = {
+            "cells": {k: (c.value, style(c)) for k, c in ws._cells.items() if c.value is not None or c.has_style},
+            "merged": sorted(str(r) for r in ws.merged_cells.ranges),
+            "rows": {r: (d.height, d.hidden) for r, d in ws.row_dimensions.items() if d.height is not None or d.hidden},
+            "cols": {k: (d.width, d.hidden) for k, d in ws.column_dimensions.items() if d.customWidth or d.hidden},
+            "cf": [(str(cf.sqref), repr(rule)) for cf in ws.conditional_formatting for rule in cf.rules],
+            "dv": [repr(dv) for dv in ws.data_validations.dataValidation],
+            "view": (ws.freeze_panes, ws.sheet_view.showGridLines, ws.sheet_view.zoomScale),
+            "protection": repr(ws.protection),
+        }
+    return dump
+
+def compare_dumps(base, xml):
+    # 两份 workbook_dump 逐项比较，返回差异描述列表 (为空即等价)
+    diffs = [f"{key}: {base.get(key)!r} != {xml.get(key)!r}" for key in ("sheets", "props", "names") if base.get(key) != xml.get(key)]
+    for title in base["sheets"]:
+        a, b = base[title], xml.get(title, {})
+        for part in a:
+            if a[part] == b.get(part): continue
+            if part != "cells": diffs.append(f"{title} / {part}"); continue
+            for k in sorted(a["cells"].keys() | b.get("cells", {}).keys()):
+                if a["cells"].get(k) != b["cells"].get(k): diffs.append(f"{title} / R{k[0]}C{k[1]}: {a['cells'].get(k)!r} != {b['cells'].get(k)!r}")
+    return diffs
+
+def verify_xml_backend(**options):
+    # 同一组参数分别用 openpyxl 后端与 xml 后端生成，重新加载后逐项比较
+    with tempfile.TemporaryDirectory() as tmp:
+        dumps = {}
+        for backend in ("openpyxl", "xml"):
+            path = os.path.join(tmp, backend + ".xlsx")
+            HabitTrackerGenerator(filename=path, backend=backend, **options).generate()
+            dumps[backend] = workbook_dump(path)
+    return compare_dumps(dumps["openpyxl"], dumps["xml"])
+
+def verify_streaming(**options):
+    # 同一组参数分别用默认方式与 streaming=True (逐段写出) 生成，重新加载后逐项比较
+    with tempfile.TemporaryDirectory() as tmp:
+        dumps = {}
+        for streaming in (False, True):
+            path = os.path.join(tmp, f"streaming_{streaming}.xlsx")
+            HabitTrackerGenerator(filename=path, streaming=streaming, **options).generate()
+            dumps[streaming] = workbook_dump(path)
+    return compare_dumps(dumps[False], dumps[True])
+
+def verify_lazy_months(start, months=12, **options):
+    # 先只生成 1~start 月，再用 tracker_update 追加到 months 个月，结果应与直接生成 months 个月相同
+    with tempfile.TemporaryDirectory() as tmp:
+        lazy, direct = os.path.join(tmp, "lazy.xlsx"), os.path.join(tmp, "direct.xlsx")
+        HabitTrackerGenerator(filename=lazy, months=start, **options).generate()
+        update_workbook(lazy, months=months)
+        HabitTrackerGenerator(filename=direct, months=months, **options).generate()
+        return compare_dumps(workbook_dump(direct), workbook_dump(lazy))
+
+def verify_snapshot(months=12, fill_ratio=0.4, seed=0, **options):
+    # 已填写的工作簿做年度看板快照，快照中的静态数值应与原看板公式的求值结果一致 (months<12 时只汇总已生成的月份)
+    with tempfile.TemporaryDirectory() as tmp:
+        src, dst = os.path.join(tmp, "src.xlsx"), os.path.join(tmp, "snapshot.xlsx")
+        gen = HabitTrackerGenerator(filename=src, months=months, **options)
+        gen.generate()
+        wb = openpyxl.load_workbook(src)
+        for (m, i, d), v in random_checkins(gen, fill_ratio, seed).items():
+            if m <= months: wb[f"{gen.year}年{m}月打卡"].cell(gen.main_table_start + i, d + 10 + gen.col_offset, v)
+        wb.save(src)
+        ev = FormulaEvaluator(workbook_cells(wb))
+        snapshot_workbook(src, dst)
+        title = next(t for t in wb.sheetnames if "年度汇总看板" in t)
+        formulas, static = wb[title], openpyxl.load_workbook(dst)[title]
+        mismatches = []
+        for (r, c), cell in formulas._cells.items():
+            # 快照中保留原样的公式 (画廊翻页链接) 不参与比较
+            if not (isinstance(cell.value, str) and cell.value.startswith("=")) or static.cell(r, c).value == cell.value: continue
+            a, b = ev.value(title, r, c), static.cell(r, c).value
+            same = abs(a - b) < 1e-9 if isinstance(a, (int, float)) and isinstance(b, (int, float)) else (a if a is not None else "") == (b if b is not None else "")
+            if not same: mismatches.append((r, c, a, b))
+        return mismatches
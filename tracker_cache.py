@@ -0,0 +1,138 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+import tempfile
+import zipfile
+from collections import OrderedDict
+from functools import lru_cache
+from xml.sax.saxutils import escape
+import generate_excel_v5
+import tracker_styles
+from generate_excel_v5 import HabitTrackerGenerator
+from tracker_formula import sheet_parts
+
+# ==========================================
+# 🗃️ 模板缓存：同一组生成参数只构建一次，之后每位用户只改写事项配置页
+# ==========================================
+# 缓存键 = 生成器与样式模块源码 + params() (表结构版本 / 年份 / max_items / 各策略) + 主题色 + 行列偏移
+#          (+ gallery="configured" 时的已配置序号，方块排布取决于它) 的 SHA-256，
+# 任一项变化都会得到新键，旧文件不会被误用。缓存目录下每个键一个「空配置」模板 <键>.xlsx；
+# 生成时把预置事项以内联字符串写入配置页 (sheet1.xml) 的 B~E 列，其余部件原样拷贝并重新压缩。
+# 写入的 XML 与 openpyxl 对同样取值的写法一致，因此结果与直接 generate() 的单元格内容相同。
+# 不支持 cached_values (缓存值依赖事项内容，模板里的值会与改写后的事项不符)，传入时报 ValueError，需要时请直接使用 HabitTrackerGenerator。
+
+CONFIG_TITLE = "事项配置页"
+_SOURCES = [generate_excel_v5.__file__, tracker_styles.__file__]
+
+@lru_cache(maxsize=1)
+def _source_digest():
+    h = hashlib.sha256()
+    for path in _SOURCES:
+        with open(path, "rb") as f: h.update(f.read())
+    return h.hexdigest()
+
+def _cell_xml(ref, style, value):
+    # 与 openpyxl 的单元格写法保持一致：文本为内联字符串，首尾有空格时保留空白
+    if isinstance(value, bool): return f'<c r="{ref}" s="{style}" t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)): return f'<c r="{ref}" s="{style}" t="n"><v>{value}</v></c>'
+    text = str(value)
+    if not text: return f'<c r="{ref}" s="{style}" t="inlineStr" />'
+    space = ' xml:space="preserve"' if text.strip() != text else ""
+    return f'<c r="{ref}" s="{style}" t="inlineStr"><is><t{space}>{escape(text)}</t></is></c>'
+
+def patch_config_xml(xml, items):
+    # 把事项写入配置页第 2 行起的 B~E 列 (模板中这些格只有样式、没有值)
+    values = {f"{'BCDE'[c]}{r}": v for r, item in enumerate(items, 2) for c, v in enumerate(item[:4]) if v is not None}
+    if not values: return xml
+    def repl(m):
+        v = values.pop(m.group(1), None)
+        return m.group(0) if v is None else _cell_xml(m.group(1), m.group(2), v)
+    xml = re.sub(r'<c r="([B-E]\d+)" s="(\d+)" t="n" />', repl, xml)
+    if values: raise ValueError(f"配置页模板中找不到单元格：{', '.join(sorted(values))}")
+    return xml
+
+class TemplateCache:
+    def __init__(self, cache_dir, memory_templates=2, compresslevel=None):
+        self.cache_dir = cache_dir
+        self.compresslevel = compresslevel
+        # 进程内再缓存最近用过的模板部件 (解压后的字节)，同一批用户无需反复读盘
+        self.memory_templates = memory_templates
+        self._parts = OrderedDict()
+        self.hits = self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _generator(self, filename, items, params):
+        if params.get("cached_values"): raise ValueError("模板缓存不支持 cached_values=True：缓存值依赖事项内容，请直接使用 HabitTrackerGenerator")
+        gen = HabitTrackerGenerator(filename=filename, items=items, **params)
+        if gen.gallery == "configured": gen.gallery_slots = gen._gallery_slots()
+        gen.items = []
+        return gen
+
+    def key(self, items=None, **params):
+        gen = self._generator(None, HabitTrackerGenerator.DEFAULT_ITEMS if items is None else items, params)
+        payload = {
+            "source": _source_digest(),
+            "params": gen.params(),
+            "theme": {k: v for k, v in vars(gen.theme).items() if k.isupper()},
+            "offsets": [gen.row_offset, gen.col_offset, gen.main_table_start, gen.remark_row],
+            "gallery_slots": gen.gallery_slots,
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()[:32]
+
+    def template(self, items=None, **params):
+        # 返回 (键, 模板路径)；不存在时构建，先写临时文件再改名，多进程同时构建也不会读到半个文件
+        items = HabitTrackerGenerator.DEFAULT_ITEMS if items is None else items
+        key = self.key(items, **params)
+        path = os.path.join(self.cache_dir, key + ".xlsx")
+        if os.path.exists(path):
+            self.hits += 1
+            return key, path
+        self.misses += 1
+        fd, tmp = tempfile.mkstemp(suffix=".xlsx", dir=self.cache_dir)
+        os.close(fd)
+        try:
+            self._generator(tmp, items, params).generate()
+            os.replace(tmp, path)
+        except BaseException:
+            os.remove(tmp)
+            raise
+        return key, path
+
+    def _load(self, key, path):
+        parts = self._parts.get(key)
+        if parts is None:
+            with zipfile.ZipFile(path) as zf:
+                config = sheet_parts(zf)[CONFIG_TITLE]
+                parts = [(info, zf.read(info.filename), info.filename == config) for info in zf.infolist()]
+            self._parts[key] = parts
+            while len(self._parts) > self.memory_templates: self._parts.popitem(last=False)
+        self._parts.move_to_end(key)
+        return parts
+
+    def generate(self, filename, items=None, **params):
+        items = HabitTrackerGenerator.DEFAULT_ITEMS if items is None else items
+        key, path = self.template(items, **params)
+        with zipfile.ZipFile(filename, "w", zipfile.ZIP_DEFLATED, compresslevel=self.compresslevel) as dst:
+            for info, data, is_config in self._load(key, path):
+                if is_config: data = patch_config_xml(data.decode("utf-8"), items).encode("utf-8")
+                # 传入 ZipInfo 时 writestr 不读取归档级的 compresslevel，需逐个部件指定
+                dst.writestr(info, data, compress_type=zipfile.ZIP_DEFLATED, compresslevel=self.compresslevel)
+        return filename
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="预先构建模板缓存 (batch_generate.py --cache-dir 共用同一目录)")
+    parser.add_argument("--cache-dir", default=".template_cache")
+    parser.add_argument("--years", default="2026", help="逗号分隔")
+    parser.add_argument("--max-items", default="50", help="逗号分隔")
+    args = parser.parse_args(argv)
+    cache = TemplateCache(args.cache_dir)
+    for year in map(int, args.years.split(",")):
+        for n in map(int, args.max_items.split(",")):
+            key, path = cache.template(year=year, max_items=n)
+            print(f"🗃️ {year} / max_items={n}: {path}")
+    print(f"构建 {cache.misses} 个，已存在 {cache.hits} 个")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+import argparse
+import calendar
+import csv
+import os
+import sys
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+import numpy as np
+import openpyxl
+from tracker_formula import as_text
+from tracker_reader import excel_search, is_blank, read_items, workbook_years
+
+# ==========================================
+# 📤 打卡数据导出：已填写工作簿 -> 长表记录 (日期, 类别, 事项, 打卡值, 是否积极, 当日感悟)
+# ==========================================
+# 只读模式逐张月度表、逐行读取，读完一个月就输出一个月，不加载整个工作簿；多年工作簿依次导出每一年。
+# 「是否积极」与月度表 I 列同口径：事项未设置积极标志时每次打卡都算积极，否则按 SEARCH(打卡值, 积极标志) 判定。
+# 只有感悟没有打卡的日子输出一条类别 / 事项 / 打卡值为空的记录。
+# 输出格式：
+#   - csv: UTF-8，每条记录一行，positive 为 1 / 0 (仅感悟的记录为空)
+#   - npz: 列式压缩文件，字符串列做字典编码 (见 write_npz)，read_npz 可还原为记录
+
+FIELDS = ("date", "category", "item", "value", "positive", "remark")
+
+def iter_records(path, year=None, main_table_start=16, remark_row=13, col_offset=2):
+    wb = openpyxl.load_workbook(path, read_only=True)
+    try:
+        years = workbook_years(wb)
+        if year is not None and year not in years: raise ValueError(f"{path}: 没有 {year} 年的月度表 (现有 {years})")
+        items = read_items(wb)
+        positive = {}  # (事项序号, 打卡值) -> 是否积极，每种组合只判定一次
+        first_col = 11 + col_offset
+        for y in ([year] if year is not None else years):
+            for m in range(1, 13):
+                num_days = calendar.monthrange(y, m)[1]
+                if f"{y}年{m}月打卡" not in wb.sheetnames: continue
+                rows = wb[f"{y}年{m}月打卡"].iter_rows(min_row=remark_row, max_row=main_table_start + len(items) - 1, min_col=first_col, max_col=first_col + num_days - 1, values_only=True)
+                remarks, month = [None] * num_days, []
+                for r, row in enumerate(rows, remark_row):
+                    if r == remark_row: remarks = [None if is_blank(v) else v for v in row]
+                    elif r >= main_table_start and items[r - main_table_start] is not None: month.append((r - main_table_start, row))
+                for d in range(num_days):
+                    day, remark, hit = date(y, m, d + 1), remarks[d], False
+                    for i, row in month:
+                        v = row[d]
+                        if is_blank(v): continue
+                        key = (i, v.__class__, v)
+                        if key not in positive:
+                            flag = items[i][3]
+                            positive[key] = is_blank(flag) or excel_search(v, flag)
+                        hit = True
+                        yield (day, items[i][0], items[i][1], v, positive[key], remark)
+                    if not hit and remark is not None: yield (day, None, None, None, None, remark)
+    finally:
+        wb.close()
+
+def write_csv(records, f):
+    writer = csv.writer(f)
+    writer.writerow(FIELDS)
+    n = 0
+    for day, category, item, value, pos, remark in records:
+        writer.writerow((day.isoformat(), as_text(category), as_text(item), as_text(value), "" if pos is None else int(pos), as_text(remark)))
+        n += 1
+    return n
+
+def write_npz(records, path):
+    # 列：date (datetime64[D])、entry (事项字典编号，-1 为仅感悟)、value / remark (字符串字典编号，-1 为空)、positive (1 / 0 / -1)
+    # 字典：categories / items (按 entry 编号)、values、remarks
+    days, entries, values, positives, remarks = array("l"), array("l"), array("l"), array("b"), array("l")
+    entry_ids, value_ids, remark_ids = {}, {}, {}
+    code = lambda table, v: -1 if v is None else table.setdefault(as_text(v), len(table))
+    for day, category, item, value, pos, remark in records:
+        days.append(day.toordinal() - 719163)  # 距 1970-01-01 的天数
+        entries.append(-1 if item is None else entry_ids.setdefault((as_text(category), as_text(item)), len(entry_ids)))
+        values.append(code(value_ids, value)); remarks.append(code(remark_ids, remark))
+        positives.append(-1 if pos is None else int(pos))
+    strings = lambda table: np.array(list(table), dtype=str)
+    np.savez_compressed(path, date=np.frombuffer(days, dtype=days.typecode).astype("datetime64[D]"),
+                        entry=np.frombuffer(entries, dtype=entries.typecode).astype(np.int32), value=np.frombuffer(values, dtype=values.typecode).astype(np.int32),
+                        positive=np.frombuffer(positives, dtype=np.int8), remark=np.frombuffer(remarks, dtype=remarks.typecode).astype(np.int32),
+                        categories=strings(c for c, _ in entry_ids), items=strings(i for _, i in entry_ids), values=strings(value_ids), remarks=strings(remark_ids))
+    return len(days)
+
+def read_npz(path):
+    # write_npz 的逆过程，逐条还原记录 (打卡值为文本)
+    with np.load(path) as z:
+        cols = {k: z[k] for k in z.files}
+    pick = lambda table, k: None if k < 0 else str(table[k])
+    for day, e, v, pos, rm in zip(cols["date"].tolist(), cols["entry"].tolist(), cols["value"].tolist(), cols["positive"].tolist(), cols["remark"].tolist()):
+        yield (day, pick(cols["categories"], e), pick(cols["items"], e), pick(cols["values"], v), None if pos < 0 else bool(pos), pick(cols["remarks"], rm))
+
+def export_file(src, dst, fmt="csv", year=None):
+    records = iter_records(src, year)
+    if fmt == "npz": return write_npz(records, dst)
+    if dst == "-": return write_csv(records, sys.stdout)
+    with open(dst, "w", encoding="utf-8", newline="") as f: return write_csv(records, f)
+
+def _export_job(src, dst, fmt, year):
+    start = time.perf_counter()
+    try:
+        return {"src": src, "path": dst, "ok": True, "records": export_file(src, dst, fmt, year), "seconds": time.perf_counter() - start}
+    except Exception as e:
+        return {"src": src, "path": dst, "ok": False, "seconds": time.perf_counter() - start, "error": f"{type(e).__name__}: {e}"}
+
+def export_many(paths, out_dir, fmt="csv", year=None, workers=None):
+    # 多文件并行导出，每个输入对应 out_dir 下同名的 .csv / .npz；单个文件失败只记入结果
+    os.makedirs(out_dir, exist_ok=True)
+    dsts = [os.path.join(out_dir, os.path.splitext(os.path.basename(p))[0] + "." + fmt) for p in paths]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_export_job, paths, dsts, [fmt] * len(paths), [year] * len(paths)))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="把已填写的工作簿导出为长表打卡记录 (CSV / 列式 npz)")
+    parser.add_argument("paths", nargs="+", help="已填写的 v5 工作簿")
+    parser.add_argument("--format", choices=("csv", "npz"), default="csv")
+    parser.add_argument("-o", "--output", help="单个输入时的输出路径 (csv 可用 - 表示标准输出)")
+    parser.add_argument("--out-dir", default="export", help="多个输入时的输出目录")
+    parser.add_argument("--year", type=int, help="只导出某一年 (多年工作簿)")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+    if args.output:
+        if len(args.paths) != 1: parser.error("-o 只能用于单个输入，多个输入请用 --out-dir")
+        n = export_file(args.paths[0], args.output, args.format, args.year)
+        if args.output != "-": print(f"📤 {args.output}：{n} 条记录")
+        return 0
+    start = time.perf_counter()
+    results = export_many(args.paths, args.out_dir, args.format, args.year, args.workers)
+    failed = [r for r in results if not r["ok"]]
+    for r in failed: print(f"❌ {r['src']}: {r['error']}")
+    print(f"📤 导出 {len(results) - len(failed)}/{len(results)} 个文件，共 {sum(r.get('records', 0) for r in results)} 条记录，耗时 {time.perf_counter() - start:.1f}s -> {args.out_dir}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
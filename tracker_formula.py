@@ -0,0 +1,549 @@
+import argparse
+import math
+import os
+import re
+import shutil
+import tempfile
+import zipfile
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+from openpyxl.utils import column_index_from_string
+from openpyxl.utils.datetime import to_excel
+
+# ==========================================
+# 🧮 公式求值：项目自用公式子集的小型求值器 + 缓存值回写
+# ==========================================
+# openpyxl 保存的公式单元格没有缓存结果 (<v/> 为空)，语雀 / 飞书 / 预览工具首次打开时要么显示空白，
+# 要么全量重算所有跨表 IF 链。这里按 Excel 语义求出每个公式的值，写回工作表 XML 的 <v> 节点。
+# 支持：IF IFERROR AND OR NOT COUNTIF COUNTA SUM AVERAGE SUMPRODUCT SEARCH ISNUMBER
+#       INDEX ROW COLUMN INT MOD LEN TRIM MAX MIN TODAY DATE，比较 / 算术 / & 运算与区域逐元素运算。
+# TODAY() 按求值当天计算；含 TODAY()、不支持的函数或定义名称的公式 (及引用到它们的公式) 不写缓存值，
+# 留给 Excel 打开时重算，避免文件里留下过期或错误的结果。
+
+class ExcelError:
+    __slots__ = ("code",)
+
+    def __init__(self, code):
+        self.code = code
+
+    def __eq__(self, other):
+        return isinstance(other, ExcelError) and other.code == self.code
+
+    def __hash__(self):
+        return hash(self.code)
+
+    def __repr__(self):
+        return self.code
+
+DIV0, VALUE, REF, NAME, NA, NUM = (ExcelError(c) for c in ("#DIV/0!", "#VALUE!", "#REF!", "#NAME?", "#N/A", "#NUM!"))
+_ERRORS = {e.code: e for e in (DIV0, VALUE, REF, NAME, NA, NUM)}
+
+class _Raise(Exception):
+    def __init__(self, err):
+        self.err = err
+
+# ------------------------------------------
+# 文本与通配
+# ------------------------------------------
+def as_text(v):
+    # Excel 把数字 / 逻辑值当作文本时的写法：整数不带 ".0"，小数最多 15 位有效数字
+    if v is None: return ""
+    if isinstance(v, bool): return "TRUE" if v else "FALSE"
+    if isinstance(v, float): return str(int(v)) if v.is_integer() else f"{v:.15g}"
+    return str(v)
+
+@lru_cache(maxsize=1024)
+def _wildcard(text, full):
+    # ? * 通配与 ~ 转义；full=True 用于 COUNTIF 的整串匹配，否则用于 SEARCH 的子串查找
+    pattern, i = [], 0
+    while i < len(text):
+        ch = text[i]
+        if ch == "~" and i + 1 < len(text): pattern.append(re.escape(text[i + 1])); i += 2; continue
+        pattern.append((".*" if full else ".*?") if ch == "*" else "." if ch == "?" else re.escape(ch)); i += 1
+    return re.compile("".join(pattern), re.IGNORECASE | re.DOTALL)
+
+def search_position(find_text, within_text, start=1):
+    # SEARCH 的返回位置 (从 1 开始)，未找到为 None
+    m = _wildcard(as_text(find_text), False).search(as_text(within_text), start - 1)
+    return None if m is None else m.start() + 1
+
+# ------------------------------------------
+# 词法 / 语法
+# ------------------------------------------
+_SHEET = r"(?:'(?:[^']|'')+'|[^\s'!(),&=<>+\-*/^\":;{}]+)!"
+_TOKEN = re.compile(r"""\s*(?:
+    (?P<str>"(?:[^"]|"")*")
+   |(?P<ref>(?:""" + _SHEET + r""")?\$?[A-Z]{1,3}\$?\d+(?::\$?[A-Z]{1,3}\$?\d+)?)(?![\w(])
+   |(?P<num>\d+(?:\.\d*)?(?:[eE][+-]?\d+)?|\.\d+)
+   |(?P<func>[A-Za-z_][\w.]*)\(
+   |(?P<bool>TRUE|FALSE)(?![\w(])
+   |(?P<err>\#(?:DIV/0!|N/A|VALUE!|REF!|NAME\?|NUM!))
+   |(?P<op><>|<=|>=|[-+*/^&=<>%])
+   |(?P<punct>[(),])
+   |(?P<name>[^\s'!(),&=<>+\-*/^\":;{}]+)
+)""", re.X)
+_REF = re.compile(r"(?:'((?:[^']|'')+)'!|([^!]+)!)?\$?([A-Z]{1,3})\$?(\d+)(?::\$?([A-Z]{1,3})\$?(\d+))?$")
+_BINARY = {"=": 1, "<>": 1, "<": 1, ">": 1, "<=": 1, ">=": 1, "&": 2, "+": 3, "-": 3, "*": 4, "/": 4, "^": 5}
+# 以区域为参数的函数：单格引用也按区域传入 (SUM(A1) 忽略文本，而 SUM("x") 报 #VALUE!)
+_RANGE_ARGS = {"SUM", "AVERAGE", "COUNTA", "COUNTIF", "SUMPRODUCT", "INDEX", "AND", "OR", "MAX", "MIN"}
+# 可以写缓存值的函数 (TODAY 可求值，但结果随打开日期变化，不写缓存值)
+_CACHEABLE = _RANGE_ARGS | {"IF", "IFERROR", "ROW", "COLUMN", "ISNUMBER", "SEARCH", "HYPERLINK", "LEN", "TRIM", "INT", "MOD", "NOT", "DATE"}
+
+def _parse_ref(text):
+    m = _REF.match(text)
+    quoted, bare, c1, r1, c2, r2 = m.groups()
+    sheet = quoted.replace("''", "'") if quoted else bare
+    c1, r1 = column_index_from_string(c1), int(r1)
+    return (sheet, r1, c1, int(r2), column_index_from_string(c2)) if c2 else (sheet, r1, c1, r1, c1)
+
+def _tokenize(formula):
+    # 引用在 token 序列中只留占位，结构相同的公式 (如画廊逐日格) 共享同一棵语法树
+    tokens, refs, pos, end = [], [], 1 if formula.startswith("=") else 0, len(formula.rstrip())
+    while pos < end:
+        m = _TOKEN.match(formula, pos)
+        if m is None or m.end() == pos: raise ValueError(f"无法解析的公式：{formula!r} (位置 {pos})")
+        kind = m.lastgroup
+        if kind == "ref":
+            refs.append(_parse_ref(m.group(kind))); tokens.append(("ref", len(refs) - 1))
+        elif kind == "func":
+            tokens.append((kind, m.group(kind).upper()))
+        else:
+            tokens.append((kind, m.group(kind)))
+        pos = m.end()
+    return tuple(tokens), refs
+
+class _Parser:
+    def __init__(self, tokens):
+        self.tokens, self.pos = tokens, 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def take(self, text=None):
+        tok = self.peek()
+        if text is not None and tok[1] != text: raise ValueError(f"公式语法错误：期望 {text!r}，得到 {tok[1]!r}")
+        self.pos += 1
+        return tok
+
+    def expr(self, min_prec=1):
+        left = self.unary()
+        while True:
+            kind, text = self.peek()
+            if kind != "op" or text not in _BINARY or _BINARY[text] < min_prec: return left
+            self.take()
+            left = ("bin", text, left, self.expr(_BINARY[text] + 1))
+
+    def unary(self):
+        kind, text = self.peek()
+        if kind == "op" and text in "+-":
+            self.take()
+            return ("neg", self.unary()) if text == "-" else self.unary()
+        node = self.primary()
+        while self.peek() == ("op", "%"):
+            self.take(); node = ("bin", "/", node, ("lit", 100))
+        return node
+
+    def primary(self):
+        kind, text = self.take()
+        if kind == "num": return ("lit", float(text) if any(ch in text for ch in ".eE") else int(text))
+        if kind == "str": return ("lit", text[1:-1].replace('""', '"'))
+        if kind == "bool": return ("lit", text == "TRUE")
+        if kind == "err": return ("lit", _ERRORS.get(text, VALUE))
+        if kind == "ref": return ("ref", text)
+        if kind == "name": return ("name", text)
+        if kind == "punct" and text == "(":
+            node = self.expr(); self.take(")")
+            return node
+        if kind == "func":
+            args = []
+            if self.peek() != ("punct", ")"):
+                while True:
+                    args.append(("lit", None) if self.peek() in (("punct", ","), ("punct", ")")) else self.expr())
+                    if self.peek() != ("punct", ","): break
+                    self.take()
+            self.take(")")
+            return ("call", text, tuple(args))
+        raise ValueError(f"公式语法错误：意外的 {text!r}")
+
+_AST_CACHE = {}
+_CACHEABLE_AST = {}
+
+def compile_formula(formula):
+    # 返回 (语法树, 引用列表)；语法树按 token 结构缓存
+    tokens, refs = _tokenize(formula)
+    ast = _AST_CACHE.get(tokens)
+    if ast is None:
+        parser = _Parser(tokens)
+        ast = parser.expr()
+        if parser.pos != len(tokens): raise ValueError(f"公式语法错误：{formula!r}")
+        ast = _AST_CACHE[tokens] = ast
+    return ast, refs
+
+def _cacheable(ast):
+    # 语法树里没有易变函数、不支持的函数与定义名称
+    ok = _CACHEABLE_AST.get(ast)
+    if ok is None:
+        if ast[0] == "name": ok = False
+        elif ast[0] == "call": ok = ast[1] in _CACHEABLE and all(_cacheable(a) for a in ast[2])
+        else: ok = all(_cacheable(a) for a in ast[1:] if isinstance(a, tuple))
+        _CACHEABLE_AST[ast] = ok
+    return ok
+
+# ------------------------------------------
+# 取值规则
+# ------------------------------------------
+class _Range(list):
+    # 区域取值：按行展开的一维列表，附带宽度供 INDEX 使用
+    __slots__ = ("width",)
+
+def _check(v):
+    if isinstance(v, ExcelError): raise _Raise(v)
+    return v
+
+def _num(v):
+    if v is None: return 0
+    if isinstance(v, bool): return int(v)
+    if isinstance(v, (int, float)): return v
+    _check(v)
+    try: return float(v)
+    except (TypeError, ValueError): raise _Raise(VALUE)
+
+def _text(v):
+    return as_text(_check(v))
+
+def _truthy(v):
+    if isinstance(v, list): raise _Raise(VALUE)
+    _check(v)
+    if v is None: return False
+    if isinstance(v, str):
+        if v.upper() in ("TRUE", "FALSE"): return v.upper() == "TRUE"
+        raise _Raise(VALUE)
+    return bool(v)
+
+def _rank(v):
+    # 比较顺序：数字 < 文本 < 逻辑值；文本不区分大小写
+    if isinstance(v, bool): return (2, v)
+    if isinstance(v, (int, float)): return (0, v)
+    return (1, v.lower())
+
+def _compare(a, b):
+    _check(a); _check(b)
+    if a is None: a = "" if isinstance(b, str) else False if isinstance(b, bool) else 0
+    if b is None: b = "" if isinstance(a, str) else False if isinstance(a, bool) else 0
+    ka, kb = _rank(a), _rank(b)
+    return (ka > kb) - (ka < kb)
+
+def _scalar_op(op, a, b):
+    if op in ("=", "<>", "<", ">", "<=", ">="):
+        c = _compare(a, b)
+        return {"=": c == 0, "<>": c != 0, "<": c < 0, ">": c > 0, "<=": c <= 0, ">=": c >= 0}[op]
+    if op == "&": return _text(a) + _text(b)
+    x, y = _num(a), _num(b)
+    if op == "+": return x + y
+    if op == "-": return x - y
+    if op == "*": return x * y
+    if op == "/":
+        if y == 0: raise _Raise(DIV0)
+        return x / y
+    try: return x ** y
+    except (OverflowError, ZeroDivisionError): raise _Raise(NUM)
+
+def _catch(fn, *args):
+    try: return fn(*args)
+    except _Raise as e: return e.err
+
+def _lift(fn, *args):
+    # 任一参数为区域 / 数组时逐元素计算，单个元素出错只影响该元素
+    lists = [a for a in args if isinstance(a, list)]
+    if not lists: return fn(*args)
+    n = min(len(a) for a in lists)
+    return [_catch(fn, *(a[i] if isinstance(a, list) else a for a in args)) for i in range(n)]
+
+def _criteria(crit):
+    # COUNTIF 条件："?*"、">0"、"<>"、"=文本" 等
+    _check(crit)
+    if isinstance(crit, str):
+        m = re.match(r"(<>|<=|>=|=|<|>)?(.*)$", crit, re.DOTALL)
+        op, operand = m.group(1) or "=", m.group(2)
+        if operand == "":
+            return (lambda v: v is None or v == "") if op == "=" else (lambda v: v is not None) if op == "<>" else (lambda v: False)
+        if operand.upper() in ("TRUE", "FALSE"): operand = operand.upper() == "TRUE"
+        else:
+            try: operand = float(operand)
+            except ValueError: pass
+    else:
+        op, operand = "=", crit
+    if isinstance(operand, str):
+        if op in ("=", "<>"):
+            rx = _wildcard(operand, True)
+            hit = lambda v: isinstance(v, str) and rx.fullmatch(v) is not None
+            return hit if op == "=" else (lambda v: not hit(v))
+        key = operand.lower()
+        test = {"<": lambda k: k < key, ">": lambda k: k > key, "<=": lambda k: k <= key, ">=": lambda k: k >= key}[op]
+        return lambda v: isinstance(v, str) and test(v.lower())
+    kind = bool if isinstance(operand, bool) else (int, float)
+    same = lambda v: isinstance(v, kind) and (kind is bool or not isinstance(v, bool))
+    test = {"=": lambda x: x == operand, "<>": lambda x: x != operand, "<": lambda x: x < operand, ">": lambda x: x > operand, "<=": lambda x: x <= operand, ">=": lambda x: x >= operand}[op]
+    if op == "<>": return lambda v: not (same(v) and v == operand)
+    return lambda v: same(v) and test(v)
+
+def _numbers(values):
+    # SUM / AVERAGE 的取数：区域中只取数字 (忽略文本、逻辑值、空白)，直接参数按算术规则转换
+    out = []
+    for v in values:
+        if isinstance(v, list):
+            for x in v:
+                _check(x)
+                if isinstance(x, (int, float)) and not isinstance(x, bool): out.append(x)
+        else:
+            out.append(_num(v))
+    return out
+
+# ------------------------------------------
+# 求值器
+# ------------------------------------------
+_PENDING = object()
+_EPOCH = date(1899, 12, 30)  # Excel 日期序列号的零点 (1900 日期系统，1900-03-01 之后的日期)
+
+class FormulaEvaluator:
+    # cells: {表名: {(行, 列): 值或 "=公式"}}；不支持定义名称 (求值为 #NAME?)
+    # uncached: 已求值的公式格中不应写缓存值的格 (见文件头)
+    def __init__(self, cells):
+        self.cells = cells
+        self._values = {}
+        self.uncached = set()
+
+    def value(self, sheet, row, col):
+        key = (sheet, row, col)
+        v = self._values.get(key, _PENDING)
+        if v is not _PENDING: return v
+        # 显式栈：先把被引用的公式格按依赖顺序求完再求本格，逐日累计 / 跨月跨年接续这类长引用链不会递归过深，
+        # 结果也不取决于调用方按什么顺序取值
+        stack, compiled = [key], {}
+        while stack:
+            top = stack[-1]
+            if top in self._values: stack.pop(); continue
+            if top not in compiled:
+                raw = self.cells.get(top[0], {}).get(top[1:])
+                if not (isinstance(raw, str) and raw.startswith("=")):
+                    self._values[stack.pop()] = raw; continue
+                ast, refs = compile_formula(raw)
+                compiled[top] = (ast, refs, list(self._dependencies(top[0], ast, refs)))
+                deps = [d for d in compiled[top][2] if d not in self._values and d not in compiled]
+                if deps: stack.extend(reversed(deps)); continue
+            ast, refs, deps = compiled[top]
+            self._values[top] = 0  # 循环引用按 0 处理
+            self._values[top] = self._evaluate(ast, refs, *top)
+            if not _cacheable(ast) or any(d in self.uncached for d in deps): self.uncached.add(top)
+            stack.pop()
+        return self._values[key]
+
+    def _dependencies(self, sheet, ast, refs):
+        # 公式引用到的公式格 (区域逐格展开)
+        for ref in refs:
+            cells = self.cells.get(ref[0] or sheet)
+            if cells is None: continue
+            _, r1, c1, r2, c2 = ref
+            for r in range(r1, r2 + 1):
+                for c in range(c1, c2 + 1):
+                    raw = cells.get((r, c))
+                    if isinstance(raw, str) and raw.startswith("="): yield (ref[0] or sheet, r, c)
+
+    def evaluate(self, formula, sheet, row, col):
+        return self._evaluate(*compile_formula(formula), sheet, row, col)
+
+    def _evaluate(self, ast, refs, sheet, row, col):
+        try:
+            v = self._eval(ast, (sheet, row, col, refs))
+        except _Raise as e:
+            return e.err
+        if isinstance(v, list): v = v[0] if v else VALUE
+        # 公式返回空白引用时显示为 0
+        return 0 if v is None else v
+
+    def _range(self, ref, ctx, as_range):
+        sheet, r1, c1, r2, c2 = ref
+        sheet = sheet or ctx[0]
+        if sheet not in self.cells: raise _Raise(REF)
+        if r1 == r2 and c1 == c2 and not as_range: return self.value(sheet, r1, c1)
+        out = _Range(self.value(sheet, r, c) for r in range(r1, r2 + 1) for c in range(c1, c2 + 1))
+        out.width = c2 - c1 + 1
+        return out
+
+    def _eval(self, node, ctx, as_range=False):
+        kind = node[0]
+        if kind == "lit": return node[1]
+        if kind == "ref": return self._range(ctx[3][node[1]], ctx, as_range)
+        if kind == "bin": return _lift(lambda a, b: _scalar_op(node[1], a, b), self._eval(node[2], ctx), self._eval(node[3], ctx))
+        if kind == "neg": return _lift(lambda a: -_num(a), self._eval(node[1], ctx))
+        if kind == "name": raise _Raise(NAME)
+        return self._call(node[1], node[2], ctx)
+
+    def _call(self, name, args, ctx):
+        # INDEX 只有首个参数按区域取值，行列号是标量
+        ev = lambda i: self._eval(args[i], ctx, name in _RANGE_ARGS and (i == 0 or name != "INDEX"))
+        if name == "IF":
+            cond = _truthy(ev(0))
+            if cond: return ev(1) if len(args) > 1 else True
+            return ev(2) if len(args) > 2 else False
+        if name == "IFERROR":
+            try: v = ev(0)
+            except _Raise: return ev(1)
+            return ev(1) if isinstance(v, ExcelError) else v
+        if name in ("ROW", "COLUMN"):
+            if not args: return ctx[1] if name == "ROW" else ctx[2]
+            if args[0][0] != "ref": raise _Raise(VALUE)
+            ref = ctx[3][args[0][1]]
+            return ref[1] if name == "ROW" else ref[2]
+        if name == "ISNUMBER":
+            # 参数出错时 ISNUMBER 返回 FALSE 而不是传递错误
+            return _lift(lambda v: isinstance(v, (int, float)) and not isinstance(v, bool), _catch(ev, 0))
+        values = [ev(i) for i in range(len(args))]
+        if name == "SEARCH":
+            def search(find, within, start=1):
+                pos = search_position(_text(find), _text(within), int(_num(start)))
+                if pos is None: raise _Raise(VALUE)
+                return pos
+            return _lift(search, *values)
+        if name == "HYPERLINK": return values[-1]  # 单元格显示的是友好名称 (省略时为链接地址)
+        if name == "LEN": return _lift(lambda v: len(_text(v)), values[0])
+        if name == "TRIM": return _lift(lambda v: re.sub(" +", " ", _text(v)).strip(" "), values[0])
+        if name == "INT": return _lift(lambda v: math.floor(_num(v)), values[0])
+        if name == "MOD":
+            def mod(a, b):
+                a, b = _num(a), _num(b)
+                if b == 0: raise _Raise(DIV0)
+                return a - b * math.floor(a / b)
+            return _lift(mod, *values)
+        if name == "NOT": return _lift(lambda v: not _truthy(v), values[0])
+        if name in ("AND", "OR"):
+            flags = []
+            for v in values:
+                if isinstance(v, list): flags.extend(bool(_check(x)) for x in v if isinstance(x, (int, float)))
+                else: flags.append(_truthy(v))
+            if not flags: raise _Raise(VALUE)
+            return all(flags) if name == "AND" else any(flags)
+        if name == "SUM": return sum(_numbers(values))
+        if name in ("MAX", "MIN"):
+            nums = _numbers(values)
+            return (max if name == "MAX" else min)(nums) if nums else 0
+        if name == "TODAY": return (date.today() - _EPOCH).days
+        if name == "DATE":
+            y, m, d = (int(_num(v)) for v in values)
+            y, m = y + (m - 1) // 12, (m - 1) % 12 + 1
+            return (date(y, m, 1) - _EPOCH).days + d - 1
+        if name == "AVERAGE":
+            nums = _numbers(values)
+            if not nums: raise _Raise(DIV0)
+            return sum(nums) / len(nums)
+        if name == "COUNTA":
+            return sum(sum(1 for x in v if x is not None) if isinstance(v, list) else 1 for v in values)
+        if name == "COUNTIF":
+            match = _criteria(values[1][0] if isinstance(values[1], list) else values[1])
+            rng = values[0] if isinstance(values[0], list) else [values[0]]
+            return sum(1 for v in rng if not isinstance(v, ExcelError) and match(v))
+        if name == "SUMPRODUCT":
+            arrays = [v if isinstance(v, list) else [v] for v in values]
+            total = 0
+            for row in zip(*arrays):
+                prod = 1
+                for x in row:
+                    _check(x)
+                    prod *= x if isinstance(x, (int, float)) and not isinstance(x, bool) else 0
+                total += prod
+            return total
+        if name == "INDEX":
+            rng = values[0] if isinstance(values[0], list) else _Range([values[0]])
+            width = getattr(rng, "width", len(rng)) or 1
+            r = int(_num(values[1])) if len(values) > 1 else 0
+            c = int(_num(values[2])) if len(values) > 2 else 0
+            if width == 1: idx = r - 1 if c in (0, 1) else -1
+            elif len(rng) == width and c == 0: idx = r - 1
+            else: idx = (r - 1) * width + (c - 1) if 1 <= c <= width else -1
+            if not 0 <= idx < len(rng): raise _Raise(REF)
+            return rng[idx]
+        raise _Raise(NAME)
+
+# ------------------------------------------
+# 缓存值回写
+# ------------------------------------------
+_NS = {"m": "http://schemas.openxmlformats.org/spreadsheetml/2006/main", "r": "http://schemas.openxmlformats.org/officeDocument/2006/relationships"}
+# 公式元素：普通 <f>..</f>、共享公式首格 <f t="shared" ref=.. si=..>..</f> 与其余格 <f t="shared" si=.. />
+_FORMULA_CELL = re.compile(r'<c r="([A-Z]+)(\d+)"([^>]*)>(<f\b[^>]*?/>|<f\b[^>]*?(?<!/)>.*?</f>)(?:<v\s*/>|<v></v>|<v>[^<]*</v>)?</c>', re.DOTALL)
+
+def sheet_parts(zf):
+    # 表名 -> 工作表 XML 在包内的路径
+    wb = ElementTree.fromstring(zf.read("xl/workbook.xml"))
+    rels = ElementTree.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+    targets = {rel.get("Id"): rel.get("Target") for rel in rels}
+    parts = {}
+    for sheet in wb.iterfind("m:sheets/m:sheet", _NS):
+        target = targets[sheet.get(f"{{{_NS['r']}}}id")]
+        parts[sheet.get("name")] = target.lstrip("/") if target.startswith("/") else "xl/" + target
+    return parts
+
+def _cached_xml(v):
+    if isinstance(v, bool): return ' t="b"', "1" if v else "0"
+    if isinstance(v, ExcelError): return ' t="e"', escape(v.code)
+    if isinstance(v, (int, float)):
+        if isinstance(v, float) and not math.isfinite(v): return ' t="e"', NUM.code
+        return "", repr(v) if isinstance(v, float) else str(v)
+    return ' t="str"', escape(as_text(v))
+
+def write_cached_values(path, evaluator, compresslevel=None, dst=None):
+    # 逐表把公式单元格的 <v/> 替换成求值结果，其余部件原样拷贝
+    # dst 为 None 时原地改写 path (先写临时文件再替换)；否则从 path 读取、写入 dst，两者都可以是路径或文件对象
+    # compresslevel=0 表示不压缩 (ZIP_STORED)，1~9 为 deflate 级别
+    if dst is None:
+        fd, tmp = tempfile.mkstemp(suffix=".xlsx", dir=os.path.dirname(os.path.abspath(path)))
+        os.close(fd)
+        try:
+            write_cached_values(path, evaluator, compresslevel, tmp)
+            os.replace(tmp, path)
+        except BaseException:
+            os.remove(tmp)
+            raise
+        return
+    compression = zipfile.ZIP_STORED if compresslevel == 0 else zipfile.ZIP_DEFLATED
+    with zipfile.ZipFile(path) as src, zipfile.ZipFile(dst, "w", compression, compresslevel=compresslevel or None) as out:
+        parts = {v: k for k, v in sheet_parts(src).items()}
+        for info in src.infolist():
+            data = src.read(info.filename)
+            title = parts.get(info.filename)
+            if title is not None:
+                def repl(m):
+                    key = (title, int(m.group(2)), column_index_from_string(m.group(1)))
+                    t, v = _cached_xml(evaluator.value(*key))
+                    attrs = re.sub(r'\s+t="[^"]*"', "", m.group(3))
+                    if key in evaluator.uncached: return f'<c r="{m.group(1)}{m.group(2)}"{attrs}>{m.group(4)}</c>'
+                    return f'<c r="{m.group(1)}{m.group(2)}"{attrs}{t}>{m.group(4)}<v>{v}</v></c>'
+                data = _FORMULA_CELL.sub(repl, data.decode("utf-8")).encode("utf-8")
+            # 传入 ZipInfo 时 writestr 不读取归档级的 compresslevel，需逐个部件指定
+            out.writestr(info, data, compress_type=compression, compresslevel=compresslevel or None)
+
+def plain_value(v):
+    # 生成器的共享公式对象 (shared_formulas=True) 取本格的完整公式文本；日期/时间按 Excel 存储的序列号参与计算；其余值原样返回
+    if isinstance(v, (date, datetime, time, timedelta)): return to_excel(v)
+    return getattr(v, "formula", v)
+
+def workbook_cells(wb):
+    # 普通 (非只读) openpyxl 工作簿 -> 求值器的单元格字典
+    return {ws.title: {k: plain_value(c.value) for k, c in ws._cells.items() if c.value is not None} for ws in wb.worksheets}
+
+def main(argv=None):
+    import openpyxl
+    parser = argparse.ArgumentParser(description="为工作簿中的公式写入缓存值 (预览工具首次打开即可看到结果)")
+    parser.add_argument("src", help="输入工作簿")
+    parser.add_argument("-o", "--output", help="输出路径 (默认覆盖输入文件)")
+    args = parser.parse_args(argv)
+    dst = args.output or args.src
+    wb = openpyxl.load_workbook(args.src)
+    cells = workbook_cells(wb)
+    if dst != args.src: shutil.copyfile(args.src, dst)
+    write_cached_values(dst, FormulaEvaluator(cells))
+    print(f"🧮 已写入公式缓存值：{dst}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+import calendar
+import numpy as np
+from tracker_reader import CHECKED, POSITIVE, is_blank
+
+# ==========================================
+# 📐 指标引擎：用数组运算复现月度看板与年度看板的公式口径
+# ==========================================
+# 月度看板 (每张月度表 E5~E10，F 列为对比上月)：
+#   事项 = COUNTIF(E, "?*")          坚持事项 = COUNTIF(H, ">0")
+#   平均打卡率 = AVERAGE(G)           平均积极率 = AVERAGE(J)
+#   累计活跃天 = 当月有任意打卡的天数    月度综合评分 = E8*40 + E7*20 + E9/当月天数*20 + IFERROR(E8/E7,0)*20
+# 年度看板：年度平均打卡率 / 积极率为已生成月份 (months，默认 12) E7 / E8 的平均，月均打卡次数也按这些月份折算；
+#   年度综合评分中活跃天固定按 365 天折算。
+# 所有计算都带用户维度 (U)，单个用户就是 U=1 的批量。
+
+MONTH_LABELS = ["items", "kept", "rate", "positive_rate", "active_days", "score"]
+ANNUAL_LABELS = ["items", "rate", "positive_rate", "hits", "active_days", "monthly_hits", "score"]
+
+def _target_value(v):
+    # F 列 = 配置页目标天数；Excel 算术会把 TRUE/FALSE 与数字文本自动转成数字
+    if isinstance(v, bool): return float(v)
+    if isinstance(v, (int, float)): return float(v)
+    if isinstance(v, str):
+        try: return float(v.strip())
+        except ValueError: return np.nan
+    return 0.0  # 空单元格引用按 0 参与运算
+
+def _safe_div(num, den):
+    # IFERROR(num/den, 0)
+    out = np.zeros(np.broadcast(num, den).shape)
+    ok = np.isfinite(den) & (den != 0)
+    np.divide(num, den, out=out, where=ok)
+    return out
+
+def _stack(datas):
+    # 把多份 CheckinData 补齐成 (U, I, 366) 的数组；超出各自年份天数的列恒为未打卡
+    n_users, n_items = len(datas), max(d.max_items for d in datas)
+    states = np.zeros((n_users, n_items, 366), dtype=np.uint8)
+    targets = np.zeros((n_users, n_items))
+    item_mask = np.zeros((n_users, n_items), dtype=bool)
+    text_mask = np.zeros((n_users, n_items), dtype=bool)
+    flag_blank = np.ones((n_users, n_items), dtype=bool)
+    month_of_day = np.full((n_users, 366), -1, dtype=np.int8)
+    days_in_month = np.zeros((n_users, 12))
+    for u, d in enumerate(datas):
+        states[u, :d.max_items, :d.codes.shape[1]] = d.states
+        for i, item in enumerate(d.items):
+            if item is None: continue
+            item_mask[u, i], text_mask[u, i] = True, isinstance(item[1], str)
+            targets[u, i], flag_blank[u, i] = _target_value(item[2]), is_blank(item[3])
+        for m in range(12):
+            month_of_day[u, d.month_slice(m + 1)] = m
+            days_in_month[u, m] = calendar.monthrange(d.year, m + 1)[1]
+    return states, targets, item_mask, text_mask, flag_blank, month_of_day, days_in_month
+
+def compute_batch(datas, months=12):
+    states, targets, item_mask, text_mask, flag_blank, month_of_day, days_in_month = _stack(datas)
+    in_month = (month_of_day[:, :, None] == np.arange(12)).astype(np.int32)          # (U, D, 12)
+    checked = states >= CHECKED                                                        # (U, I, D)
+    positive = np.where(flag_blank[:, :, None], checked, states == POSITIVE)
+
+    # --- 月度主表 G/H/I/J 列 (U, I, 12) ---
+    hits = np.einsum("uid,udm->uim", checked.astype(np.int32), in_month)
+    pos_hits = np.einsum("uid,udm->uim", positive.astype(np.int32), in_month)
+    rate = _safe_div(hits, targets[:, :, None])
+    pos_rate = _safe_div(pos_hits, targets[:, :, None])
+
+    # --- 月度看板 E5~E10 (U, 12) ---
+    mask = item_mask[:, :, None]
+    n_items = item_mask.sum(axis=1)[:, None].astype(float)
+    m_rate = _safe_div(np.where(mask, rate, 0).sum(axis=1), n_items)
+    m_pos_rate = _safe_div(np.where(mask, pos_rate, 0).sum(axis=1), n_items)
+    active = np.einsum("ud,udm->um", checked.any(axis=1).astype(np.int32), in_month)
+    month = {
+        "items": np.repeat(text_mask.sum(axis=1)[:, None], 12, axis=1),
+        "kept": (mask & (hits > 0)).sum(axis=1),
+        "rate": m_rate,
+        "positive_rate": m_pos_rate,
+        "active_days": active,
+        "score": m_pos_rate * 40 + m_rate * 20 + active / days_in_month * 20 + _safe_div(m_pos_rate, m_rate) * 20,
+    }
+    # 对比上月：IFERROR((本月-上月)/上月, 0)，1 月固定为 0
+    mom = {k: np.concatenate([np.zeros((len(datas), 1)), _safe_div(v[:, 1:] - v[:, :-1], v[:, :-1].astype(float))], axis=1) for k, v in month.items()}
+
+    # --- 年度看板 (U,) ---
+    # months 可为整数或每个用户一个值 (按月懒生成的工作簿只汇总前 months 个月)
+    n_months = np.broadcast_to(np.asarray(months, dtype=float), (len(datas),))
+    generated = np.arange(12) < n_months[:, None]
+    y_rate = np.where(generated, m_rate, 0).sum(axis=1) / n_months
+    y_pos_rate = np.where(generated, m_pos_rate, 0).sum(axis=1) / n_months
+    y_hits = np.where(mask, hits, 0).sum(axis=(1, 2))
+    y_active = active.sum(axis=1)
+    annual = {
+        "items": text_mask.sum(axis=1),
+        "rate": y_rate,
+        "positive_rate": y_pos_rate,
+        "hits": y_hits,
+        "active_days": y_active,
+        "monthly_hits": y_hits / n_months,
+        "score": y_pos_rate * 40 + y_rate * 20 + y_active / 365 * 20 + _safe_div(y_pos_rate, y_rate) * 20,
+    }
+    rows = {"hits": hits, "rate": rate, "positive": pos_hits, "positive_rate": pos_rate, "item_mask": item_mask}
+    return {"rows": rows, "month": month, "month_mom": mom, "annual": annual}
+
+def compute_metrics(data, months=12):
+    # 单个用户：去掉批量维度，行级数组截回该用户自己的 max_items
+    out = compute_batch([data], months)
+    return {
+        "rows": {k: v[0, :data.max_items] for k, v in out["rows"].items()},
+        "month": {k: v[0] for k, v in out["month"].items()},
+        "month_mom": {k: v[0] for k, v in out["month_mom"].items()},
+        "annual": {k: v[0].item() for k, v in out["annual"].items()},
+    }
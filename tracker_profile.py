@@ -0,0 +1,64 @@
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# ==========================================
+# 🔬 分阶段剖析：HabitTrackerGenerator(profiler=...) 在每个阶段结束时记录一条数据
+# ==========================================
+# 阶段：config (事项配置页) / annual (年度看板) / month:1 ~ month:12 (各月度表) / save (写出)
+# 每条记录：seconds 耗时、alloc_mb 净分配、peak_mb 阶段内峰值增量、cells 写入单元格数；
+# save 阶段另含 serialize_seconds (生成 XML) 与 zip_seconds (压缩写入)，开启缓存值时还有 cache_seconds。
+#
+#   with PhaseProfiler() as prof:
+#       HabitTrackerGenerator(profiler=prof).generate()
+#   print(prof.report())
+
+class PhaseProfiler:
+    def __init__(self, trace_memory=True, callback=None):
+        self.trace_memory = trace_memory
+        self.callback = callback  # 每条记录产生时调用 callback(record)，可接入日志 / 监控
+        self.records = []
+        self._started_tracing = False
+
+    def __enter__(self):
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start(); self._started_tracing = True
+        return self
+
+    def __exit__(self, *exc):
+        if self._started_tracing:
+            tracemalloc.stop(); self._started_tracing = False
+        return False
+
+    @contextmanager
+    def phase(self, name, counter=None):
+        # counter: 返回累计写入单元格数的函数，阶段前后取差值
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        if tracing:
+            mem_start = tracemalloc.get_traced_memory()[0]; tracemalloc.reset_peak()
+        cells_start = counter() if counter else None
+        record = {"phase": name}
+        start = time.perf_counter()
+        try:
+            yield record  # 阶段内可往 record 里追加明细 (如 save 的 serialize / zip 拆分)
+        finally:
+            record["seconds"] = time.perf_counter() - start
+            if tracing:
+                current, peak = tracemalloc.get_traced_memory()
+                record["alloc_mb"], record["peak_mb"] = (current - mem_start) / 1e6, (peak - mem_start) / 1e6
+            if counter: record["cells"] = counter() - cells_start
+            self.records.append(record)
+            if self.callback: self.callback(record)
+
+    def total(self, key="seconds"):
+        return sum(r.get(key) or 0 for r in self.records)
+
+    def report(self):
+        lines = [f"{'阶段':<12}{'耗时(s)':>10}{'净分配(MB)':>12}{'峰值(MB)':>10}{'单元格':>10}"]
+        for r in self.records:
+            mem = f"{r['alloc_mb']:>12.1f}{r['peak_mb']:>10.1f}" if "peak_mb" in r else f"{'-':>12}{'-':>10}"
+            lines.append(f"{r['phase']:<12}{r['seconds']:>10.3f}{mem}{r.get('cells', ''):>10}")
+            extra = [f"{k}={r[k]:.3f}s" for k in ("serialize_seconds", "zip_seconds", "cache_seconds") if k in r]
+            if extra: lines.append(" " * 12 + "  " + "  ".join(extra))
+        lines.append(f"{'合计':<12}{self.total():>10.3f}")
+        return "\n".join(lines)
@@ -0,0 +1,121 @@
+import calendar
+import re
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+import numpy as np
+import openpyxl
+from tracker_formula import search_position
+
+# ==========================================
+# 📖 打卡数据读取：只读模式流式读取已填写的 v5 工作簿
+# ==========================================
+# 每个文件读成一份紧凑的列式数据：
+#   - codes:   uint16 矩阵 (max_items × 全年天数)，0 表示未打卡，k 表示 symbols[k]
+#   - states:  uint8 矩阵，0 未打卡 / 1 已打卡 / 2 已打卡且命中该事项的「积极标志」
+#   - remarks: 长度为全年天数的备注数组 (每日感悟行)
+# 布局参数与 HabitTrackerGenerator 默认值一致 (主表第 16 行起、备注第 13 行、打卡区 M 列起)。
+
+CONFIG_TITLE = "事项配置页"
+MONTH_TITLE = re.compile(r"^(\d{4})年(\d{1,2})月打卡$")
+EMPTY, CHECKED, POSITIVE = 0, 1, 2
+
+def is_blank(v):
+    return v is None or v == ""
+
+def excel_search(find_text, within_text):
+    # SEARCH(find_text, within_text) 是否命中：不区分大小写，支持 ? * 通配与 ~ 转义
+    return search_position(find_text, within_text) is not None
+
+class CheckinData:
+    def __init__(self, year, items, codes, symbols, remarks, source=None):
+        self.year = year
+        self.items = items          # 每个配置行一项：(类别, 事项, 目标天数, 积极标志)，空行为 None
+        self.codes = codes
+        self.symbols = symbols      # symbols[0] 恒为 None，对应未打卡
+        self.remarks = remarks
+        self.source = source
+        self.dates = np.arange(np.datetime64(f"{year}-01-01"), np.datetime64(f"{year + 1}-01-01"))
+        self._states = None
+
+    @property
+    def max_items(self):
+        return len(self.items)
+
+    @property
+    def states(self):
+        if self._states is None:
+            states = (self.codes > 0).astype(np.uint8)
+            # 积极判定只需对「事项 × 出现过的符号」做一次 SEARCH，再按编码查表
+            for i, item in enumerate(self.items):
+                if item is None or is_blank(item[3]): continue
+                lookup = np.array([0] + [POSITIVE if excel_search(sym, item[3]) else CHECKED for sym in self.symbols[1:]], dtype=np.uint8)
+                states[i] = lookup[self.codes[i]]
+            self._states = states
+        return self._states
+
+    def values(self, i):
+        # 第 i 个事项全年的原始打卡值 (未打卡为 None)
+        return [self.symbols[c] for c in self.codes[i]]
+
+    def month_slice(self, m):
+        start = date(self.year, m, 1).timetuple().tm_yday - 1
+        return slice(start, start + calendar.monthrange(self.year, m)[1])
+
+def workbook_years(wb):
+    return sorted({int(m.group(1)) for m in map(MONTH_TITLE.match, wb.sheetnames) if m})
+
+def read_items(wb):
+    # 配置页：A 列预置了序号公式的行数即 max_items；空行为 None
+    items = []
+    for row in wb[CONFIG_TITLE].iter_rows(min_row=2, min_col=1, max_col=5, values_only=True):
+        if not (isinstance(row[0], str) and row[0].startswith("=IF(C")): break
+        items.append(None if is_blank(row[2]) else tuple(row[1:5]))
+    return items
+
+def read_checkins(path, main_table_start=16, remark_row=13, col_offset=2, year=None):
+    # year: 多年工作簿 (HabitTrackerGenerator(years=...)) 中要读取的年份；单年工作簿可省略
+    wb = openpyxl.load_workbook(path, read_only=True)
+    try:
+        years = workbook_years(wb)
+        if year is None:
+            if len(years) != 1: raise ValueError(f"{path}: 无法识别年份，月度表年份为 {years}，多年工作簿请指定 year")
+            year = years[0]
+        elif year not in years: raise ValueError(f"{path}: 没有 {year} 年的月度表 (现有 {years})")
+
+        items = read_items(wb)
+        max_items = len(items)
+
+        days_in_year = 366 if calendar.isleap(year) else 365
+        codes = np.zeros((max_items, days_in_year), dtype=np.uint16)
+        remarks = np.full(days_in_year, None, dtype=object)
+        symbols, symbol_ids = [None], {}
+        first_col, offset = 11 + col_offset, 0
+        for m in range(1, 13):
+            num_days = calendar.monthrange(year, m)[1]
+            # 按月懒生成的工作簿 (months=N) 尚未追加的月份视为全空
+            if f"{year}年{m}月打卡" not in wb.sheetnames:
+                offset += num_days; continue
+            rows = wb[f"{year}年{m}月打卡"].iter_rows(min_row=remark_row, max_row=main_table_start + max_items - 1, min_col=first_col, max_col=first_col + num_days - 1, values_only=True)
+            for r, row in enumerate(rows, remark_row):
+                if r == remark_row:
+                    for d, v in enumerate(row):
+                        if not is_blank(v): remarks[offset + d] = v
+                elif r >= main_table_start:
+                    i = r - main_table_start
+                    for d, v in enumerate(row):
+                        if is_blank(v): continue
+                        # 按 (类型, 值) 编码：1、1.0 与 TRUE 在 Excel 中是不同的输入
+                        key = (v.__class__, v)
+                        code = symbol_ids.get(key)
+                        if code is None:
+                            code = symbol_ids[key] = len(symbols); symbols.append(v)
+                        codes[i, offset + d] = code
+            offset += num_days
+        return CheckinData(year, items, codes, symbols, remarks, source=path)
+    finally:
+        wb.close()
+
+def read_many(paths, workers=None):
+    # 多个文件并行读取，返回顺序与 paths 一致
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(read_checkins, paths))
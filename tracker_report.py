@@ -0,0 +1,133 @@
+import argparse
+import json
+import os
+import re
+import zipfile
+from collections import Counter
+from xml.sax.saxutils import unescape
+from openpyxl.utils import column_index_from_string
+from generate_excel_v5 import HabitTrackerGenerator, _formula_shape
+from tracker_formula import sheet_parts
+
+# ==========================================
+# 📏 体积报告：把生成的 xlsx 当作 zip 包直接扫描，按工作表统计 XML 体积与内容构成
+# ==========================================
+# 适用于 v1~v5 任一版本的输出 (不加载工作簿)。每张表：
+#   - xml_bytes / zip_bytes: 工作表 XML 解压后 / 压缩后的字节数
+#   - cells / formulas: 单元格数与公式数 (共享公式的从属格也计入)
+#   - shapes: 不同公式「形状」数：本表引用改写为相对本格的 R1C1、跨表引用只保留表名后相同的公式算一种 (同一列逐行公式通常只有一种)
+#   - cf_rules / merged / validations: 条件格式规则、合并区、数据验证数
+#   - source: v5 中负责该表的 _setup_* 方法，体积异常时先看这里 (只对带生成参数属性的 v5 输出标注)
+# 另报告样式表 (styles.xml) 的体积与各表项数量。
+
+_CELL = re.compile(r'<c r="([A-Z]+)(\d+)"[^>]*?(?:/>|>(.*?)</c>)', re.DOTALL)
+_FORMULA = re.compile(r'<f\b([^>]*?)(?:/>|>(.*?)</f>)', re.DOTALL)
+_SHARED_SI = re.compile(r'\bsi="(\d+)"')
+_MONTH = re.compile(r"^(\d{4})年(\d{1,2})月打卡$")
+_ENTITIES = {"&quot;": '"', "&apos;": "'"}
+# 带表名的引用：'带引号的表名'!A1 或 表名!$A$1:$B$2
+_SHEET_REF = re.compile(r"((?:'(?:[^']|'')+'|[^\s'\"!(),=<>&+\-*/^:;{}]+)!)(\$?[A-Z]{1,3}\$?\d+(?::\$?[A-Z]{1,3}\$?\d+)?)")
+_MASK = re.compile(r"\x00(\d+)\x00")
+
+def is_v5(zf):
+    # v5 输出在文档自定义属性中记录了生成参数 (HabitTrackerGenerator.PARAMS_PROPERTY)
+    try: custom = zf.read("docProps/custom.xml").decode("utf-8")
+    except KeyError: return False
+    return f'name="{HabitTrackerGenerator.PARAMS_PROPERTY}"' in custom
+
+def setup_source(title):
+    # 表名 -> v5 中搭建该表的方法 (按表名规则识别)
+    if title == "事项配置页": return "_setup_config_sheet"
+    if title == HabitTrackerGenerator.YOY_TITLE: return "_setup_yoy_sheet"
+    if _MONTH.match(title): return "_setup_monthly_sheet"
+    if "年度画廊" in title: return "_setup_gallery_sheets"
+    if "年度汇总看板" in title: return "_setup_annual_summary_sheet / _setup_gallery"
+    return None
+
+def formula_shape(formula, row, col):
+    # 跨表引用的坐标属于另一张表，换算成相对本格的偏移没有意义 (画廊各格、月度表各行按模板换算出的目标格各不相同)，
+    # 只保留表名；其余引用按 _formula_shape 改写为相对本格的 R1C1。字符串常量原样保留
+    refs = []
+    def mask(m):
+        refs.append(m.group(1) + ("#:#" if ":" in m.group(2) else "#"))
+        return f"\x00{len(refs) - 1}\x00"
+    parts = re.split(r'("[^"]*")', formula)
+    masked = "".join(p if i % 2 else _SHEET_REF.sub(mask, p) for i, p in enumerate(parts))
+    return _MASK.sub(lambda m: refs[int(m.group(1))], _formula_shape(masked, row, col))
+
+def sheet_report(xml, top=3):
+    shapes, masters, cells, formulas = Counter(), {}, 0, 0
+    for m in _CELL.finditer(xml):
+        cells += 1
+        f = _FORMULA.search(m.group(3) or "")
+        if f is None: continue
+        formulas += 1
+        row, col = int(m.group(2)), column_index_from_string(m.group(1))
+        si = _SHARED_SI.search(f.group(1)) if 't="shared"' in f.group(1) else None
+        if f.group(2):
+            shape = formula_shape(unescape(f.group(2), _ENTITIES), row, col)
+            if si: masters[si.group(1)] = shape
+        else:
+            # 共享公式从属格与首格同形状 (首格总在从属格之前)
+            shape = masters.get(si.group(1)) if si else None
+        shapes[shape] += 1
+    return {
+        "xml_bytes": len(xml.encode("utf-8")),
+        "cells": cells,
+        "formulas": formulas,
+        "shapes": len(shapes),
+        "top_shapes": [{"count": n, "shape": s} for s, n in shapes.most_common(top)],
+        "cf_rules": xml.count("<cfRule "),
+        "merged": xml.count("<mergeCell "),
+        "validations": xml.count("<dataValidation "),
+    }
+
+def styles_report(xml):
+    counts = {}
+    for tag in ("numFmts", "fonts", "fills", "borders", "cellXfs", "dxfs"):
+        m = re.search(rf'<{tag}\b[^>]*\bcount="(\d+)"', xml)
+        counts[tag] = int(m.group(1)) if m else 0
+    return {"xml_bytes": len(xml.encode("utf-8")), **counts}
+
+def workbook_report(path, top=3):
+    with zipfile.ZipFile(path) as zf:
+        infos = {i.filename: i for i in zf.infolist()}
+        sheets, v5 = [], is_v5(zf)
+        for title, part in sheet_parts(zf).items():
+            r = sheet_report(zf.read(part).decode("utf-8"), top)
+            sheets.append({"title": title, "part": part, "source": setup_source(title) if v5 else None, "zip_bytes": infos[part].compress_size, **r})
+        styles = styles_report(zf.read("xl/styles.xml").decode("utf-8")) if "xl/styles.xml" in infos else None
+        return {"path": path, "file_bytes": os.path.getsize(path), "xml_bytes": sum(i.file_size for i in infos.values()),
+                "sheets": sheets, "styles": styles}
+
+def format_report(report, sort=None):
+    sheets = sorted(report["sheets"], key=lambda s: -s[sort]) if sort else report["sheets"]
+    lines = [f"📏 {report['path']}：压缩后 {report['file_bytes'] / 1e3:.1f}KB，解压后 {report['xml_bytes'] / 1e3:.1f}KB",
+             f"{'工作表':<18}{'XML(KB)':>10}{'压缩(KB)':>10}{'单元格':>9}{'公式':>9}{'形状':>6}{'条件格式':>8}{'合并':>6}{'验证':>5}  来源"]
+    for s in sheets:
+        lines.append(f"{s['title']:<18}{s['xml_bytes'] / 1e3:>10.1f}{s['zip_bytes'] / 1e3:>10.1f}{s['cells']:>9}{s['formulas']:>9}{s['shapes']:>6}"
+                     f"{s['cf_rules']:>8}{s['merged']:>6}{s['validations']:>5}  {s['source'] or '-'}")
+    total = lambda k: sum(s[k] for s in report["sheets"])
+    lines.append(f"{'合计':<18}{total('xml_bytes') / 1e3:>10.1f}{total('zip_bytes') / 1e3:>10.1f}{total('cells'):>9}{total('formulas'):>9}{'':>6}"
+                 f"{total('cf_rules'):>8}{total('merged'):>6}{total('validations'):>5}")
+    st = report["styles"]
+    if st: lines.append(f"🎨 styles.xml {st['xml_bytes'] / 1e3:.1f}KB：cellXfs {st['cellXfs']}、fonts {st['fonts']}、fills {st['fills']}、borders {st['borders']}、numFmts {st['numFmts']}、dxfs {st['dxfs']}")
+    heaviest = max(report["sheets"], key=lambda s: s["xml_bytes"], default=None)
+    if heaviest and heaviest["top_shapes"]:
+        lines.append(f"🔎 最大的表「{heaviest['title']}」中出现最多的公式形状：")
+        lines.extend(f"   {t['count']:>7} × {t['shape']}" for t in heaviest["top_shapes"])
+    return "\n".join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="生成结果体积报告：每张表的 XML 体积、单元格 / 公式 / 公式形状 / 条件格式 / 合并区数与样式表规模")
+    parser.add_argument("paths", nargs="+", help="xlsx 文件 (v1~v5 任一版本的输出)")
+    parser.add_argument("--sort", choices=("xml_bytes", "formulas", "cells", "cf_rules"), help="按该列降序排列工作表")
+    parser.add_argument("--top", type=int, default=3, help="列出的高频公式形状数")
+    parser.add_argument("--json", action="store_true", help="输出 JSON")
+    args = parser.parse_args(argv)
+    reports = [workbook_report(p, args.top) for p in args.paths]
+    if args.json: print(json.dumps(reports if len(reports) > 1 else reports[0], ensure_ascii=False, indent=1))
+    else: print("\n\n".join(format_report(r, args.sort) for r in reports))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+import argparse
+import hashlib
+import inspect
+import json
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+from batch_generate import parse_items
+from generate_excel_v5 import HabitTrackerGenerator
+
+# ==========================================
+# 🌐 生成服务：HTTP 请求 -> 进程池渲染 -> 返回 xlsx，最近的结果按字节数上限缓存在内存中
+# ==========================================
+# GET /generate?year=2026&max_items=50&items=[...]  或  POST /generate (JSON 请求体，字段相同)
+#   参数：year / years / max_items / items / positive_strategy / gallery / gallery_page_size / months，均可省略
+#   响应：xlsx 字节；X-Cache 为 hit (内存命中) / miss (新渲染) / shared (与进行中的相同请求共用一次渲染)
+# GET /stats    计数与延迟：请求数、命中率、缓存条目 / 字节数、按结果分类的 p50 / p95 / 最大耗时
+# 同一组参数规范化后得到同一个缓存键，结果与直接 HabitTrackerGenerator(...).generate() 相同
+# (默认使用等价的 xml 后端)；缺省参数按生成器默认值补齐后再算缓存键；参数错误或超出规模上限 (MAX_ITEMS / MAX_YEARS) 返回 400，渲染异常返回 500。
+
+XLSX_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+PARAMS = ("year", "years", "max_items", "items", "positive_strategy", "gallery", "gallery_page_size", "months")
+_INT_PARAMS = ("year", "max_items", "gallery_page_size", "months")
+# 单次请求的规模上限，超出返回 400 (避免一个请求占满渲染进程)
+MAX_ITEMS, MAX_YEARS = 500, 5
+_DEFAULTS = {k: p.default for k, p in inspect.signature(HabitTrackerGenerator).parameters.items() if k in PARAMS}
+
+def normalize_params(raw):
+    # 查询串里的值都是文本，数字与 JSON 字段在这里统一转换；再补齐缺省值、统一等价写法，
+    # 显式写出默认值的请求与省略它的请求得到同一个缓存键
+    unknown = set(raw) - set(PARAMS)
+    if unknown: raise ValueError(f"未知参数：{', '.join(sorted(unknown))}")
+    params = {}
+    for key, value in raw.items():
+        if value in (None, ""): continue
+        if key in _INT_PARAMS: value = int(value)
+        elif key == "years":
+            if isinstance(value, str): value = json.loads(value) if value.startswith("[") else value.split(",")
+            value = sorted({int(y) for y in value})
+        elif key == "items": value = parse_items(value)
+        params[key] = value
+    params = {**_DEFAULTS, **params}
+    if params["years"]:
+        if len(params["years"]) > MAX_YEARS: raise ValueError(f"years 最多 {MAX_YEARS} 年")
+        params["year"] = params["years"][0]
+        if len(params["years"]) == 1: params["years"] = None
+    if not 1900 <= params["year"] <= 9999: raise ValueError(f"year 超出范围：{params['year']}")
+    if not 1 <= params["max_items"] <= MAX_ITEMS: raise ValueError(f"max_items 必须在 1~{MAX_ITEMS} 之间")
+    if params["items"] is None: params["items"] = HabitTrackerGenerator.DEFAULT_ITEMS
+    if len(params["items"]) > params["max_items"]: raise ValueError(f"预置事项数 {len(params['items'])} 超过 max_items={params['max_items']}")
+    if params["months"] is None: params["months"] = 12
+    return params
+
+def cache_key(params):
+    return hashlib.sha256(json.dumps(params, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+def render(params, backend="xml", compresslevel=None):
+    # 在工作进程内执行：直接在内存中生成，返回 xlsx 字节
+    return HabitTrackerGenerator(filename=None, backend=backend, **params).generate_bytes(compresslevel)
+
+class ByteLRU:
+    # 按总字节数限容的 LRU；单个结果超过上限时不缓存
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._data = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key):
+        data = self._data.get(key)
+        if data is not None: self._data.move_to_end(key)
+        return data
+
+    def put(self, key, data):
+        if len(data) > self.max_bytes: return
+        old = self._data.pop(key, None)
+        if old is not None: self.bytes -= len(old)
+        self._data[key] = data
+        self.bytes += len(data)
+        while self.bytes > self.max_bytes:
+            _, evicted = self._data.popitem(last=False)
+            self.bytes -= len(evicted)
+
+class GenerationService:
+    def __init__(self, workers=None, cache_bytes=256 * 2**20, backend="xml", latency_window=1000, compresslevel=None):
+        self.backend, self.compresslevel = backend, compresslevel
+        self.cache = ByteLRU(cache_bytes)
+        self._pool = ProcessPoolExecutor(max_workers=workers)
+        self._lock = threading.Lock()
+        self._inflight = {}  # 缓存键 -> 进行中的渲染 (Future)，相同请求只渲染一次
+        self.counts = {"requests": 0, "hit": 0, "miss": 0, "shared": 0, "errors": 0}
+        self._latency = {k: deque(maxlen=latency_window) for k in ("hit", "miss", "shared")}
+
+    def get(self, params):
+        # 返回 (xlsx 字节, 来源 hit / miss / shared)；渲染异常原样抛出
+        start = time.perf_counter()
+        key = cache_key(params)
+        with self._lock:
+            self.counts["requests"] += 1
+            data = self.cache.get(key)
+            if data is not None: source = "hit"
+            else:
+                fut = self._inflight.get(key)
+                source = "miss" if fut is None else "shared"
+                if fut is None:
+                    fut = self._inflight[key] = Future()
+                    owner = True
+                else: owner = False
+        if data is None:
+            if owner:
+                try:
+                    data = self._pool.submit(render, params, self.backend, self.compresslevel).result()
+                    with self._lock: self.cache.put(key, data)
+                    fut.set_result(data)
+                except BaseException as e:
+                    fut.set_exception(e)
+                finally:
+                    with self._lock: self._inflight.pop(key, None)
+            try: data = fut.result()
+            except Exception:
+                with self._lock: self.counts["errors"] += 1
+                raise
+        with self._lock:
+            self.counts[source] += 1
+            self._latency[source].append(time.perf_counter() - start)
+        return data, source
+
+    def stats(self):
+        def summary(samples):
+            if not samples: return {"count": 0}
+            s = sorted(samples)
+            pick = lambda q: s[min(len(s) - 1, int(q * len(s)))]
+            return {"count": len(s), "mean_ms": sum(s) / len(s) * 1e3, "p50_ms": pick(0.5) * 1e3, "p95_ms": pick(0.95) * 1e3, "max_ms": s[-1] * 1e3}
+        with self._lock:
+            served = self.counts["hit"] + self.counts["miss"] + self.counts["shared"]
+            return {**self.counts, "hit_rate": (self.counts["hit"] + self.counts["shared"]) / served if served else 0.0,
+                    "cache_entries": len(self.cache), "cache_bytes": self.cache.bytes, "cache_max_bytes": self.cache.max_bytes,
+                    "inflight": len(self._inflight), "latency": {k: summary(v) for k, v in self._latency.items()}}
+
+    def close(self):
+        self._pool.shutdown()
+
+def make_handler(service):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status, body, content_type, headers=()):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for k, v in headers: self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _json(self, status, obj):
+            self._send(status, json.dumps(obj, ensure_ascii=False).encode("utf-8"), "application/json; charset=utf-8")
+
+        def _generate(self, raw):
+            try: params = normalize_params(raw)
+            except (ValueError, TypeError, KeyError) as e: return self._json(400, {"error": f"{type(e).__name__}: {e}"})
+            try: data, source = service.get(params)
+            except ValueError as e: return self._json(400, {"error": str(e)})
+            except Exception as e: return self._json(500, {"error": f"{type(e).__name__}: {e}"})
+            name = f"daka365_{params['year']}.xlsx"
+            self._send(200, data, XLSX_TYPE, [("X-Cache", source), ("Content-Disposition", f'attachment; filename="{name}"')])
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            if url.path == "/stats": return self._json(200, service.stats())
+            if url.path == "/generate": return self._generate(dict(parse_qsl(url.query)))
+            self._json(404, {"error": "未知路径，可用 /generate 与 /stats"})
+
+        def do_POST(self):
+            if urlsplit(self.path).path != "/generate": return self._json(404, {"error": "未知路径"})
+            try:
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+                if not isinstance(body, dict): raise ValueError("请求体必须是 JSON 对象")
+            except ValueError as e: return self._json(400, {"error": f"请求体无效：{e}"})
+            self._generate(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="本地模板生成 HTTP 服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8365)
+    parser.add_argument("--workers", type=int, default=None, help="渲染进程数 (默认 CPU 核数)")
+    parser.add_argument("--cache-mb", type=float, default=256, help="内存缓存上限 (MB)")
+    parser.add_argument("--backend", choices=("xml", "openpyxl"), default="xml")
+    parser.add_argument("--compresslevel", type=int, choices=range(10), default=None, help="0 不压缩 (最快)，1~9 为 deflate 级别")
+    args = parser.parse_args(argv)
+    service = GenerationService(args.workers, int(args.cache_mb * 2**20), args.backend, compresslevel=args.compresslevel)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(service))
+    print(f"🌐 http://{args.host}:{args.port}/generate  (统计：/stats)")
+    try: server.serve_forever()
+    except KeyboardInterrupt: pass
+    finally:
+        server.server_close(); service.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import argparse
+import re
+import openpyxl
+from generate_excel_v5 import HabitTrackerGenerator
+from tracker_formula import as_text
+from tracker_metrics import ANNUAL_LABELS, compute_metrics
+from tracker_reader import read_checkins, workbook_years
+from tracker_update import rebuild_annual, stored_params
+
+# ==========================================
+# 📸 年度看板快照：读取已填写的工作簿，把「📅 年度汇总看板」重建为静态数值
+# ==========================================
+# 月度表保持原样 (继续用于录入)，只有年度看板的 ~1.8 万条跨表公式被替换成字面值，
+# 适合作为夜间归档 / 导出版本，打开与重算都不再需要遍历 12 张月度表。
+
+class AnnualSnapshot:
+    # 年度看板的静态取值：打卡数据来自只读读取器，指标来自数组化指标引擎，与看板公式同口径
+    def __init__(self, data, months=12):
+        self.data = data
+        self.metrics = compute_metrics(data, months)
+
+    def annual_metrics(self):
+        return [self.metrics["annual"][k] for k in ANNUAL_LABELS]
+
+    # --- 年度画廊单元格 ---
+    def gallery_title(self, i):
+        item = self.data.items[i]
+        # 与看板公式的 & 拼接一致：数字事项名 1.0 显示为 "1"
+        return "" if item is None else "🔥 " + as_text(item[1])
+
+    def gallery_day(self, i, m, d):
+        if self.data.items[i] is None: return ""
+        v = self.data.symbols[self.data.codes[i, self.data.month_slice(m).start + d - 1]]
+        return "" if v is None else v
+
+def snapshot_workbook(src, dst):
+    wb = openpyxl.load_workbook(src)
+    years = workbook_years(wb)
+    if len(years) > 1: raise ValueError(f"{src}: 多年工作簿 ({years[0]}~{years[-1]}) 暂不支持年度看板快照，请对单年工作簿使用")
+    params = stored_params(wb)
+    data = AnnualSnapshot(read_checkins(src), params.get("months", 12))
+    gen = HabitTrackerGenerator(filename=dst, year=data.data.year, max_items=data.data.max_items,
+                                gallery=params.get("gallery", "full"), gallery_page_size=params.get("gallery_page_size"), months=params.get("months"))
+    gen.wb, gen.snapshot = wb, data
+    gen.gallery_slots = [i for i, item in enumerate(data.data.items) if item is not None] if gen.gallery == "configured" else None
+    rebuild_annual(gen, wb)
+    wb.save(dst)
+    return dst
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="把已填写工作簿的年度汇总看板固化为静态数值 (归档 / 导出用)")
+    parser.add_argument("src", help="已填写的 v5 工作簿")
+    parser.add_argument("-o", "--output", help="输出路径 (默认 <src>_快照.xlsx)")
+    args = parser.parse_args(argv)
+    dst = args.output or re.sub(r"\.xlsx$", "", args.src) + "_快照.xlsx"
+    snapshot_workbook(args.src, dst)
+    print(f"📸 年度看板快照已生成：{dst}")
+
+if __name__ == "__main__":
+    main()
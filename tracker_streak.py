@@ -0,0 +1,135 @@
+import argparse
+import json
+from datetime import date, timedelta
+import numpy as np
+import openpyxl
+from tracker_reader import POSITIVE, CheckinData, is_blank, read_checkins, workbook_years
+
+# ==========================================
+# 🔥 连续天数：按「事项 × 天」的打卡矩阵计算当前连续、最长连续与全部连续区间
+# ==========================================
+# - 时间轴：一年或多年工作簿中连续的几年首尾相接 (各年 CheckinData 按年份顺序传入)，跨月、跨年只是相邻的两天，无需特殊处理。
+# - 逐日累计：第 d 天有打卡则为前一天的累计值 + 1，否则为 0 (与 streaks="formulas" 的隐藏辅助区逐格一致，多年模式下 1 月 1 日接续上一年末)。
+# - 当前连续：截至 as_of (默认今天，落在时间轴外时取起点前 / 终点) 的累计值；当天还没打卡时取前一天的，不算中断。
+# - 最长连续：截至某天 (全部 / 某月末) 累计值的最大值，区间取最早出现的一段。
+# positive=True 时只统计命中积极标志的打卡 (积极标志为空的事项每次打卡都算，与 I 列一致)。
+
+def _years(data):
+    # 单份 CheckinData 或按年份顺序排列的多份 (多年工作簿)
+    datas = [data] if isinstance(data, CheckinData) else list(data)
+    if any(b.year != a.year + 1 for a, b in zip(datas, datas[1:])): raise ValueError(f"年份须连续递增：{[d.year for d in datas]}")
+    return datas
+
+def _hits(data, positive):
+    checked = data.codes > 0
+    if not positive: return checked
+    # 与 I 列 / tracker_metrics 同口径：积极标志为空的事项每次打卡都算积极
+    blank = np.array([item is None or is_blank(item[3]) for item in data.items])
+    return np.where(blank[:, None], checked, data.states >= POSITIVE)
+
+def checkin_hits(data, positive=False):
+    # 打卡矩阵 (事项 × 天)，多年时按时间轴拼接
+    return np.concatenate([_hits(d, positive) for d in _years(data)], axis=1)
+
+def run_lengths(hits):
+    # 打卡矩阵 -> 逐日累计的连续天数 (事项 × 天)
+    idx = np.arange(hits.shape[1])
+    last_miss = np.maximum.accumulate(np.where(hits, -1, idx), axis=1)
+    return np.where(hits, idx - last_miss, 0)
+
+def streak_runs(run):
+    # 一行累计值 -> [(起始天序号, 结束天序号, 天数)]
+    ends = np.flatnonzero((run > 0) & (np.append(run[1:], 0) == 0))
+    return [(int(e - run[e] + 1), int(e), int(run[e])) for e in ends]
+
+def _as_of_index(start, days, as_of):
+    # as_of 在时间轴上的序号 (start 为第 0 天)；早于起点为 -1，晚于终点为最后一天
+    as_of = date.today() if as_of is None else as_of
+    return min(max((as_of - start).days, -1), days - 1)
+
+def _current(run, t):
+    if t < 0: return 0
+    return int(max(run[t], run[t - 1] if t > 0 else 0))
+
+def item_streaks(data, as_of=None, positive=False):
+    # 每个配置行一项 (空行为 None)：当前连续、最长连续 (含起止日期) 与全部连续区间
+    datas = _years(data)
+    runs = run_lengths(checkin_hits(datas, positive))
+    start = date(datas[0].year, 1, 1)
+    t = _as_of_index(start, runs.shape[1], as_of)
+    day = lambda k: start + timedelta(days=int(k))
+    out = []
+    for i, item in enumerate(datas[-1].items):
+        if item is None: out.append(None); continue
+        history = streak_runs(runs[i])
+        current = _current(runs[i], t)
+        best = max(history, key=lambda r: r[2], default=None)
+        out.append({
+            "category": item[0], "item": item[1],
+            "current": current,
+            "current_start": day(t - current + 1 - (runs[i][t] == 0)) if current else None,
+            "longest": best[2] if best else 0,
+            "longest_start": day(best[0]) if best else None,
+            "longest_end": day(best[1]) if best else None,
+            "history": [(day(s), day(e), n) for s, e, n in history],
+        })
+    return out
+
+def month_streaks(data, as_of=None, months=12, positive=False):
+    # 月度看板两行的取值 {(年, 月, 事项序号): (当前连续, 最长连续)}，与 streaks="formulas" 的看板公式同口径：
+    # 当前连续按「今天」落在本月的位置取 (未到本月为 0，已过为月末)，最长连续取时间轴起点 (多年时为第一年年初) 至本月末
+    datas = _years(data)
+    runs = run_lengths(checkin_hits(datas, positive))
+    t = _as_of_index(date(datas[0].year, 1, 1), runs.shape[1], as_of)
+    best = np.maximum.accumulate(runs, axis=1) if runs.size else runs
+    values, offset = {}, 0
+    for d in datas:
+        for m in range(1, months + 1):
+            s = d.month_slice(m)
+            begin, end = offset + s.start, offset + s.stop - 1
+            for i, item in enumerate(d.items):
+                if item is None: continue
+                values[(d.year, m, i)] = (_current(runs[i], min(t, end)) if t >= begin else 0, int(best[i, end]))
+        offset += len(d.dates)
+    return values
+
+def read_years(path, year=None):
+    # 工作簿中的各年数据 (按年份顺序)；year 表示只读到该年为止
+    wb = openpyxl.load_workbook(path, read_only=True)
+    try: years = workbook_years(wb)
+    finally: wb.close()
+    if year is not None and year not in years: raise ValueError(f"{path}: 没有 {year} 年的月度表 (现有 {years})")
+    return [read_checkins(path, year=y) for y in years if year is None or y <= year]
+
+def write_streak_values(src, dst=None, as_of=None):
+    # 把当前结果作为静态数值写入月度看板 (重建月度表，打卡数据原样保留)
+    from tracker_update import update_workbook
+    return update_workbook(src, dst, streaks="values", rebuild=["months"], streak_as_of=as_of)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="计算已填写工作簿中每个事项的当前连续 / 最长连续打卡天数")
+    parser.add_argument("src", help="已填写的 v5 工作簿")
+    parser.add_argument("--year", type=int, help="多年工作簿中统计截至的年份 (之前的年份接续计入，默认全部)")
+    parser.add_argument("--as-of", type=date.fromisoformat, help="统计截至日期 (默认今天)")
+    parser.add_argument("--positive", action="store_true", help="只统计命中积极标志的打卡")
+    parser.add_argument("--history", action="store_true", help="列出每段连续区间")
+    parser.add_argument("--json", action="store_true", help="输出 JSON")
+    parser.add_argument("--write", action="store_true", help="把结果写入月度看板「当前连续 / 最长连续」两行 (静态数值)")
+    parser.add_argument("-o", "--output", help="--write 的输出路径 (默认原地更新)")
+    args = parser.parse_args(argv)
+    if args.write:
+        report = write_streak_values(args.src, args.output, args.as_of)
+        print(f"🔥 {report['path']}：已写入连续天数，耗时 {report['seconds']:.2f}s")
+        return
+    streaks = [s for s in item_streaks(read_years(args.src, args.year), args.as_of, args.positive) if s is not None]
+    if args.json:
+        print(json.dumps(streaks, ensure_ascii=False, indent=1, default=str))
+        return
+    for s in streaks:
+        longest = f"{s['longest']} 天 ({s['longest_start']} ~ {s['longest_end']})" if s["longest"] else "0 天"
+        print(f"🔥 {s['item']}：当前连续 {s['current']} 天，最长连续 {longest}，共 {len(s['history'])} 段")
+        if args.history:
+            for start, end, n in s["history"]: print(f"     {start} ~ {end}  {n} 天")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+from functools import lru_cache
+from openpyxl.styles import Font, Alignment, Border, Side, PatternFill, Protection
+
+# ==========================================
+# 🎨 样式注册表 (同参数样式对象只创建一次，全进程按引用复用)
+# ==========================================
+# openpyxl 的 Font / Alignment / Border 等对象在赋值给单元格时只是被登记到工作簿的样式表里，
+# 单元格本身只保存索引，因此同一个对象可以安全地分配给任意多个单元格、任意多个工作簿。
+# 注意：取到的对象是共享的，只能整体替换，禁止原地修改属性。
+
+@lru_cache(maxsize=None)
+def font(**kwargs):
+    return Font(**kwargs)
+
+@lru_cache(maxsize=None)
+def alignment(**kwargs):
+    return Alignment(**kwargs)
+
+@lru_cache(maxsize=None)
+def fill(color):
+    return PatternFill(start_color=color, end_color=color, fill_type="solid")
+
+@lru_cache(maxsize=None)
+def side(color=None, style='thin'):
+    return Side(style=style, color=color)
+
+@lru_cache(maxsize=None)
+def border(color, style='thin'):
+    s = side(color, style)
+    return Border(left=s, right=s, top=s, bottom=s)
+
+@lru_cache(maxsize=None)
+def no_border():
+    s = Side(style=None)
+    return Border(left=s, right=s, top=s, bottom=s)
+
+@lru_cache(maxsize=None)
+def protection(locked=True):
+    return Protection(locked=locked)
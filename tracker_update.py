@@ -0,0 +1,250 @@
+import argparse
+import json
+import os
+import re
+import tempfile
+import time
+import zipfile
+from io import BytesIO
+import openpyxl
+from openpyxl.cell.cell import TIME_FORMATS
+from openpyxl.packaging.relationship import get_rels_path
+from openpyxl.reader.excel import ExcelReader
+from openpyxl.styles.stylesheet import apply_stylesheet
+from openpyxl.worksheet._reader import WorkSheetParser
+from openpyxl.xml.constants import SHARED_STRINGS
+from generate_excel_v5 import HabitTrackerGenerator, _StreamingSheet, _XmlStyles
+from tracker_formula import sheet_parts, workbook_cells
+from tracker_reader import CONFIG_TITLE, MONTH_TITLE, read_checkins
+from tracker_streak import month_streaks
+
+# ==========================================
+# 🔧 增量更新：在已填写的 v5 工作簿上按新参数重建受影响的工作表，用户数据原样保留
+# ==========================================
+# - 生成参数保存在文档自定义属性 (HabitTrackerGenerator.PARAMS_PROPERTY) 中；旧文件没有该属性时从表结构推断。
+# - 参数差异决定重建范围：max_items / 表结构版本 -> 全部；positive_strategy -> 月度表；gallery / gallery_page_size -> 年度看板与画廊页。
+#   也可用 rebuild 强制重建指定部分 (如调整主题后只重建年度看板)。
+# - 用户数据 = 未锁定单元格里的值 (配置页事项、打卡格、每日感悟)：重建前取出、重建后原位写回；
+#   未锁定格里的公式 (配置页序号列) 属于生成器，以新版本为准。写回位置在新布局中不再是可编辑格时整体放弃，不落盘。
+# - 配置页重建时不写入预置事项，用户删掉的示例不会被加回来；gallery="configured" 时画廊方块按当前已填写的事项生成，
+#   新增事项后用 rebuild=["annual"] 即可补上方块。
+# - streaks="values" 的工作簿每次重建月度表时按当前打卡数据重新计算连续天数 (见 tracker_streak)。
+# - 按月懒生成的工作簿 (months=N) 用 months / append_months 追加后续月份：新月度表接在最后，年度看板与画廊随之重建；不支持删减月份。
+# - 只改写受影响的工作表：工作簿级部件 (名称、属性、样式) 照常读取，未重建的表不解析，只放一张空占位表，保存后把包内的
+#   占位 XML 换回原文件中的工作表 XML；重建的表用 xml 后端生成，用户数据直接从原工作表 XML 中取出。新样式追加在原样式表之后，
+#   原有编号不变；原文件带共享字符串表 (Excel 保存过) 时一并带上，重建的表只用内联字符串。
+#   工作表带关联部件 (批注、图片等) 或需要写缓存值 (cached_values) 时改为整本载入、整本保存。
+
+ANNUAL_TITLE = "📅 年度汇总看板"
+PARTS = ("config", "annual", "months")
+_GALLERY_TITLE = re.compile("^" + re.escape(HabitTrackerGenerator.GALLERY_TITLE).replace(r"\{\}", r"\d+") + "$")
+
+def _stamped_params(wb):
+    for prop in wb.custom_doc_props:
+        if prop.name == HabitTrackerGenerator.PARAMS_PROPERTY: return json.loads(prop.value)
+    return None
+
+def stored_params(wb):
+    # 读取生成参数；没有记录时按表结构推断 (layout 记为 0，视为需要全部重建)
+    params = _stamped_params(wb)
+    if params is not None: return params
+    years = sorted({int(m.group(1)) for m in map(MONTH_TITLE.match, wb.sheetnames) if m})
+    if len(years) != 1: raise ValueError(f"无法识别年份，月度表年份为 {years}")
+    cfg = wb[CONFIG_TITLE]
+    max_items = 0
+    while isinstance(cfg.cell(row=max_items + 2, column=1).value, str) and cfg.cell(row=max_items + 2, column=1).value.startswith("=IF(C"): max_items += 1
+    first = wb[f"{years[0]}年1月打卡"]["I16"].value or ""
+    return {"layout": 0, "year": years[0], "max_items": max_items, "positive_strategy": "sumproduct" if "SUMPRODUCT" in first else "helper"}
+
+def affected_parts(old, new):
+    if old.get("year") != new["year"]: raise ValueError("不支持修改年份：打卡格按日期排布，请重新生成新一年的模板")
+    if old.get("layout") != new["layout"] or old.get("max_items") != new["max_items"]: return set(PARTS)
+    parts = set()
+    if old.get("positive_strategy") != new["positive_strategy"] or old.get("streaks") != new.get("streaks"): parts.add("months")
+    if (old.get("gallery", "full"), old.get("gallery_page_size")) != (new["gallery"], new["gallery_page_size"]): parts.add("annual")
+    if old.get("months", 12) != new.get("months", 12): parts.add("annual")
+    return parts
+
+def configured_slots(config, max_items):
+    # 配置页中已填写事项名称 (C 列) 的序号 (0 起)；config 为配置页的用户数据 {(行, 列): 值}
+    return [r - 2 for r in range(2, max_items + 2) if config.get((r, 3)) not in (None, "")]
+
+def rebuild_annual(gen, wb):
+    # 年度看板与分页画廊不含用户数据：整体删除后按当前参数重建 (画廊页数可能变化)
+    index = wb.sheetnames.index(ANNUAL_TITLE)
+    for title in [t for t in wb.sheetnames if t == ANNUAL_TITLE or _GALLERY_TITLE.match(t)]: del wb[title]
+    if gen.gallery == "configured" and gen.snapshot is None and gen.gallery_slots is None: gen.gallery_slots = configured_slots(_user_values(wb[CONFIG_TITLE]), gen.max_items)
+    gen._setup_annual_summary_sheet()
+    gen._setup_gallery_sheets()
+    wb.move_sheet(ANNUAL_TITLE, index - wb.sheetnames.index(ANNUAL_TITLE))
+
+def _user_values(ws):
+    return {k: c.value for k, c in ws._cells.items() if c.value is not None and c.protection.locked is False}
+
+def _xml_user_values(reader, path):
+    # 与 _user_values 相同，但直接扫描工作表 XML：按样式编号查保护设置，不创建单元格对象；公式格不算用户数据
+    wb = reader.wb
+    styles, protections = wb._cell_styles, wb._protections
+    with reader.archive.open(path) as src:
+        parser = WorkSheetParser(src, reader.shared_strings, epoch=wb.epoch, date_formats=wb._date_formats, timedelta_formats=wb._timedelta_formats)
+        return {(c["row"], c["column"]): c["value"] for _, cells in parser.parse() for c in cells
+                if c["value"] is not None and c["data_type"] != "f" and protections[styles[c["style_id"]].protectionId].locked is False}
+
+class _Rebuilder(HabitTrackerGenerator):
+    # 重建的表在收尾 (合并条件格式、写出) 之前写回用户数据：restore 为 {表名: {(行, 列): 值}}
+    restore, kept_cells = None, 0
+
+    def _finish_sheet(self, ws):
+        data = (self.restore or {}).pop(ws.title, None)
+        if data is not None: self.kept_cells += _write_back(ws, data)
+        super()._finish_sheet(ws)
+
+def _write_back(ws, data):
+    # 生成器在未锁定格里预置的公式 (配置页序号列) 以新版本为准，不算用户数据
+    data = {k: v for k, v in data.items() if not (isinstance(v, str) and v.startswith("="))}
+    if isinstance(ws, _StreamingSheet): cells = {k: ws._rows.get(k[0], {}).get(k[1]) for k in data}
+    else: cells = {k: ws._cells.get(k) for k in data}
+    lost = [k for k, cell in cells.items() if cell is None or cell.protection is None or cell.protection.locked is not False]
+    if lost:
+        r, c = lost[0]
+        raise ValueError(f"「{ws.title}」中有 {len(lost)} 个已填写的单元格在新布局中不再可编辑 (如 R{r}C{c}={data[lost[0]]!r})，已放弃更新")
+    for k, v in data.items():
+        cell = cells[k]
+        cell.value = v
+        # 与 openpyxl 写入日期 / 时间时一致，补上默认的日期格式
+        if isinstance(ws, _StreamingSheet) and type(v) in TIME_FORMATS and cell.number_format is None: cell.number_format = TIME_FORMATS[type(v)]
+    return len(data)
+
+def _rebuild(gen, wb, title, build, data):
+    # data 为旧表的用户数据 (先取出)：旧表删除，新表建好后在收尾前写回数据，并顶替旧表的位置
+    index = wb.sheetnames.index(title)
+    wb.remove(wb[title])
+    gen.restore[title] = data
+    build()
+    wb.move_sheet(title, index - wb.sheetnames.index(title))
+
+def _read_shell(raw):
+    # 只读工作簿级部件 (清单、共享字符串、工作簿、文档属性、主题、样式)，不解析任何工作表
+    reader = ExcelReader(BytesIO(raw))
+    reader.read_manifest(); reader.read_strings(); reader.read_workbook(); reader.read_properties(); reader.read_custom(); reader.read_theme()
+    apply_stylesheet(reader.archive, reader.wb)
+    wb = reader.wb
+    for styles in (wb._cell_styles, wb._fonts, wb._fills, wb._borders, wb._number_formats, wb._alignments, wb._protections): _reindex(styles)
+    return reader
+
+def _reindex(styles):
+    # 读入的样式表可能有重复项 (openpyxl 自己写出的 cellXfs 就有)，IndexedList 重建查找表时会把其后各项的编号算错；
+    # 改为每个取值对应首次出现的位置，追加新样式时返回的编号与写出的样式表一致
+    styles._dict = {}
+    for i, style in enumerate(styles): styles._dict.setdefault(style, i)
+    styles.clean = True
+
+def _can_splice(reader, sheets):
+    # 原样拼回的工作表不能带关联部件 (它们的 r:id 在新包里不存在)
+    return not any(not rel.Type.endswith("/worksheet") or get_rels_path(rel.target) in reader.valid_files for _, rel in sheets)
+
+def _splice(built, reader, old_parts, kept, target, compresslevel=None):
+    # built 中未重建的表 (kept) 是空占位：换回原文件中的工作表 XML；原文件有共享字符串表时一并带上，并在清单与工作簿关系中登记
+    strings = reader.package.find(SHARED_STRINGS)
+    with zipfile.ZipFile(BytesIO(built)) as src, zipfile.ZipFile(target, "w", zipfile.ZIP_DEFLATED, compresslevel=compresslevel) as out:
+        new_parts = sheet_parts(src)
+        originals = {new_parts[title]: old_parts[title] for title in kept}
+        for info in src.infolist():
+            name = info.filename
+            data = reader.archive.read(originals[name]) if name in originals else src.read(name)
+            if strings is not None and name == "[Content_Types].xml":
+                data = data.replace(b"</Types>", f'<Override PartName="{strings.PartName}" ContentType="{SHARED_STRINGS}" />'.encode() + b"</Types>")
+            elif strings is not None and name == "xl/_rels/workbook.xml.rels":
+                rel = f'<Relationship Id="rIdSharedStrings" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/sharedStrings" Target="{strings.PartName}" />'
+                data = data.replace(b"</Relationships>", rel.encode() + b"</Relationships>")
+            out.writestr(info, data, compress_type=zipfile.ZIP_DEFLATED)
+        if strings is not None: out.writestr(strings.PartName[1:], reader.archive.read(strings.PartName[1:]))
+
+def update_workbook(src, dst=None, max_items=None, positive_strategy=None, gallery=None, gallery_page_size=None, rebuild=(), cached_values=False, months=None, append_months=0, streaks=None, streak_as_of=None):
+    # gallery_page_size=0 表示取消分页，None 表示沿用原值；months 为更新后的月份数，append_months 为在原有基础上追加的月数
+    # streaks 为 "formulas" / "values"，"off" 表示去掉连续天数，None 表示沿用原值；streak_as_of 为 values 模式的统计截至日期
+    start = time.perf_counter()
+    unknown = set(rebuild) - set(PARTS)
+    if unknown: raise ValueError(f"未知的重建部分：{', '.join(sorted(unknown))} (可选 {', '.join(PARTS)})")
+    with open(src, "rb") as f: raw = f.read()
+    reader = _read_shell(raw)
+    sheets = list(reader.parser.find_sheets())
+    old = _stamped_params(reader.wb)
+    splice = old is not None and not cached_values and _can_splice(reader, sheets)
+    if splice:
+        # 未重建的表先放空占位 (xml 后端保存时写出空的 sheetData)，保存后换回原 XML
+        wb, old_parts, placeholders = reader.wb, {}, {}
+        for sheet, rel in sheets:
+            ws = placeholders[sheet.name] = wb.create_sheet(sheet.name)
+            ws.sheet_state, ws._xml_sheet_data, ws._xml_dimension = sheet.state, b"<sheetData />", "A1:A1"
+            old_parts[sheet.name] = rel.target
+        reader.parser.assign_names()
+        user_values = lambda title: _xml_user_values(reader, old_parts[title])
+    else:
+        wb = openpyxl.load_workbook(BytesIO(raw))
+        old = stored_params(wb)
+        user_values = lambda title: _user_values(wb[title])
+    if "years" in old: raise ValueError("多年工作簿暂不支持增量更新，请用 HabitTrackerGenerator(years=...) 重新生成")
+    page_size = old.get("gallery_page_size") if gallery_page_size is None else gallery_page_size or None
+    old_months = old.get("months", 12)
+    months = months or min(12, old_months + append_months)
+    if months < old_months: raise ValueError(f"不支持删减月份：工作簿已有 1~{old_months} 月，目标为 {months} 个月")
+    gen = _Rebuilder(filename=dst or src, year=old["year"], max_items=max_items or old["max_items"], items=[],
+                     positive_strategy=positive_strategy or old.get("positive_strategy", "sumproduct"), cached_values=cached_values,
+                     gallery=gallery or old.get("gallery", "full"), gallery_page_size=page_size, shared_formulas=old.get("shared_formulas", False), months=months,
+                     streaks=old.get("streaks") if streaks is None else None if streaks == "off" else streaks, backend="xml" if splice else "openpyxl")
+    parts = affected_parts(old, gen.params()) | set(rebuild)
+    if not parts and (dst is None or dst == src):
+        return {"path": src, "old": old, "new": gen.params(), "rebuilt": [], "kept_cells": 0, "seconds": time.perf_counter() - start}
+    gen.wb, gen.restore = wb, {}
+    if splice: gen._xml_styles = _XmlStyles(wb)
+    if gen.streaks == "values" and ("months" in parts or gen.months > old_months):
+        gen.streak_values = month_streaks(read_checkins(src, year=gen.year), streak_as_of, gen.months)
+    config = user_values(CONFIG_TITLE) if "config" in parts or gen.gallery == "configured" else None
+    if gen.gallery == "configured": gen.gallery_slots = configured_slots(config, gen.max_items)
+    if "config" in parts: _rebuild(gen, wb, CONFIG_TITLE, gen._setup_config_sheet, config)
+    if "annual" in parts: rebuild_annual(gen, wb)
+    if "months" in parts:
+        for m in range(1, old_months + 1):
+            title = f"{gen.year}年{m}月打卡"
+            _rebuild(gen, wb, title, lambda m=m: gen._setup_monthly_sheet(m), user_values(title))
+    for m in range(old_months + 1, gen.months + 1): gen._setup_monthly_sheet(m)
+    gen._stamp_params()
+    if splice:
+        kept = [title for title, ws in placeholders.items() if title in wb.sheetnames and wb[title] is ws]
+        built = gen._save(target=BytesIO()).getvalue()
+        # 先写临时文件再替换，原地更新时不会在写出途中破坏原文件
+        fd, tmp = tempfile.mkstemp(suffix=".xlsx", dir=os.path.dirname(os.path.abspath(gen.filename)))
+        os.close(fd)
+        try:
+            _splice(built, reader, old_parts, kept, tmp)
+            os.replace(tmp, gen.filename)
+        except BaseException:
+            os.remove(tmp)
+            raise
+    else:
+        if cached_values: gen._cell_values = workbook_cells(wb)
+        gen._save()
+    return {"path": gen.filename, "old": old, "new": gen.params(), "rebuilt": [p for p in PARTS if p in parts], "kept_cells": gen.kept_cells, "seconds": time.perf_counter() - start}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="按新参数增量更新已填写的 v5 工作簿，保留全部打卡数据")
+    parser.add_argument("src", help="已填写的 v5 工作簿")
+    parser.add_argument("-o", "--output", help="输出路径 (默认原地更新)")
+    parser.add_argument("--max-items", type=int)
+    parser.add_argument("--positive-strategy", choices=("sumproduct", "helper"))
+    parser.add_argument("--gallery", choices=("full", "configured"))
+    parser.add_argument("--gallery-page-size", type=int, help="画廊每页方块数，0 表示取消分页")
+    parser.add_argument("--rebuild", default="", help=f"强制重建的部分，逗号分隔：{','.join(PARTS)}")
+    parser.add_argument("--months", type=int, help="按月懒生成的工作簿扩展到 1~N 月")
+    parser.add_argument("--append-month", type=int, nargs="?", const=1, default=0, metavar="K", help="在已有月份后追加 K 个月 (默认 1)")
+    parser.add_argument("--streaks", choices=("formulas", "values", "off"), help="月度看板的连续天数：formulas 公式 / values 静态数值 / off 去掉")
+    parser.add_argument("--cached-values", action="store_true", help="同时写入公式缓存值")
+    args = parser.parse_args(argv)
+    report = update_workbook(args.src, args.output, args.max_items, args.positive_strategy, args.gallery, args.gallery_page_size,
+                             [p for p in args.rebuild.split(",") if p], args.cached_values, args.months, args.append_month, args.streaks)
+    rebuilt = "、".join(report["rebuilt"]) or "无 (参数未变化)"
+    print(f"🔧 {report['path']}：重建 {rebuilt}，保留 {report['kept_cells']} 个用户单元格，耗时 {report['seconds']:.2f}s")
+
+if __name__ == "__main__":
+    main()